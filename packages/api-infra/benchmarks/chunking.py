@@ -0,0 +1,102 @@
+"""
+Benchmark for the embedder chunking strategies.
+
+Streams every .txt / .md file of a local corpus through each strategy in 64 KiB pieces, the
+same way the embedder reads S3 objects, and reports throughput and the chunk count and size
+distributions. Without a corpus directory a mixed Korean/English corpus is generated.
+
+Usage:
+    python benchmarks/chunking.py [corpus_dir] [--chunk-size 1000] [--overlap-size 200] [--token-size 512] [--token-overlap 64]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions" / "services" / "embedder"))
+
+from chunker import create_chunker, estimate_tokens  # noqa: E402
+
+READ_SIZE = 64 * 1024
+
+SENTENCES = [
+  "주문하신 상품은 결제 완료 후 영업일 기준 2~3일 이내에 출고됩니다.",
+  "교환 및 반품은 상품 수령 후 7일 이내에 고객센터를 통해 신청하실 수 있습니다!",
+  "도서 산간 지역은 추가 배송비가 발생할 수 있습니까?",
+  "Orders placed before 2 p.m. ship the same business day.",
+  "Gift cards can't be exchanged for cash, and unused balances expire after five years.",
+  "Free returns apply to apparel and footwear only (excluding final sale items).",
+]
+
+
+def load_corpus(corpus_dir: str) -> List[str]:
+  """Reads every .txt and .md file below the directory."""
+  paths = sorted(p for p in Path(corpus_dir).rglob("*") if p.suffix in (".txt", ".md") and p.is_file())
+  return [p.read_text(encoding="utf-8") for p in paths]
+
+
+def generate_corpus(documents: int = 20, seed: int = 7) -> List[str]:
+  """Generates documents of random sentences grouped into paragraphs."""
+  rng = random.Random(seed)
+  corpus = []
+  for _ in range(documents):
+    paragraphs = [
+      " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 12)))
+      for _ in range(rng.randint(50, 400))
+    ]
+    corpus.append("\n\n".join(paragraphs))
+  return corpus
+
+
+def pieces(text: str) -> List[str]:
+  return [text[i:i + READ_SIZE] for i in range(0, len(text), READ_SIZE)]
+
+
+def percentile(values: List[int], q: float) -> int:
+  return sorted(values)[min(len(values) - 1, int(len(values) * q))]
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("corpus_dir", nargs="?")
+  parser.add_argument("--chunk-size", type=int, default=int(os.environ.get("CHUNK_SIZE", 1000)))
+  parser.add_argument("--overlap-size", type=int, default=int(os.environ.get("OVERLAP_SIZE", 200)))
+  parser.add_argument("--token-size", type=int, default=512)
+  parser.add_argument("--token-overlap", type=int, default=64)
+  parser.add_argument("--repeat", type=int, default=3)
+  args = parser.parse_args()
+
+  corpus = load_corpus(args.corpus_dir) if args.corpus_dir else generate_corpus()
+  megabytes = sum(len(text.encode("utf-8")) for text in corpus) / 1024 / 1024
+  print(f"corpus: {len(corpus)} documents, {megabytes:.2f} MB")
+
+  strategies = {
+    "fixed": create_chunker("fixed", args.chunk_size, args.overlap_size),
+    "sentence": create_chunker("sentence", args.chunk_size, args.overlap_size),
+    "paragraph": create_chunker("paragraph", args.chunk_size, args.overlap_size),
+    "token": create_chunker("token", args.token_size, args.token_overlap),
+  }
+  print(f"{'strategy':>10} {'MB/s':>8} {'chunks':>8} {'chars p50/p90/max':>20} {'tokens p50/p90/max':>20} {'tokens total':>13}")
+  for name, chunker in strategies.items():
+    best = float("inf")
+    chunks: List[str] = []
+    for _ in range(args.repeat):
+      started_at = time.perf_counter()
+      chunks = [chunk for text in corpus for chunk in chunker.chunks(pieces(text))]
+      best = min(best, time.perf_counter() - started_at)
+    chars = [len(chunk) for chunk in chunks]
+    tokens = [estimate_tokens(chunk) for chunk in chunks]
+    print(
+      f"{name:>10} {megabytes / best:>8.1f} {len(chunks):>8}"
+      f" {f'{statistics.median(chars):.0f}/{percentile(chars, 0.9)}/{max(chars)}':>20}"
+      f" {f'{statistics.median(tokens):.0f}/{percentile(tokens, 0.9)}/{max(tokens)}':>20}"
+      f" {sum(tokens):>13}"
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,106 @@
+"""
+Import-time budget for the Lambda handlers.
+
+Imports every handler module in a fresh interpreter, the same work a cold start does before the
+first request, and reports the median wall time over a few runs. Handlers must not talk to the
+network at import time, so the environment points at an unreachable domain and disables the EC2
+metadata lookup: a handler that blocks on either blows its budget. Exits with 1 if any handler
+exceeds its budget, so it can gate CI.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget embedder=900] [--budget item-search=700]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict
+
+FUNCTIONS_DIR = Path(__file__).resolve().parent.parent / "functions"
+
+# directory, module and budget in milliseconds of every handler, budgets leave headroom over measured medians
+HANDLERS = {
+  "embedder": (FUNCTIONS_DIR / "services" / "embedder", "index", 1000),
+  "knowledge-search": (FUNCTIONS_DIR / "services" / "knowledge-search", "index", 900),
+  "item-search": (FUNCTIONS_DIR / "services" / "item-search", "index", 800),
+  "authorizer": (FUNCTIONS_DIR / "auth", "authorizer", 500),
+}
+
+ENV = {
+  "AWS_REGION": "us-west-2",
+  "AWS_ACCESS_KEY_ID": "import-time",
+  "AWS_SECRET_ACCESS_KEY": "import-time",
+  "AWS_EC2_METADATA_DISABLED": "true",
+  # TEST-NET-1, nothing answers there, so an import-time request hangs until it times out
+  "OPENSEARCH_HOST": "192.0.2.1",
+  "INDEX_NAME": "import-time",
+  "EMBEDDING_MODEL_ARN": "amazon.titan-embed-text-v2:0",
+  "API_KEY": "import-time",
+  "POWERTOOLS_TRACE_DISABLED": "true",
+  "POWERTOOLS_LOG_LEVEL": "ERROR",
+}
+
+MEASURE = "import time; started = time.perf_counter(); import {module}; print((time.perf_counter() - started) * 1000)"
+
+
+def measure(directory: Path, module: str, timeout: float) -> float:
+  """Imports the module in a fresh interpreter and returns the import time in milliseconds."""
+  result = subprocess.run(
+    [sys.executable, "-c", MEASURE.format(module=module)],
+    cwd=directory,
+    env={**os.environ, **ENV},
+    capture_output=True,
+    text=True,
+    timeout=timeout,
+  )
+  if result.returncode != 0:
+    raise RuntimeError(f"importing {directory.name}/{module} failed:\n{result.stderr}")
+  return float(result.stdout.strip().splitlines()[-1])
+
+
+def parse_budgets(values) -> Dict[str, int]:
+  budgets = {name: budget for name, (_, _, budget) in HANDLERS.items()}
+  for value in values or []:
+    name, _, budget = value.partition("=")
+    if name not in HANDLERS:
+      raise SystemExit(f"unknown handler: {name}")
+    budgets[name] = int(budget)
+  return budgets
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--runs", type=int, default=5)
+  parser.add_argument("--budget", action="append", help="override a budget, e.g. embedder=900")
+  parser.add_argument("--json", action="store_true", help="print results as JSON")
+  args = parser.parse_args()
+  budgets = parse_budgets(args.budget)
+
+  results = []
+  for name, (directory, module, _) in HANDLERS.items():
+    budget = budgets[name]
+    # a blocked network call shows up as a timeout rather than a slow import
+    timings = [measure(directory, module, timeout=max(budget / 1000 * 5, 10)) for _ in range(args.runs)]
+    results.append({
+      "handler": name,
+      "median_ms": round(statistics.median(timings), 1),
+      "max_ms": round(max(timings), 1),
+      "budget_ms": budget,
+      "ok": statistics.median(timings) <= budget,
+    })
+
+  if args.json:
+    print(json.dumps(results, indent=2))
+  else:
+    print(f"{'handler':<18}{'median ms':>11}{'max ms':>10}{'budget ms':>11}  status")
+    for result in results:
+      status = "ok" if result["ok"] else "OVER BUDGET"
+      print(f"{result['handler']:<18}{result['median_ms']:>11}{result['max_ms']:>10}{result['budget_ms']:>11}  {status}")
+  sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+  main()
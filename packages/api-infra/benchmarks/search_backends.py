@@ -0,0 +1,291 @@
+"""
+Throughput and recall of the search handlers on the in-process search backend.
+
+Loads the knowledge-search and item-search handlers with SEARCH_BACKEND=local, sends API Gateway
+events through their `lambda_handler`, and reports requests per second, latency percentiles and
+recall@limit against the documents each query should find. Without snapshots a synthetic FAQ
+and item catalog are generated, FAQ vectors and query vectors then come from a hashed n-gram
+embedding instead of Bedrock.
+
+A snapshot exported from a domain with `local_search.export_snapshot` needs a queries file whose
+knowledge queries carry their embedding, one JSON object per line:
+    {"query": "...", "vector": [...], "relevant": ["<_id>", ...]}            (knowledge-search)
+    {"name": "...", "category": "...", "relevant": ["<_id>", ...]}           (item-search)
+
+Usage:
+    python benchmarks/search_backends.py [--faqs 2000] [--items 20000] [--requests 500] [--json]
+    python benchmarks/search_backends.py --knowledge-snapshot faq.ndjson --knowledge-queries faq-queries.ndjson
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import random
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "functions" / "services"
+EMBEDDING_DIMENSION = 256
+
+ENV = {
+  "AWS_REGION": "us-west-2",
+  "AWS_ACCESS_KEY_ID": "benchmark",
+  "AWS_SECRET_ACCESS_KEY": "benchmark",
+  "AWS_EC2_METADATA_DISABLED": "true",
+  "OPENSEARCH_HOST": "192.0.2.1",
+  "EMBEDDING_MODEL_ARN": "amazon.titan-embed-text-v2:0",
+  "POWERTOOLS_TRACE_DISABLED": "true",
+  "POWERTOOLS_LOG_LEVEL": "ERROR",
+  "SEARCH_BACKEND": "local",
+}
+
+TOPICS = [
+  "배송", "반품", "교환", "환불", "결제", "쿠폰", "적립금", "회원", "주문", "취소", "영수증", "포장",
+  "shipping", "returns", "exchange", "refund", "payment", "coupon", "points", "membership", "order",
+  "cancel", "receipt", "gift", "invoice", "warranty", "size", "stock", "delivery", "address",
+]
+QUALIFIERS = [
+  "해외", "당일", "무료", "부분", "자동", "정기", "international", "express", "partial", "bulk",
+  "weekend", "holiday", "mobile", "store", "online", "digital", "corporate", "student",
+]
+COLOURS = ["black", "white", "navy", "red", "green", "grey", "blue", "brown", "pink", "olive", "beige", "maroon"]
+BRANDS = [f"brand{i}" for i in range(200)]
+PRODUCTS = {
+  "APPAREL_TOPWEAR": ["tshirt", "shirt", "sweatshirt", "jacket", "kurta"],
+  "APPAREL_BOTTOMWEAR": ["jeans", "trousers", "shorts", "skirt"],
+  "FOOTWEAR_SHOES": ["sneakers", "loafers", "boots", "heels"],
+  "FOOTWEAR_SANDAL": ["sandals", "floaters"],
+  "ACCESSORIES_WATCHES": ["watch", "chronograph"],
+  "ACCESSORIES_BAGS": ["backpack", "handbag", "wallet"],
+  "PERSONAL CARE_SKIN CARE": ["lotion", "moisturizer", "sunscreen"],
+}
+
+
+def embed(text: str) -> List[float]:
+  """Hashed character 3-gram counts, similar texts get similar vectors."""
+  vector = [0.0] * EMBEDDING_DIMENSION
+  padded = f" {' '.join(text.casefold().split())} "
+  for start in range(len(padded) - 2):
+    vector[zlib.crc32(padded[start:start + 3].encode("utf-8")) % EMBEDDING_DIMENSION] += 1.0
+  return vector
+
+
+def write_ndjson(path: Path, rows: List[dict]):
+  with open(path, "w", encoding="utf-8") as f:
+    for row in rows:
+      f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def read_ndjson(path: str) -> List[dict]:
+  with open(path, encoding="utf-8") as f:
+    return [json.loads(line) for line in f if line.strip()]
+
+
+def generate_faqs(count: int, queries: int, rng: random.Random) -> tuple:
+  """FAQ snapshot and queries made of three of a question's four terms, in another order."""
+  hits, cases = [], []
+  for number in range(count):
+    terms = rng.sample(TOPICS, 2) + rng.sample(QUALIFIERS, 2)
+    question = " ".join(terms) + f" 문의 {number}"
+    hits.append({
+      "_index": "knowledge",
+      "_id": str(number),
+      "_source": {
+        "question": question,
+        "answer": f"{terms[0]} {terms[2]} 관련 안내입니다. " + " ".join(rng.sample(TOPICS, 3)),
+        "context": " ".join(rng.sample(QUALIFIERS, 3)),
+        "published_at": "2024-01-01",
+        "question_vector": embed(question),
+      },
+    })
+    if number < queries:
+      query = " ".join(rng.sample(terms, 3))
+      cases.append({"query": query, "vector": embed(query), "relevant": [str(number)]})
+  return hits, cases
+
+
+def generate_items(count: int, queries: int, rng: random.Random) -> tuple:
+  """Item snapshot and brand + product queries, every item matching both is relevant."""
+  hits = []
+  for number in range(count):
+    category = rng.choice(list(PRODUCTS))
+    hits.append({
+      "_index": "item",
+      "_id": str(number),
+      "_source": {
+        "id": number,
+        "name": f"{rng.choice(BRANDS)} {rng.choice(COLOURS)} {rng.choice(PRODUCTS[category])}",
+        "category": category,
+        "year": rng.randint(2010, 2024),
+      },
+    })
+  cases = []
+  for hit in rng.sample(hits, min(queries, count)):
+    brand, _, product = hit["_source"]["name"].split()
+    category = hit["_source"]["category"]
+    relevant = [
+      other["_id"] for other in hits
+      if other["_source"]["category"] == category and {brand, product} <= set(other["_source"]["name"].split())
+    ]
+    cases.append({"name": f"{brand} {product}", "category": category, "relevant": relevant})
+  return hits, cases
+
+
+class Context:
+  function_name = "search-benchmark"
+  memory_limit_in_mb = 1024
+  invoked_function_arn = "arn:aws:lambda:us-west-2:000000000000:function:search-benchmark"
+  aws_request_id = "benchmark"
+
+
+def load_handler(name: str, env: Dict[str, str]):
+  """Imports a handler's index.py under its own module name, with its directory importable."""
+  os.environ.update({**ENV, **env})
+  directory = SERVICES_DIR / name
+  sys.path.insert(0, str(directory))
+  try:
+    spec = importlib.util.spec_from_file_location(f"{name.replace('-', '_')}_index", directory / "index.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+  finally:
+    sys.path.remove(str(directory))
+  return module
+
+
+def event(prefix: str, method: str, params: Optional[dict] = None, body: Optional[dict] = None) -> dict:
+  path = f"{prefix}/batch" if body is not None else f"{prefix}/"
+  return {
+    "version": "2.0",
+    "routeKey": "$default",
+    "rawPath": path,
+    "rawQueryString": "",
+    "headers": {"content-type": "application/json"},
+    "queryStringParameters": params,
+    "body": json.dumps(body) if body is not None else None,
+    "requestContext": {
+      "http": {"method": method, "path": path, "sourceIp": "127.0.0.1", "protocol": "HTTP/1.1", "userAgent": "benchmark"},
+      "requestId": str(uuid.uuid4()),
+      "routeKey": "$default",
+      "stage": "$default",
+      "accountId": "000000000000",
+      "apiId": "benchmark",
+      "domainName": "localhost",
+      "domainPrefix": "localhost",
+      "time": "",
+      "timeEpoch": 0,
+    },
+    "isBase64Encoded": False,
+  }
+
+
+def recall(found: List[str], relevant: List[str], limit: int) -> float:
+  if not relevant:
+    return 1.0
+  return len(set(found) & set(relevant)) / min(len(relevant), limit)
+
+
+def run(name: str, cases: List[dict], requests: int, send: Callable[[List[dict]], List[List[str]]], batch: int, limit: int) -> dict:
+  """Sends `requests` requests of `batch` cases each, cycling through the cases."""
+  send(cases[:batch])  # builds the lazily indexed fields outside the measurement
+  latencies, recalls = [], []
+  started = time.perf_counter()
+  for number in range(requests):
+    chunk = [cases[(number * batch + offset) % len(cases)] for offset in range(batch)]
+    request_started = time.perf_counter()
+    found = send(chunk)
+    latencies.append((time.perf_counter() - request_started) * 1000)
+    recalls.extend(recall(ids, case["relevant"], limit) for ids, case in zip(found, chunk))
+  elapsed = time.perf_counter() - started
+  latencies.sort()
+  return {
+    "handler": name,
+    "requests": requests,
+    "queries_per_second": round(requests * batch / elapsed, 1),
+    "p50_ms": round(statistics.median(latencies), 2),
+    "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+    "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    f"recall@{limit}": round(statistics.mean(recalls), 3),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--faqs", type=int, default=2000, help="generated FAQ documents")
+  parser.add_argument("--items", type=int, default=20000, help="generated items")
+  parser.add_argument("--queries", type=int, default=200, help="generated queries per handler")
+  parser.add_argument("--requests", type=int, default=500)
+  parser.add_argument("--limit", type=int, default=5)
+  parser.add_argument("--knowledge-snapshot")
+  parser.add_argument("--knowledge-queries")
+  parser.add_argument("--item-snapshot")
+  parser.add_argument("--item-queries")
+  parser.add_argument("--seed", type=int, default=7)
+  parser.add_argument("--json", action="store_true", help="print results as JSON")
+  args = parser.parse_args()
+  rng = random.Random(args.seed)
+  workdir = Path(tempfile.mkdtemp(prefix="search-benchmark-"))
+
+  if args.knowledge_snapshot:
+    knowledge_snapshot, knowledge_cases = args.knowledge_snapshot, read_ndjson(args.knowledge_queries)
+  else:
+    hits, knowledge_cases = generate_faqs(args.faqs, args.queries, rng)
+    knowledge_snapshot = workdir / "knowledge.ndjson"
+    write_ndjson(knowledge_snapshot, hits)
+  if args.item_snapshot:
+    item_snapshot, item_cases = args.item_snapshot, read_ndjson(args.item_queries)
+  else:
+    hits, item_cases = generate_items(args.items, args.queries, rng)
+    item_snapshot = workdir / "item.ndjson"
+    write_ndjson(item_snapshot, hits)
+
+  knowledge = load_handler("knowledge-search", {
+    "INDEX_NAME": "knowledge",
+    "LOCAL_SEARCH_SNAPSHOT": str(knowledge_snapshot),
+    "QUERY_CACHE_TABLE_NAME": "",
+  })
+  # query embeddings come with the queries instead of Bedrock
+  vectors = {case["query"]: case["vector"] for case in knowledge_cases}
+  knowledge.get_embedding = vectors.get
+  item = load_handler("item-search", {"INDEX_NAME": "item", "LOCAL_SEARCH_SNAPSHOT": str(item_snapshot)})
+
+  def search_knowledge(chunk: List[dict]) -> List[List[str]]:
+    params = {"query": chunk[0]["query"], "limit": str(args.limit)}
+    body = json.loads(knowledge.lambda_handler(event("/v1/search/knowledge", "GET", params), Context())["body"])
+    return [[result["id"] for result in body["content"]]]
+
+  def search_item(chunk: List[dict]) -> List[List[str]]:
+    params = {"name": chunk[0]["name"], "category": chunk[0]["category"], "limit": str(args.limit), "fields": "id"}
+    body = json.loads(item.lambda_handler(event("/v1/search/item", "GET", params), Context())["body"])
+    return [[str(source["id"]) for source in body["content"]]]
+
+  def search_item_batch(chunk: List[dict]) -> List[List[str]]:
+    queries = [{"name": case["name"], "category": case["category"], "limit": args.limit, "fields": "id"} for case in chunk]
+    body = json.loads(item.lambda_handler(event("/v1/search/item", "POST", body={"queries": queries}), Context())["body"])
+    return [[str(source["id"]) for source in result["content"]] for result in body["results"]]
+
+  results = [
+    run("knowledge-search", knowledge_cases, args.requests, search_knowledge, 1, args.limit),
+    run("item-search", item_cases, args.requests, search_item, 1, args.limit),
+    run("item-search batch", item_cases, max(1, args.requests // 10), search_item_batch, 10, args.limit),
+  ]
+
+  if args.json:
+    print(json.dumps(results, indent=2))
+  else:
+    recall_key = f"recall@{args.limit}"
+    print(f"{'handler':<20}{'requests':>10}{'queries/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{recall_key:>11}")
+    for result in results:
+      print(
+        f"{result['handler']:<20}{result['requests']:>10}{result['queries_per_second']:>11}"
+        f"{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}{result[recall_key]:>11}"
+      )
+
+
+if __name__ == "__main__":
+  main()
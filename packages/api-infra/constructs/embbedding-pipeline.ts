@@ -8,6 +8,7 @@ import * as sns_subscriptions from "aws-cdk-lib/aws-sns-subscriptions";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as lambda_event_sources from "aws-cdk-lib/aws-lambda-event-sources";
 import * as iam from "aws-cdk-lib/aws-iam";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import * as oss from "aws-cdk-lib/aws-opensearchservice";
 import { Construct } from "constructs";
 import * as path from "path";
@@ -25,6 +26,7 @@ export class EmbeddingPipeline extends Construct {
   public readonly processingQueue: sqs.IQueue;
   public readonly notificationTopic: sns.ITopic;
   public readonly embedderFunction: lambda.IFunction;
+  public readonly embeddingCacheTable: dynamodb.ITable;
 
   constructor(scope: Construct, id: string, props: IProps) {
     super(scope, id);
@@ -53,6 +55,9 @@ export class EmbeddingPipeline extends Construct {
       })
     );
 
+    // Embedding cache shared by all embedder invocations
+    this.embeddingCacheTable = this.createEmbeddingCacheTable();
+
     // Lambda Role
     const role = new iam.Role(this, "Role", {
       assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -102,6 +107,7 @@ export class EmbeddingPipeline extends Construct {
     props.osDomain.grantReadWrite(role);
     this.inputBucket.grantRead(role);
     this.processingQueue.grantConsumeMessages(role);
+    this.embeddingCacheTable.grantReadWriteData(role);
 
     this.embedderFunction = this.createEmbedderFunction(props, role);
     // Set SQS queue as Lambda event source
@@ -150,6 +156,22 @@ export class EmbeddingPipeline extends Construct {
     });
   }
 
+  private createEmbeddingCacheTable(): dynamodb.ITable {
+    const isProd = this.node.tryGetContext("isProd") as boolean;
+
+    return new dynamodb.Table(this, "EmbeddingCacheTable", {
+      partitionKey: {
+        name: "pk",
+        type: dynamodb.AttributeType.STRING,
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      timeToLiveAttribute: "expires_at",
+      removalPolicy: isProd
+        ? cdk.RemovalPolicy.RETAIN
+        : cdk.RemovalPolicy.DESTROY,
+    });
+  }
+
   private createNotificationTopic(): sns.ITopic {
     return new sns.Topic(this, "Topic", {
       displayName: "Embedding Pipeline Notification Topic",
@@ -191,6 +213,7 @@ export class EmbeddingPipeline extends Construct {
         OPENSEARCH_HOST: `${props.osDomain.domainEndpoint}`,
         INDEX_NAME: props.indexName,
         EMBEDDING_MODEL_ARN: props.embeddingModelArn,
+        EMBEDDING_CACHE_TABLE_NAME: this.embeddingCacheTable.tableName,
       },
       securityGroups: [props.osSecurityGroup],
       tracing: lambda.Tracing.ACTIVE,
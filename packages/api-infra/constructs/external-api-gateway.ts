@@ -1,10 +1,12 @@
 import * as path from "path";
+import * as crypto from "crypto";
 import * as cdk from "aws-cdk-lib";
 import * as apigw from "aws-cdk-lib/aws-apigatewayv2";
 import * as authorizers from "aws-cdk-lib/aws-apigatewayv2-authorizers";
 import * as cognito from "aws-cdk-lib/aws-cognito";
 import * as iam from "aws-cdk-lib/aws-iam";
 import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as ssm from "aws-cdk-lib/aws-ssm";
 import { Construct } from "constructs";
 
 interface IProps {
@@ -81,6 +83,20 @@ export class HttpAPIGateway extends Construct {
       })
     );
 
+    // the configured key is deploy-owned, its hash changes with the config
+    const defaultKeyHash = `default:${crypto
+      .createHash("sha256")
+      .update(authApiKey)
+      .digest("hex")}`;
+    // more keys as `label:sha256` entries, add or remove entries to rotate keys without a deploy.
+    // The parameter is created by hand, outside this stack, so a deploy never overwrites its keys.
+    const apiKeyHashes = ssm.StringParameter.fromStringParameterName(
+      this,
+      "ApiKeyHashes",
+      `/${ns}/external-api/extra-key-hashes`
+    );
+    apiKeyHashes.grantRead(role);
+
     const fn = new lambda.Function(this, "LambdaAuthorizerFunction", {
       functionName: `${ns}HttpLambdaAuthorizer`,
       code: lambda.Code.fromAsset(
@@ -92,13 +108,19 @@ export class HttpAPIGateway extends Construct {
       timeout: cdk.Duration.seconds(3),
       memorySize: 256,
       environment: {
-        API_KEY: authApiKey,
+        API_KEY_HASHES: defaultKeyHash,
+        API_KEYS_PARAMETER_NAME: apiKeyHashes.parameterName,
+        API_KEYS_REFRESH_SECONDS: "300",
+        LOG_SAMPLE_RATE: "0.01",
       },
       layers,
       role,
     });
     return new authorizers.HttpLambdaAuthorizer("LambdaAuthorizer", fn, {
       responseTypes: [authorizers.HttpLambdaResponseType.SIMPLE],
+      // repeat requests with the same key skip the authorizer, revoked keys stay valid up to this long
+      identitySource: ["$request.header.Authorization"],
+      resultsCacheTtl: cdk.Duration.minutes(5),
     });
   }
 }
@@ -1,21 +1,129 @@
 import os
+import hmac
+import time
+import random
+import hashlib
+from typing import List, Optional, Tuple
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.data_classes.api_gateway_authorizer_event import (
     APIGatewayAuthorizerEventV2,
 )
 
-API_KEY = os.environ["API_KEY"]
+# comma or newline separated `label:sha256-hex` entries of accepted keys
+API_KEY_HASHES = os.environ.get("API_KEY_HASHES", "")
+# SSM parameter with more entries in the same format, so keys can be rotated without a deploy
+API_KEYS_PARAMETER_NAME = os.environ.get("API_KEYS_PARAMETER_NAME", "")
+API_KEYS_REFRESH_SECONDS = int(os.environ.get("API_KEYS_REFRESH_SECONDS", 300))
+# plaintext key of older deployments, hashed on load
+API_KEY = os.environ.get("API_KEY", "")
+# fraction of invocations logging their (debug level) request summary
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+assert API_KEY_HASHES or API_KEYS_PARAMETER_NAME or API_KEY, "No API keys configured"
 
 tracer = Tracer(service="authorizer")
-logger = Logger(service="authorizer")
+logger = Logger(service="authorizer", sampling_rate=LOG_SAMPLE_RATE)
+
+
+def hash_key(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
+def parse_key_hashes(value: str) -> List[Tuple[str, bytes]]:
+    """Parses `label:sha256-hex` entries, an entry without a label is labelled by its digest prefix."""
+    keys = []
+    for entry in value.replace("\n", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        label, _, digest = entry.rpartition(":")
+        try:
+            expected = bytes.fromhex(digest)
+        except ValueError:
+            expected = b""
+        if len(expected) != hashlib.sha256().digest_size:
+            logger.warning(f"Ignoring malformed API key hash entry labelled '{label}'")
+            continue
+        keys.append((label or digest[:8], expected))
+    return keys
+
+
+# keys of this container, the parameter is re-read every API_KEYS_REFRESH_SECONDS once it has been read
+_static_keys = parse_key_hashes(API_KEY_HASHES) + ([("legacy", hash_key(API_KEY))] if API_KEY else [])
+_parameter_keys: List[Tuple[str, bytes]] = []
+_parameter_loaded = False
+_parameter_failures = 0
+_parameter_next_load = float("-inf")
+# until the first successful read, failed reads are retried after a short jittered backoff
+API_KEYS_RETRY_BASE_SECONDS = 0.5
+API_KEYS_RETRY_MAX_SECONDS = 10
+
+
+def load_parameter_keys() -> List[Tuple[str, bytes]]:
+    """Returns the keys of the SSM parameter, keeping the last known keys if it cannot be read."""
+    global _parameter_keys, _parameter_loaded, _parameter_failures, _parameter_next_load
+    if not API_KEYS_PARAMETER_NAME or time.monotonic() < _parameter_next_load:
+        return _parameter_keys
+    # imported on first use, keeps boto3 out of the import time when no parameter is configured
+    import boto3
+
+    ssm = boto3.client("ssm")
+    try:
+        response = ssm.get_parameter(Name=API_KEYS_PARAMETER_NAME, WithDecryption=True)
+        _parameter_keys = parse_key_hashes(response["Parameter"]["Value"])
+        logger.info(f"Loaded {len(_parameter_keys)} API keys from {API_KEYS_PARAMETER_NAME}")
+    except ssm.exceptions.ParameterNotFound:
+        # the parameter is managed outside the stack, without it only the static keys are accepted
+        _parameter_keys = []
+        logger.info(f"No API keys parameter {API_KEYS_PARAMETER_NAME}")
+    except Exception as e:
+        if _parameter_loaded:
+            # the last known keys stay valid, a throttled SSM is not hit on every request
+            logger.warning(f"Failed to refresh API keys from {API_KEYS_PARAMETER_NAME}: {e}")
+            _parameter_next_load = time.monotonic() + API_KEYS_REFRESH_SECONDS
+        else:
+            backoff = min(API_KEYS_RETRY_MAX_SECONDS, API_KEYS_RETRY_BASE_SECONDS * 2 ** _parameter_failures)
+            _parameter_failures += 1
+            logger.warning(f"Failed to load API keys from {API_KEYS_PARAMETER_NAME}, retrying in up to {backoff}s: {e}")
+            _parameter_next_load = time.monotonic() + random.uniform(0, backoff)
+        return _parameter_keys
+    _parameter_loaded = True
+    _parameter_failures = 0
+    _parameter_next_load = time.monotonic() + API_KEYS_REFRESH_SECONDS
+    return _parameter_keys
+
+
+def authorize(key: Optional[str]) -> Optional[str]:
+    """Returns the label of the matching key, comparing against every key in constant time."""
+    if not key:
+        return None
+    digest = hash_key(key)
+    matched = None
+    for label, expected in _static_keys + load_parameter_keys():
+        # no early exit, so the time taken does not depend on which key matched
+        if hmac.compare_digest(digest, expected) and matched is None:
+            matched = label
+    return matched
 
 
 @tracer.capture_lambda_handler
 def lambda_handler(event, _) -> dict:
+    logger.refresh_sample_rate_calculation()
     event = APIGatewayAuthorizerEventV2(event)
-    logger.info(f"Authorizing request with headers: {event}")
+    key_id = authorize(event.get_header_value("Authorization"))
+    summary = {
+        "route_arn": event.route_arn,
+        "request_id": event.request_context.request_id,
+        "source_ip": event.request_context.http.source_ip,
+    }
+
+    if key_id is None:
+        logger.warning("Denied request", extra=summary)
+        return {"isAuthorized": False}
 
+    logger.debug("Authorized request", extra={**summary, "key_id": key_id})
+    # API Gateway caches this response per Authorization header for the authorizer's results TTL
     return {
-        "isAuthorized": event.get_header_value("Authorization") == API_KEY,
+        "isAuthorized": True,
+        "context": {"keyId": key_id},
     }
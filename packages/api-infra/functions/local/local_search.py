@@ -0,0 +1,397 @@
+"""
+In-process search engine for load tests and benchmarks of the search handlers.
+
+Runs the subset of the OpenSearch query DSL the handlers send against an NDJSON snapshot:
+`match`, `multi_match` (best_fields), `bool`, `term`, `match_all`, `knn` and `hybrid`, with
+`sort`, `search_after`, `from`/`size` and `_source` filtering. Text fields get a BM25 inverted
+index, vector fields a dense matrix searched by brute force, and hybrid queries are combined
+with the normalization processor of the search pipeline the handler passes in, so keyword and
+vector weights behave as in the `knowledge-search-pipeline`.
+
+Differences from OpenSearch, acceptable for measuring handler throughput and recall:
+- text is lowercased words, non-ASCII words are split into character bigrams instead of nori morphemes
+- min-max normalization runs over every matching document instead of each shard's top hits
+- a single shard, so scores are not affected by shard-local statistics
+
+Snapshot lines are search hits (`{"_index": ..., "_id": ..., "_source": {...}}`, e.g. written by
+`export_snapshot`) or bare documents, which are searched under any index name.
+"""
+import json
+import math
+import re
+import time
+import unicodedata
+from fnmatch import fnmatch
+from functools import cmp_to_key
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from search_backend import SearchBackend
+
+WORD = re.compile(r"\w+")
+# Lucene BM25 defaults
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_SIZE = 10
+
+
+def analyze(text: Any) -> List[str]:
+    """Splits text into lowercased words, non-ASCII words into character bigrams."""
+    terms = []
+    for word in WORD.findall(unicodedata.normalize("NFKC", str(text)).casefold()):
+        if word.isascii() or len(word) < 3:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+class TextField:
+    """BM25 inverted index of one text field."""
+
+    def __init__(self, values: List[Any]):
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(values), dtype=np.float32)
+        for doc, value in enumerate(values):
+            if value is None:
+                continue
+            terms = [term for item in (value if isinstance(value, list) else [value]) for term in analyze(item)]
+            lengths[doc] = len(terms)
+            for term in terms:
+                counts = postings.setdefault(term, {})
+                counts[doc] = counts.get(doc, 0) + 1
+        self.size = len(values)
+        self.lengths = lengths
+        self.average_length = float(lengths.mean()) if len(values) and lengths.any() else 1.0
+        self.postings = {
+            term: (np.fromiter(counts.keys(), dtype=np.int64), np.fromiter(counts.values(), dtype=np.float32))
+            for term, counts in postings.items()
+        }
+
+    def score(self, terms: Iterable[str]) -> np.ndarray:
+        """Sums the BM25 score of every query term, documents without any term score 0."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, frequencies = posting
+            idf = math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[docs] / self.average_length)
+            scores[docs] += idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+        return scores
+
+
+class VectorField:
+    """Unit-normalized dense matrix of one vector field, searched by brute force."""
+
+    def __init__(self, values: List[Any]):
+        dimension = next((len(value) for value in values if isinstance(value, list)), 0)
+        self.matrix = np.zeros((len(values), dimension), dtype=np.float32)
+        self.present = np.zeros(len(values), dtype=bool)
+        for doc, value in enumerate(values):
+            if isinstance(value, list) and len(value) == dimension:
+                self.matrix[doc] = value
+                self.present[doc] = True
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms > 0, norms, 1)
+
+    def knn(self, vector: List[float], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns cosine similarity scores, as OpenSearch's `cosinesimil` space reports them, and the top-k mask."""
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (self.matrix.shape[1],):
+            raise ValueError(f"Query vector has dimension {query.size}, the field has {self.matrix.shape[1]}")
+        norm = np.linalg.norm(query)
+        similarities = self.matrix @ (query / norm if norm else query)
+        scores = np.where(self.present, 1 / (2 - similarities), 0).astype(np.float32)
+        matched = np.zeros(len(scores), dtype=bool)
+        candidates = np.flatnonzero(self.present)
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        matched[candidates] = True
+        return np.where(matched, scores, 0), matched
+
+
+def parse_field(field: str) -> Tuple[str, float]:
+    """Splits a `name^boost` field."""
+    name, _, boost = field.partition("^")
+    return name, float(boost) if boost else 1.0
+
+
+def parse_sort(sort: Any) -> List[Tuple[str, bool]]:
+    """Returns `(field, descending)` pairs, sorting by score when no sort is given."""
+    fields = []
+    for item in sort if isinstance(sort, list) else [sort] if sort else ["_score"]:
+        if isinstance(item, str):
+            fields.append((item, item == "_score"))
+            continue
+        (field, order), = item.items()
+        order = order.get("order", "desc" if field == "_score" else "asc") if isinstance(order, dict) else order
+        fields.append((field, order == "desc"))
+    return fields
+
+
+def compare_values(a: Any, b: Any) -> int:
+    """Orders missing values last, then by value."""
+    if a is None or b is None:
+        return (a is None) - (b is None)
+    return (a > b) - (a < b)
+
+
+def filter_source(source: dict, spec: Any) -> Optional[dict]:
+    """Applies a `_source` filter to top-level fields."""
+    if spec is False:
+        return None
+    if spec is None or spec is True:
+        return source
+    if isinstance(spec, (str, list)):
+        spec = {"includes": [spec] if isinstance(spec, str) else spec}
+    includes, excludes = spec.get("includes") or [], spec.get("excludes") or []
+    return {
+        key: value
+        for key, value in source.items()
+        if (not includes or any(fnmatch(key, pattern) for pattern in includes))
+        and not any(fnmatch(key, pattern) for pattern in excludes)
+    }
+
+
+class LocalIndex:
+    """Documents of one index, with text and vector fields indexed on first use."""
+
+    def __init__(self, name: Optional[str], ids: List[str], sources: List[dict]):
+        self.name = name
+        self.ids = ids
+        self.sources = sources
+        self.text_fields: Dict[str, TextField] = {}
+        self.vector_fields: Dict[str, VectorField] = {}
+
+    def values(self, field: str) -> List[Any]:
+        return [source.get(field) for source in self.sources]
+
+    def text_field(self, field: str) -> TextField:
+        if field not in self.text_fields:
+            self.text_fields[field] = TextField(self.values(field))
+        return self.text_fields[field]
+
+    def vector_field(self, field: str) -> VectorField:
+        if field not in self.vector_fields:
+            self.vector_fields[field] = VectorField(self.values(field))
+        return self.vector_fields[field]
+
+    def evaluate(self, query: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the score and match mask of every document."""
+        (kind, spec), = query.items()
+        size = len(self.ids)
+        if kind == "match_all":
+            return np.full(size, float(spec.get("boost", 1.0)), dtype=np.float32), np.ones(size, dtype=bool)
+        if kind == "match":
+            (field, value), = spec.items()
+            options = value if isinstance(value, dict) else {"query": value}
+            scores = self.text_field(field).score(analyze(options["query"])) * float(options.get("boost", 1.0))
+            return scores, scores > 0
+        if kind == "multi_match":
+            if spec.get("type", "best_fields") != "best_fields":
+                raise ValueError(f"Unsupported multi_match type: {spec['type']}")
+            terms = analyze(spec["query"])
+            per_field = np.stack([
+                self.text_field(name).score(terms) * boost
+                for name, boost in map(parse_field, spec["fields"])
+            ])
+            best = per_field.max(axis=0)
+            scores = best + float(spec.get("tie_breaker", 0.0)) * (per_field.sum(axis=0) - best)
+            return scores, scores > 0
+        if kind == "term":
+            (field, value), = spec.items()
+            value = value.get("value") if isinstance(value, dict) else value
+            matched = np.fromiter(
+                (field_value == value for field_value in self.values(field)), dtype=bool, count=size
+            )
+            return matched.astype(np.float32), matched
+        if kind == "bool":
+            return self.evaluate_bool(spec)
+        if kind == "knn":
+            (field, options), = spec.items()
+            return self.vector_field(field).knn(options["vector"], int(options.get("k", DEFAULT_SIZE)))
+        raise ValueError(f"Unsupported query: {kind}")
+
+    def evaluate_bool(self, spec: dict) -> Tuple[np.ndarray, np.ndarray]:
+        size = len(self.ids)
+        scores = np.zeros(size, dtype=np.float32)
+        matched = np.ones(size, dtype=bool)
+        clauses = {occur: spec.get(occur) or [] for occur in ("must", "should", "filter", "must_not")}
+        clauses = {occur: queries if isinstance(queries, list) else [queries] for occur, queries in clauses.items()}
+        for query in clauses["must"]:
+            clause_scores, clause_matched = self.evaluate(query)
+            scores += clause_scores
+            matched &= clause_matched
+        for query in clauses["filter"]:
+            matched &= self.evaluate(query)[1]
+        for query in clauses["must_not"]:
+            matched &= ~self.evaluate(query)[1]
+        if clauses["should"]:
+            any_should = np.zeros(size, dtype=bool)
+            for query in clauses["should"]:
+                clause_scores, clause_matched = self.evaluate(query)
+                scores += clause_scores
+                any_should |= clause_matched
+            # should clauses are optional next to a must or filter clause
+            if not (clauses["must"] or clauses["filter"]):
+                matched &= any_should
+        return np.where(matched, scores, 0), matched
+
+    def hybrid(self, queries: List[dict], pipeline: Optional[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Normalizes each sub-query's scores and combines them as the pipeline's normalization processor does."""
+        processor = {}
+        for phase in (pipeline or {}).get("phase_results_processors", []):
+            processor = phase.get("normalization-processor", processor)
+        normalization = processor.get("normalization", {}).get("technique", "min_max")
+        combination = processor.get("combination", {})
+        if normalization != "min_max" or combination.get("technique", "arithmetic_mean") != "arithmetic_mean":
+            raise ValueError(f"Unsupported normalization processor: {processor}")
+        weights = combination.get("parameters", {}).get("weights") or [1.0 / len(queries)] * len(queries)
+
+        combined = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.zeros(len(self.ids), dtype=bool)
+        for query, weight in zip(queries, weights):
+            scores, query_matched = self.evaluate(query)
+            if not query_matched.any():
+                continue
+            low, high = scores[query_matched].min(), scores[query_matched].max()
+            # a single distinct score normalizes to 1, as in the neural search plugin
+            normalized = (scores - low) / (high - low) if high > low else np.ones_like(scores)
+            # documents missing from a sub-query count as 0 with their weight, so they rank lower
+            combined += weight * np.where(query_matched, normalized, 0)
+            matched |= query_matched
+        return combined / sum(weights), matched
+
+    def sort_values(self, doc: int, score: float, sort: List[Tuple[str, bool]]) -> List[Any]:
+        values = []
+        for field, _ in sort:
+            if field == "_score":
+                values.append(score)
+            elif field == "_id":
+                values.append(self.ids[doc])
+            else:
+                values.append(self.sources[doc].get(field))
+        return values
+
+    def search(self, body: dict, pipeline: Optional[dict] = None, index_name: Optional[str] = None) -> dict:
+        """Runs a search request body and returns an OpenSearch shaped response."""
+        started = time.perf_counter()
+        query = body.get("query") or {"match_all": {}}
+        if "hybrid" in query:
+            scores, matched = self.hybrid(query["hybrid"]["queries"], pipeline)
+        else:
+            scores, matched = self.evaluate(query)
+        candidates = np.flatnonzero(matched)
+        start = int(body.get("from", 0))
+        size = int(body.get("size", DEFAULT_SIZE))
+        sort = parse_sort(body.get("sort"))
+        search_after = body.get("search_after")
+
+        # narrow by score first, only the documents around the page are sorted in Python
+        if sort[0] == ("_score", True):
+            keep = start + size
+            if search_after:
+                candidates = candidates[scores[candidates] <= search_after[0]]
+                # hits tied with the cursor may sort before it, keep enough to fill the page after them
+                keep += int((scores[candidates] == search_after[0]).sum())
+            if len(candidates) > keep:
+                threshold = np.partition(scores[candidates], len(candidates) - keep)[len(candidates) - keep]
+                candidates = candidates[scores[candidates] >= threshold]
+
+        def compare(a: List[Any], b: List[Any]) -> int:
+            for (_, descending), value_a, value_b in zip(sort, a, b):
+                order = compare_values(value_a, value_b)
+                if order:
+                    return -order if descending and value_a is not None and value_b is not None else order
+            return 0
+
+        ranked = [(int(doc), self.sort_values(int(doc), float(scores[doc]), sort)) for doc in candidates]
+        if search_after:
+            ranked = [(doc, values) for doc, values in ranked if compare(values, search_after) > 0]
+        # documents with equal sort values keep snapshot order
+        ranked.sort(key=cmp_to_key(lambda a, b: compare(a[1], b[1]) or a[0] - b[0]))
+
+        hits = []
+        for doc, values in ranked[start:start + size]:
+            hit = {"_index": self.name or index_name, "_id": self.ids[doc], "_score": float(scores[doc])}
+            source = filter_source(self.sources[doc], body.get("_source"))
+            if source is not None:
+                hit["_source"] = source
+            if "sort" in body:
+                hit["sort"] = values
+            hits.append(hit)
+        return {
+            "took": int((time.perf_counter() - started) * 1000),
+            "timed_out": False,
+            "hits": {
+                "total": {"value": int(matched.sum()), "relation": "eq"},
+                "max_score": float(scores[candidates].max()) if len(candidates) else None,
+                "hits": hits,
+            },
+        }
+
+
+class LocalSearchBackend(SearchBackend):
+    """Searches snapshot documents in-process, with search pipelines given by name."""
+
+    def __init__(self, indices: Dict[Optional[str], LocalIndex], pipelines: Optional[Dict[str, dict]] = None):
+        self.indices = indices
+        self.pipelines = pipelines or {}
+
+    @classmethod
+    def from_snapshot(cls, path: str, pipelines: Optional[Dict[str, dict]] = None) -> "LocalSearchBackend":
+        """Loads an NDJSON snapshot of hits or bare documents."""
+        if not path:
+            raise ValueError("LOCAL_SEARCH_SNAPSHOT is not set")
+        documents: Dict[Optional[str], Tuple[List[str], List[dict]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                if not line.strip():
+                    continue
+                document = json.loads(line)
+                if "_source" in document:
+                    name, doc_id, source = document.get("_index"), document.get("_id"), document["_source"]
+                else:
+                    name, doc_id, source = None, document.get("id"), document
+                ids, sources = documents.setdefault(name, ([], []))
+                ids.append(str(doc_id if doc_id is not None else number))
+                sources.append(source)
+        indices = {name: LocalIndex(name, ids, sources) for name, (ids, sources) in documents.items()}
+        return cls(indices, pipelines=pipelines)
+
+    def index(self, name: str) -> LocalIndex:
+        index = self.indices.get(name) or self.indices.get(None)
+        if index is None:
+            raise ValueError(f"Index {name} is not in the snapshot")
+        return index
+
+    def search(self, index: str, body: dict, params: Optional[dict] = None) -> dict:
+        pipeline_name = (params or {}).get("search_pipeline")
+        if pipeline_name and pipeline_name not in self.pipelines:
+            raise ValueError(f"Search pipeline {pipeline_name} is not defined")
+        return self.index(index).search(body, self.pipelines.get(pipeline_name), index_name=index)
+
+    def msearch(self, index: str, bodies: List[dict]) -> List[dict]:
+        responses = []
+        for body in bodies:
+            try:
+                responses.append({**self.search(index, body), "status": 200})
+            except (KeyError, TypeError, ValueError) as e:
+                responses.append({"error": {"type": "parsing_exception", "reason": str(e)}, "status": 400})
+        return responses
+
+
+def export_snapshot(client: Any, index: str, path: str) -> int:
+    """Writes every document of an OpenSearch index as snapshot lines, returns the number written."""
+    from opensearchpy import helpers
+
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for hit in helpers.scan(client, index=index, query={"query": {"match_all": {}}}):
+            line = {"_index": hit["_index"], "_id": hit["_id"], "_source": hit["_source"]}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            written += 1
+    return written
@@ -0,0 +1,173 @@
+import json
+import time
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from opensearchpy import OpenSearch, exceptions as os_exceptions
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+# Per-item and whole-request statuses that are worth retrying, anything else is a permanent failure
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+@dataclass
+class BulkEntry:
+  """One buffered bulk action, serialized once when buffered."""
+  doc_id: str
+  owner: str
+  lines: str
+  size: int
+
+
+@dataclass
+class BulkStats:
+  """Counters across flushes, reset at the start of every batch."""
+  flushes: int = 0
+  indexed: int = 0
+  deleted: int = 0
+  failed: int = 0
+  retried: int = 0
+  failed_owners: Set[str] = field(default_factory=set)
+
+  def as_dict(self) -> Dict[str, Any]:
+    return {
+      "flushes": self.flushes,
+      "indexed": self.indexed,
+      "deleted": self.deleted,
+      "failed": self.failed,
+      "retried": self.retried,
+      "failed_owners": len(self.failed_owners),
+    }
+
+
+class BulkWriter:
+  """
+  Buffers bulk actions across documents and records and flushes them by byte size or action count.
+
+  Items rejected with a retryable status (429 and 5xx) are retried alone with jittered exponential
+  backoff. Every action is tagged with an owner (the SQS message ID), so failures that remain after
+  the retries can be mapped back to the records that produced them.
+
+  The client is obtained through `get_client` on each flush, so it can be created lazily.
+  """
+
+  def __init__(
+    self,
+    get_client: Callable[[], OpenSearch],
+    index_name: str,
+    max_bytes: int = 5 * 1024 * 1024,
+    max_actions: int = 500,
+    refresh: str = "wait_for",
+    max_retries: int = 5,
+    backoff_base: float = 0.5,
+    backoff_max: float = 20,
+  ):
+    self.get_client = get_client
+    self.index_name = index_name
+    self.max_bytes = max_bytes
+    self.max_actions = max_actions
+    self.refresh = refresh
+    self.max_retries = max_retries
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+    self.entries: List[BulkEntry] = []
+    self.buffered_bytes = 0
+    self.stats = BulkStats()
+
+  def reset(self):
+    """Drops buffered actions and counters, called before each batch."""
+    self.entries = []
+    self.buffered_bytes = 0
+    self.stats = BulkStats()
+
+  def index(self, doc_id: str, document: Dict[str, Any], owner: str):
+    """Buffers an index action, flushing first if the buffer would exceed its limits."""
+    action = json.dumps({"index": {"_index": self.index_name, "_id": doc_id}})
+    self._add(doc_id, owner, f"{action}\n{json.dumps(document)}\n")
+
+  def delete(self, doc_id: str, owner: str):
+    """Buffers a delete action."""
+    self._add(doc_id, owner, json.dumps({"delete": {"_index": self.index_name, "_id": doc_id}}) + "\n")
+
+  def _add(self, doc_id: str, owner: str, lines: str):
+    size = len(lines.encode("utf-8"))
+    if self.entries and (self.buffered_bytes + size > self.max_bytes or len(self.entries) >= self.max_actions):
+      self.flush()
+    self.entries.append(BulkEntry(doc_id=doc_id, owner=owner, lines=lines, size=size))
+    self.buffered_bytes += size
+
+  def flush(self):
+    """Sends buffered actions, retrying only the items that were rejected with a retryable status."""
+    entries, self.entries, self.buffered_bytes = self.entries, [], 0
+    if not entries:
+      return
+
+    self.stats.flushes += 1
+    logger.info(f"Bulk flushing {len(entries)} actions ({sum(entry.size for entry in entries)} bytes).")
+    attempt = 0
+    while entries:
+      retry: List[BulkEntry] = []
+      failed: List[BulkEntry] = []
+      try:
+        response = self.get_client().bulk(
+          index=self.index_name,
+          body="".join(entry.lines for entry in entries),
+          refresh=self.refresh,
+        )
+      except (os_exceptions.ConnectionError, os_exceptions.TransportError) as e:
+        status = getattr(e, "status_code", None)
+        if isinstance(e, os_exceptions.ConnectionError) or status in RETRYABLE_STATUSES:
+          logger.warning(f"Bulk request failed with {status or 'connection error'}, retrying {len(entries)} actions: {e}")
+          retry = entries
+        else:
+          logger.error(f"Bulk request failed with {status}: {e}")
+          failed = entries
+      except Exception as e:
+        # The entries are no longer buffered, so every owner in the batch must be reported as failed
+        logger.exception(f"Bulk request of {len(entries)} actions failed: {e}")
+        failed = entries
+      else:
+        items = response.get("items") if isinstance(response, dict) else None
+        if not isinstance(items, list) or len(items) != len(entries):
+          logger.error(f"Bulk response has {len(items) if isinstance(items, list) else 'no'} items for {len(entries)} actions.")
+          failed = entries
+          items = []
+        for entry, item in zip(entries, items):
+          try:
+            op, result = next(iter(item.items()))
+            status = result.get("status", 200)
+          except (AttributeError, StopIteration):
+            logger.error(f"Malformed bulk response item for document ID {entry.doc_id}: {item}")
+            failed.append(entry)
+            continue
+          if "error" not in result:
+            if op == "delete":
+              self.stats.deleted += 1
+            else:
+              self.stats.indexed += 1
+          elif status in RETRYABLE_STATUSES:
+            retry.append(entry)
+          else:
+            logger.error(f"Error in {op} of document ID {entry.doc_id}: {result['error']}")
+            failed.append(entry)
+
+      if retry and attempt >= self.max_retries:
+        logger.error(f"Giving up on {len(retry)} bulk actions after {attempt} retries.")
+        failed.extend(retry)
+        retry = []
+      for entry in failed:
+        self.stats.failed += 1
+        self.stats.failed_owners.add(entry.owner)
+      if retry:
+        self.stats.retried += len(retry)
+        # Full jitter spreads retries of concurrent functions hitting the same cluster
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+        attempt += 1
+      entries = retry
+
+  def is_failed(self, owner: Optional[str]) -> bool:
+    """Checks whether any action of the owner failed permanently."""
+    return owner in self.stats.failed_owners
@@ -0,0 +1,183 @@
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Iterable, Iterator, Pattern
+
+# Titan Text Embeddings V2 accepts at most 8,192 input tokens
+TITAN_MAX_TOKENS = 8192
+# `token` chunks are capped below the limit, since estimate_tokens undercounts dense ASCII
+TITAN_CHUNK_MAX_TOKENS = TITAN_MAX_TOKENS * 3 // 4
+
+# Sentence ends (latin and CJK punctuation, optionally closed by quotes/brackets) followed by whitespace, or line breaks
+SENTENCE_BOUNDARY = re.compile(r"[.!?…。！？][\"'”’)\]]*\s+|\n+")
+# Blank lines between paragraphs
+PARAGRAPH_BOUNDARY = re.compile(r"\n[ \t]*\n\s*")
+# Characters at the end of a piece held back as the possible start of a boundary completed by the next piece
+BOUNDARY_MAX_PREFIX = 64
+
+
+def estimate_tokens(text: str) -> int:
+  """
+  Estimates Titan tokens without the tokenizer, about 4 ASCII characters or 1 non-ASCII character (e.g. Hangul) per token.
+
+  Only an estimate: dense ASCII such as URLs, code and digits has more tokens than counted here.
+  """
+  # ratios of estimate_tokens in packages/app/src/services/history_manager.py, calibrated on chat history, not documents
+  non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+  return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+class Chunker(ABC):
+  """Splits streamed text into chunks for embedding."""
+
+  @abstractmethod
+  def chunks(self, texts: Iterable[str]) -> Iterator[str]:
+    """Yields chunks from text pieces in a single pass, a piece may end anywhere, even mid-sentence."""
+
+
+class FixedCharChunker(Chunker):
+  """Fixed-size character windows with overlap."""
+
+  def __init__(self, chunk_size: int, overlap_size: int):
+    if not 0 <= overlap_size < chunk_size:
+      raise ValueError("overlap_size must be smaller than chunk_size")
+    self.chunk_size = chunk_size
+    self.overlap_size = overlap_size
+
+  def chunks(self, texts: Iterable[str]) -> Iterator[str]:
+    stride = self.chunk_size - self.overlap_size
+    buffer = ""
+    start = 0
+    for text in texts:
+      buffer = buffer[start:] + text
+      start = 0
+      # a chunk is only final when the text ends inside it, so emit while more text follows the chunk
+      while len(buffer) - start > self.chunk_size:
+        yield buffer[start:start + self.chunk_size]
+        start += stride
+    if len(buffer) > start:
+      yield buffer[start:]
+
+
+class BoundaryChunker(Chunker):
+  """
+  Packs whole units (sentences or paragraphs) into chunks up to `chunk_size`, measured by `measure`.
+
+  The trailing units of a chunk, up to `overlap_size`, are repeated at the start of the next one.
+  Units larger than a chunk are split into equal parts.
+  """
+
+  def __init__(
+    self,
+    chunk_size: int,
+    overlap_size: int,
+    boundary: Pattern[str] = SENTENCE_BOUNDARY,
+    measure: Callable[[str], int] = len,
+  ):
+    if not 0 <= overlap_size < chunk_size:
+      raise ValueError("overlap_size must be smaller than chunk_size")
+    self.chunk_size = chunk_size
+    self.overlap_size = overlap_size
+    self.boundary = boundary
+    self.measure = measure
+
+  def units(self, texts: Iterable[str]) -> Iterator[str]:
+    """
+    Yields text up to and including each boundary, holding back a boundary that may continue in the next piece.
+
+    Units longer than `chunk_size * 4` characters are cut every `chunk_size` characters from their start, which
+    bounds the held-back text. Cuts are only made before any text a later piece could turn into a boundary, so
+    the units are the same wherever the pieces end.
+    """
+    limit = self.chunk_size * 4
+    tail = ""
+    # the held-back unit is longer than `limit`, so it is being cut
+    oversized = False
+    for text in texts:
+      buffer = tail + text
+      start = 0
+      # text before `safe` can no longer become part of a boundary
+      safe = None
+      for match in self.boundary.finditer(buffer):
+        if match.end() == len(buffer):
+          safe = match.start()
+          break
+        yield from self.cut_unit(buffer[start:match.end()], oversized)
+        start = match.end()
+        oversized = False
+      if safe is None:
+        safe = max(start, len(buffer) - BOUNDARY_MAX_PREFIX)
+      if oversized or safe - start > limit:
+        oversized = True
+        while safe - start > self.chunk_size:
+          yield buffer[start:start + self.chunk_size]
+          start += self.chunk_size
+      tail = buffer[start:]
+    if tail:
+      yield from self.cut_unit(tail, oversized)
+
+  def cut_unit(self, unit: str, oversized: bool) -> Iterator[str]:
+    """Yields a whole unit, or its `chunk_size` character cuts if it is longer than `chunk_size * 4` characters."""
+    if not oversized and len(unit) <= self.chunk_size * 4:
+      yield unit
+      return
+    for start in range(0, len(unit), self.chunk_size):
+      yield unit[start:start + self.chunk_size]
+
+  def split_unit(self, unit: str, size: int) -> Iterator[str]:
+    """Splits an oversized unit into equal parts that fit a chunk."""
+    parts = -(-size // self.chunk_size)
+    width = -(-len(unit) // parts)
+    for start in range(0, len(unit), width):
+      yield unit[start:start + width]
+
+  def chunks(self, texts: Iterable[str]) -> Iterator[str]:
+    window = deque()
+    total = 0
+    fresh = False
+    for unit in self.units(texts):
+      size = self.measure(unit)
+      pieces = [(unit, size)] if size <= self.chunk_size else [(piece, self.measure(piece)) for piece in self.split_unit(unit, size)]
+      for piece, piece_size in pieces:
+        if window and total + piece_size > self.chunk_size:
+          if fresh:
+            chunk = "".join(text for text, _ in window).strip()
+            if chunk:
+              yield chunk
+          # keep the trailing units as overlap, then make room for the new unit
+          kept = 0
+          for index in range(len(window) - 1, -1, -1):
+            if kept + window[index][1] > self.overlap_size:
+              break
+            kept += window[index][1]
+          while total > kept or (window and total + piece_size > self.chunk_size):
+            total -= window.popleft()[1]
+          fresh = False
+        window.append((piece, piece_size))
+        total += piece_size
+        fresh = True
+    if fresh:
+      chunk = "".join(text for text, _ in window).strip()
+      if chunk:
+        yield chunk
+
+
+def create_chunker(strategy: str, chunk_size: int, overlap_size: int) -> Chunker:
+  """
+  Builds a chunker by strategy name.
+
+  - fixed: `chunk_size` characters with `overlap_size` characters of overlap
+  - sentence / paragraph: whole sentences or paragraphs packed up to `chunk_size` characters
+  - token: whole sentences packed up to `chunk_size` Titan tokens as counted by `estimate_tokens`, capped at
+    TITAN_CHUNK_MAX_TOKENS so an underestimate stays within the model limit
+  """
+  if strategy == "fixed":
+    return FixedCharChunker(chunk_size, overlap_size)
+  if strategy == "sentence":
+    return BoundaryChunker(chunk_size, overlap_size, boundary=SENTENCE_BOUNDARY)
+  if strategy == "paragraph":
+    return BoundaryChunker(chunk_size, overlap_size, boundary=PARAGRAPH_BOUNDARY)
+  if strategy == "token":
+    max_tokens = min(chunk_size, TITAN_CHUNK_MAX_TOKENS)
+    return BoundaryChunker(max_tokens, min(overlap_size, max_tokens - 1), boundary=SENTENCE_BOUNDARY, measure=estimate_tokens)
+  raise ValueError(f"Unknown chunk strategy: {strategy}")
@@ -0,0 +1,182 @@
+import os
+import time
+import random
+import hashlib
+import unicodedata
+from array import array
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+import boto3
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+DYNAMODB_BATCH_GET_SIZE = 100
+
+
+def normalize_text(text: str) -> str:
+  """Normalizes Unicode forms and whitespace, so copies that only differ in formatting share an entry."""
+  return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def pack_vector(vector: List[float]) -> bytes:
+  """Packs a vector as little-endian float32, 4 KiB for a 1024-dimensional Titan vector."""
+  packed = array("f", vector)
+  if packed.itemsize != 4:
+    raise ValueError("float32 is not supported on this platform")
+  return packed.tobytes()
+
+
+def unpack_vector(data: bytes) -> List[float]:
+  vector = array("f")
+  vector.frombytes(data)
+  return vector.tolist()
+
+
+class EmbeddingCacheBackend(ABC):
+  """Key-value storage of packed vectors."""
+
+  @abstractmethod
+  def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+    """Returns the stored vectors of the keys that exist."""
+
+  @abstractmethod
+  def put_many(self, items: Dict[str, bytes]):
+    """Stores packed vectors by key."""
+
+
+class LocalDiskEmbeddingCacheBackend(EmbeddingCacheBackend):
+  """One file per vector under a directory, for tests and local runs."""
+
+  def __init__(self, directory: str):
+    self.directory = directory
+
+  def _path(self, key: str) -> str:
+    return os.path.join(self.directory, key[:2], f"{key}.bin")
+
+  def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+    found = {}
+    for key in keys:
+      try:
+        with open(self._path(key), "rb") as f:
+          found[key] = f.read()
+      except FileNotFoundError:
+        continue
+    return found
+
+  def put_many(self, items: Dict[str, bytes]):
+    for key, data in items.items():
+      path = self._path(key)
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      # write then rename, so a concurrent reader never sees a partial vector
+      tmp_path = f"{path}.{os.getpid()}.tmp"
+      with open(tmp_path, "wb") as f:
+        f.write(data)
+      os.replace(tmp_path, path)
+
+
+class DynamoDBEmbeddingCacheBackend(EmbeddingCacheBackend):
+  """Shared cache in a DynamoDB table with a string partition key `pk` and a binary `vector` attribute."""
+
+  def __init__(
+    self,
+    table_name: str,
+    ttl_seconds: int = 0,
+    max_attempts: int = 4,
+    backoff_base: float = 0.05,
+    backoff_max: float = 1.0,
+  ):
+    self.table_name = table_name
+    self.ttl_seconds = ttl_seconds
+    self.max_attempts = max_attempts
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+    self.dynamodb = boto3.resource("dynamodb")
+    self.table = self.dynamodb.Table(table_name)
+
+  def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+    found = {}
+    for start in range(0, len(keys), DYNAMODB_BATCH_GET_SIZE):
+      request = {
+        self.table_name: {
+          "Keys": [{"pk": key} for key in keys[start:start + DYNAMODB_BATCH_GET_SIZE]],
+          "ProjectionExpression": "pk, vector",
+        }
+      }
+      attempt = 0
+      while request:
+        response = self.dynamodb.batch_get_item(RequestItems=request)
+        for item in response["Responses"].get(self.table_name, []):
+          found[item["pk"]] = item["vector"].value
+        # throttled keys come back unprocessed
+        request = response.get("UnprocessedKeys") or None
+        if not request:
+          break
+        attempt += 1
+        if attempt >= self.max_attempts:
+          # the cache is an optimization, keys still unprocessed are embedded like misses
+          logger.warning(f"Embedding cache lookup gave up on {len(request[self.table_name]['Keys'])} throttled keys.")
+          break
+        # Full jitter spreads retries of concurrent functions reading the same table
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+    return found
+
+  def put_many(self, items: Dict[str, bytes]):
+    expires_at = int(time.time()) + self.ttl_seconds if self.ttl_seconds else None
+    with self.table.batch_writer(overwrite_by_pkeys=["pk"]) as batch:
+      for key, data in items.items():
+        item = {"pk": key, "vector": data}
+        if expires_at:
+          item["expires_at"] = expires_at
+        batch.put_item(Item=item)
+
+
+class EmbeddingCache:
+  """Embedding cache keyed by the model and the hash of the normalized text, with hit and miss counters."""
+
+  def __init__(self, backend: EmbeddingCacheBackend, model_id: str):
+    self.backend = backend
+    self.model_id = model_id
+    self.hits = 0
+    self.misses = 0
+
+  def reset_stats(self):
+    self.hits = 0
+    self.misses = 0
+
+  def key(self, text: str) -> str:
+    return hashlib.sha256(f"{self.model_id}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+  def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+    """Looks up all texts in one batched backend call, a failing backend counts as all misses."""
+    keys = [self.key(text) for text in texts]
+    try:
+      found = self.backend.get_many(list(dict.fromkeys(keys)))
+    except Exception as e:
+      logger.warning(f"Embedding cache lookup failed: {e}")
+      found = {}
+    vectors = [unpack_vector(found[key]) if key in found else None for key in keys]
+    hits = sum(1 for vector in vectors if vector is not None)
+    self.hits += hits
+    self.misses += len(vectors) - hits
+    return vectors
+
+  def put_many(self, texts: Iterable[str], vectors: Iterable[Optional[List[float]]]):
+    """Stores vectors, a failing backend is logged and ignored."""
+    items = {self.key(text): pack_vector(vector) for text, vector in zip(texts, vectors) if vector}
+    if not items:
+      return
+    try:
+      self.backend.put_many(items)
+    except Exception as e:
+      logger.warning(f"Embedding cache store failed: {e}")
+
+  def stats(self) -> Dict[str, float]:
+    total = self.hits + self.misses
+    return {
+      "embedding_cache_hits": self.hits,
+      "embedding_cache_misses": self.misses,
+      "embedding_cache_hit_ratio": round(self.hits / total, 3) if total else 0.0,
+    }
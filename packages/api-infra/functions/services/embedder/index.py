@@ -1,16 +1,30 @@
 import os
+import sys
 import json
+import time
+import codecs
+import itertools
+import hashlib
+import random
+import threading
 import traceback
 import urllib.parse
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Iterator, Tuple
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth, exceptions as os_exceptions
+from opensearchpy import OpenSearch, helpers as os_helpers
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType, batch_processor
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 
+from bulk_writer import BulkWriter
+from chunker import create_chunker
+from embedding_cache import EmbeddingCache, DynamoDBEmbeddingCacheBackend, LocalDiskEmbeddingCacheBackend
+from provision import create_client, ensure_index
+
 # Setup environment variables & validate
 OPENSEARCH_HOST = os.environ["OPENSEARCH_HOST"]
 assert OPENSEARCH_HOST, "OPENSEARCH_HOST environment variable not set"
@@ -21,140 +35,189 @@ assert EMBEDDING_MODEL_ARN, "EMBEDDING_MODEL_ARN environment variable not set"
 
 AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
 
+CHUNK_STRATEGY = os.environ.get("CHUNK_STRATEGY", "fixed") # fixed, sentence, paragraph or token
 CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", 1000)) # Define chunk size, default to 1000 tokens/chars
 OVERLAP_SIZE = int(os.environ.get("OVERLAP_SIZE", 200)) # Define overlap size, default to 200 tokens/chars
+S3_READ_SIZE = int(os.environ.get("S3_READ_SIZE", 64 * 1024)) # Bytes read from the S3 body at a time
+EMBEDDING_WINDOW_SIZE = int(os.environ.get("EMBEDDING_WINDOW_SIZE", 64)) # Chunks embedded at a time
+
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", 8)) # Concurrent invoke_model calls per invocation
+EMBEDDING_RATE_LIMIT = float(os.environ.get("EMBEDDING_RATE_LIMIT", 20)) # Sustained invoke_model calls per second
+EMBEDDING_BURST = int(os.environ.get("EMBEDDING_BURST", EMBEDDING_CONCURRENCY)) # Calls allowed back to back before the rate limit applies
+EMBEDDING_MAX_RETRIES = int(os.environ.get("EMBEDDING_MAX_RETRIES", 6)) # Retries per chunk on throttling
+EMBEDDING_BACKOFF_BASE = float(os.environ.get("EMBEDDING_BACKOFF_BASE", 0.5)) # Seconds, doubled on each retry
+EMBEDDING_BACKOFF_MAX = float(os.environ.get("EMBEDDING_BACKOFF_MAX", 20)) # Seconds, upper bound of a single backoff
+
+EMBEDDING_CACHE_TABLE_NAME = os.environ.get("EMBEDDING_CACHE_TABLE_NAME", "") # Shared embedding cache table, takes precedence over the directory
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", "") # Local embedding cache directory, for tests and local runs
+EMBEDDING_CACHE_TTL_DAYS = int(os.environ.get("EMBEDDING_CACHE_TTL_DAYS", 90)) # Days a shared cache entry is kept, 0 keeps it forever
+
+BULK_MAX_BYTES = int(os.environ.get("BULK_MAX_BYTES", 5 * 1024 * 1024)) # Bulk request size that forces a flush
+BULK_MAX_ACTIONS = int(os.environ.get("BULK_MAX_ACTIONS", 500)) # Bulk actions that force a flush
+BULK_REFRESH = os.environ.get("BULK_REFRESH", "wait_for") # Bulk refresh policy: wait_for, true or false (not searchable on ack)
+BULK_MAX_RETRIES = int(os.environ.get("BULK_MAX_RETRIES", 5)) # Retries of rejected bulk items
+
+# Bedrock error codes that are retried with backoff
+RETRYABLE_ERROR_CODES = {
+  "ThrottlingException",
+  "TooManyRequestsException",
+  "ServiceUnavailableException",
+  "ModelNotReadyException",
+}
 
 # Setup tracers and loggers
 tracer = Tracer(service="embedder")
 logger = Logger(service="embedder")
-processor = BatchProcessor(event_type=EventType.SQS)
+chunker = create_chunker(CHUNK_STRATEGY, CHUNK_SIZE, OVERLAP_SIZE)
 
 # Setup AWS clients
 s3 = boto3.client("s3")
-bedrock = boto3.client("bedrock-runtime", region_name=AWS_REGION)
-credentials = boto3.Session().get_credentials()
-auth = AWSV4SignerAuth(credentials, AWS_REGION)
-
-# Setup OpenSearch client
-logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
-client = OpenSearch(
-  hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
-  http_auth=auth,
-  use_ssl=True,
-  verify_certs=True,
-  http_compress=True, # Enable compression
-  connection_class=RequestsHttpConnection,
-  pool_maxsize=10, # Adjust pool size based on expected concurrency
+# throttling is retried below with jittered backoff, so botocore retries are disabled to keep counts accurate
+bedrock = boto3.client(
+  "bedrock-runtime",
+  region_name=AWS_REGION,
+  config=Config(
+    retries={"max_attempts": 1, "mode": "standard"},
+    max_pool_connections=max(EMBEDDING_CONCURRENCY, 10),
+  ),
 )
-# Verify connection (optional, but good practice)
-if not client.ping():
-  raise ConnectionError("OpenSearch connection check failed")
-logger.info(f"Successfully connected to OpenSearch: {client.info()}")
-
-@tracer.capture_method
-def get_or_create_index(client):
-  """Get or create the index."""
-  logger.warning(f"Index '{INDEX_NAME}' not found. Creating...")
-  index_body = {
-    "settings": {
-      "index": {
-        "knn": True,
-      },
-      "analysis": {
-        "analyzer": {
-          "nori_analyzer": {
-            "type": "custom",
-            "tokenizer": "nori_tokenizer",
-            "filter": ["nori_number", "nori_readingform", "lowercase"]
-          }
-        }
-      }
-    },
-    "mappings": {
-      "properties": {
-        "embedding_vector": {
-          "type": "knn_vector",
-          "dimension": 1024,
-          "method": {
-            "name": "hnsw",
-            "space_type": "cosinesimil",
-            "engine": "nmslib",
-          }
-        },
-        "text": {"type": "text", "analyzer": "nori_analyzer"},
-        "source_bucket": {"type": "keyword"},
-        "source_key": {"type": "keyword"}
-      }
-    }
-  }
-  try:
-    if not client.indices.exists(index=INDEX_NAME):
-      client.indices.create(index=INDEX_NAME, body=index_body)
-      logger.info(f"Index '{INDEX_NAME}' created successfully.")
-  except os_exceptions.RequestError as e:
-    # Handle potential race condition if another instance creates the index
-    if e.error == 'resource_already_exists_exception':
-      logger.warning(f"Index '{INDEX_NAME}' already exists (created by another instance).")
-    else:
-      logger.error(f"Error creating index '{INDEX_NAME}': {e}")
-      raise e
-  except Exception as e:
-    logger.error(f"Unexpected error creating index '{INDEX_NAME}': {e}")
-    raise e
-
-
-try:
-  get_or_create_index(client)
-except (ConnectionError, os_exceptions.ConnectionError, os_exceptions.TransportError) as e:
-  logger.error(f"Failed to connect or communicate with OpenSearch: {e}")
-  client = None
-  raise e
-except Exception as e:
-  logger.error(f"Unexpected error during OpenSearch client setup: {e}")
-  client = None
-  raise e
-
-
-@tracer.capture_method
-def get_s3_object_content(bucket, key):
-  """Downloads and reads content from an S3 object."""
+# OpenSearch client, created on first use so cold starts make no network calls
+_client: Optional[OpenSearch] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenSearch:
+  """Returns the memoized OpenSearch client, checking once per container that the index exists."""
+  global _client
+  if _client is None:
+    with _client_lock:
+      if _client is None:
+        logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
+        client = create_client(OPENSEARCH_HOST, AWS_REGION)
+        ensure_index(client, INDEX_NAME)
+        _client = client
+  return _client
+
+
+class TokenBucket:
+  """Thread-safe token bucket limiting the rate of calls across worker threads."""
+
+  def __init__(self, rate: float, capacity: int):
+    self.rate = rate
+    self.capacity = max(1, capacity)
+    self.tokens = float(self.capacity)
+    self.updated_at = time.monotonic()
+    self.lock = threading.Lock()
+
+  def acquire(self) -> float:
+    """Blocks until a token is available, returns the seconds waited."""
+    waited = 0.0
+    while True:
+      with self.lock:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+          self.tokens -= 1
+          return waited
+        delay = (1 - self.tokens) / self.rate
+      time.sleep(delay)
+      waited += delay
+
+
+class EmbeddingStats:
+  """Thread-safe per-document embedding counters."""
+
+  def __init__(self):
+    self.calls = 0
+    self.throttles = 0
+    self.rate_limited_seconds = 0.0
+    self.lock = threading.Lock()
+
+  def add(self, calls: int = 0, throttles: int = 0, rate_limited_seconds: float = 0.0):
+    with self.lock:
+      self.calls += calls
+      self.throttles += throttles
+      self.rate_limited_seconds += rate_limited_seconds
+
+
+# Embedding cache shared by documents that repeat the same text (footers, policies), disabled if not configured
+embedding_cache = None
+if EMBEDDING_CACHE_TABLE_NAME:
+  embedding_cache = EmbeddingCache(
+    DynamoDBEmbeddingCacheBackend(EMBEDDING_CACHE_TABLE_NAME, ttl_seconds=EMBEDDING_CACHE_TTL_DAYS * 24 * 60 * 60),
+    model_id=EMBEDDING_MODEL_ARN,
+  )
+elif EMBEDDING_CACHE_DIR:
+  embedding_cache = EmbeddingCache(LocalDiskEmbeddingCacheBackend(EMBEDDING_CACHE_DIR), model_id=EMBEDDING_MODEL_ARN)
+
+# Shared across warm invocations so every document respects the same limit
+rate_limiter = TokenBucket(rate=EMBEDDING_RATE_LIMIT, capacity=EMBEDDING_BURST)
+executor = ThreadPoolExecutor(max_workers=EMBEDDING_CONCURRENCY, thread_name_prefix="embedder")
+
+
+def iter_s3_object_text(bucket: str, key: str) -> Iterator[str]:
+  """Streams decoded text from an S3 object without reading the whole body into memory."""
   logger.info(f"Downloading s3://{bucket}/{key}")
   try:
     response = s3.get_object(Bucket=bucket, Key=key)
-    # assume plain text UTF-8 encoded
-    content = response["Body"].read().decode("utf-8")
-    logger.info(f"Successfully read content from s3://{bucket}/{key}")
-    return content
   except ClientError as e:
     logger.error(f"Error getting object s3://{bucket}/{key}: {e}")
     raise e
-  except Exception as e:
+
+  # assume plain text UTF-8 encoded, the incremental decoder holds back multi-byte characters split across reads
+  decoder = codecs.getincrementaldecoder("utf-8")()
+  body = response["Body"]
+  try:
+    for data in body.iter_chunks(chunk_size=S3_READ_SIZE):
+      text = decoder.decode(data)
+      if text:
+        yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+      yield text
+  except UnicodeDecodeError as e:
     logger.error(f"Error decoding object s3://{bucket}/{key}: {e}")
     raise ValueError(f"Could not decode object content for {key}")
+  finally:
+    body.close()
+  logger.info(f"Successfully read content from s3://{bucket}/{key}")
 
 
 @tracer.capture_method
-def get_embedding(text: str) -> Optional[list[float]]:
-  """Generates embedding using Bedrock."""
+def get_embedding(text: str, stats: Optional[EmbeddingStats] = None) -> Optional[list[float]]:
+  """Generates embedding using Bedrock, retrying throttled calls with jittered exponential backoff."""
   if not text:
     logger.warning("No text provided to get_embedding.")
     return None
 
-  logger.info(f"Generating embedding for text snippet: '{text[:100]}...'")
+  stats = stats or EmbeddingStats()
+  logger.debug(f"Generating embedding for text snippet: '{text[:100]}...'")
   try:
-    # Removed truncation logic - assume input text is appropriately sized or handled upstream if needed
-    response = bedrock.invoke_model(
-      modelId=EMBEDDING_MODEL_ARN,
-      body=json.dumps({"inputText": text}), # Use full text
-      contentType='application/json',
-      accept='application/json'
-    )
+    attempt = 0
+    while True:
+      stats.add(calls=1, rate_limited_seconds=rate_limiter.acquire())
+      try:
+        # Removed truncation logic - assume input text is appropriately sized or handled upstream if needed
+        response = bedrock.invoke_model(
+          modelId=EMBEDDING_MODEL_ARN,
+          body=json.dumps({"inputText": text}), # Use full text
+          contentType='application/json',
+          accept='application/json'
+        )
+        break
+      except ClientError as e:
+        if e.response["Error"]["Code"] not in RETRYABLE_ERROR_CODES or attempt >= EMBEDDING_MAX_RETRIES:
+          raise
+        stats.add(throttles=1)
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        time.sleep(random.uniform(0, min(EMBEDDING_BACKOFF_MAX, EMBEDDING_BACKOFF_BASE * 2 ** attempt)))
+        attempt += 1
     response_body = json.loads(response["body"].read())
     embedding = response_body.get("embedding")
     if not embedding:
       logger.error("Embedding not found in Bedrock response.")
       return None
-    logger.info("Embedding generated successfully.")
     return embedding
   except ClientError as e:
     logger.error(f"Bedrock client error getting embedding: {e}")
@@ -164,44 +227,110 @@ def get_embedding(text: str) -> Optional[list[float]]:
     traceback.print_exc()
     raise e
 
+
 @tracer.capture_method
-def bulk_index_documents(bulk_data: List[Dict[str, Any]]):
-    """Indexes multiple documents into OpenSearch using the bulk API."""
-    if not client:
-        logger.error("OpenSearch client is not available. Cannot index documents.")
-        raise ConnectionError("OpenSearch client not initialized.")
-
-    if not bulk_data:
-        logger.warning("No bulk data provided. Skipping indexing.")
-        return
-
-    logger.info(f"Bulk indexing {len(bulk_data) // 2} documents.") # Each doc requires 2 lines in bulk data
-    try:
-        response = client.bulk(
-            index=INDEX_NAME,
-            body=bulk_data,
-            refresh="wait_for", # or 'true'/'false' depending on consistency needs
-        )
-        if response["errors"]:
-            logger.error(f"Bulk indexing completed with errors: {response}")
-            # Iterate through items to log specific errors
-            for item in response["items"]:
-                if "error" in item.get("index", {}):
-                    logger.error(f"Error indexing document ID {item['index']['_id']}: {item['index']['error']}")
-            # Optionally raise an exception if errors occurred
-            # raise os_exceptions.RequestError(f"Bulk indexing had errors: {response['errors']}")
-        else:
-            logger.info("Bulk indexing completed successfully.")
-    except os_exceptions.RequestError as e:
-        logger.error(f"OpenSearch RequestError during bulk indexing: {e.info}")
-        raise
-    except os_exceptions.ConnectionError as e:
-        logger.error(f"OpenSearch ConnectionError during bulk indexing: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error during bulk indexing: {e}")
-        traceback.print_exc()
-        raise
+def embed_chunks(chunks: List[str], stats: EmbeddingStats) -> List[Optional[list[float]]]:
+  """Generates embeddings for chunks on the bounded worker pool, results keep the chunk order."""
+  if embedding_cache is None:
+    return list(executor.map(lambda chunk: get_embedding(chunk, stats), chunks))
+
+  # one batched cache lookup, then embed each distinct missing text once
+  embeddings = embedding_cache.get_many(chunks)
+  missing: Dict[str, List[int]] = {}
+  for i, embedding in enumerate(embeddings):
+    if embedding is None:
+      missing.setdefault(embedding_cache.key(chunks[i]), []).append(i)
+  if not missing:
+    return embeddings
+  texts = [chunks[indices[0]] for indices in missing.values()]
+  generated = list(executor.map(lambda text: get_embedding(text, stats), texts))
+  for indices, embedding in zip(missing.values(), generated):
+    for i in indices:
+      embeddings[i] = embedding
+  embedding_cache.put_many(texts, generated)
+  return embeddings
+
+
+def get_doc_id(bucket: str, key: str, chunk_index: int) -> str:
+  """Builds the document ID of a chunk."""
+  return f"{bucket}_{key}_{chunk_index}".replace('/', '_') # Ensure doc_id is filesystem/URL safe
+
+
+def get_content_hash(text: str) -> str:
+  """Hashes chunk text together with the embedding model, so a model change re-embeds every chunk."""
+  return hashlib.sha256(f"{EMBEDDING_MODEL_ARN}\n{text}".encode("utf-8")).hexdigest()
+
+
+@tracer.capture_method
+def get_indexed_chunk_hashes(bucket: str, key: str) -> Dict[str, Optional[str]]:
+  """Returns the content hash of every chunk already indexed for the object, keyed by document ID."""
+  query = {
+    "query": {
+      "bool": {
+        "filter": [
+          {"term": {"source_bucket": bucket}},
+          {"term": {"source_key": key}},
+        ]
+      }
+    },
+    "_source": ["content_hash"],
+  }
+  return {
+    hit["_id"]: hit.get("_source", {}).get("content_hash")
+    for hit in os_helpers.scan(get_client(), query=query, index=INDEX_NAME, size=1000)
+  }
+
+
+# Chunk hashes each object is left with by the records processed so far in the batch. Their bulk actions may still be
+# buffered, or flushed but not yet refreshed, so a later record for the same object reads them from here, not OpenSearch
+batch_chunk_hashes: Dict[Tuple[str, str], Dict[str, Optional[str]]] = {}
+
+
+class BulkIndexingError(Exception):
+  """Raised for records whose bulk actions failed after retries."""
+
+
+class BufferedBatchProcessor(BatchProcessor):
+  """Flushes the shared bulk writer before reporting, so only records with failed bulk actions are redelivered."""
+
+  def __init__(self, writer: BulkWriter, **kwargs):
+    super().__init__(**kwargs)
+    self.writer = writer
+
+  def _prepare(self):
+    super()._prepare()
+    self.writer.reset()
+    batch_chunk_hashes.clear()
+    if embedding_cache:
+      embedding_cache.reset_stats()
+
+  def _clean(self):
+    self.writer.flush()
+    for record in list(self.success_messages):
+      # success messages are raw records, failures are reported as data classes like in `_process_record`
+      data = self._to_batch_type(record=record, event_type=self.event_type, model=self.model)
+      if self.writer.is_failed(data.message_id):
+        self.success_messages.remove(record)
+        try:
+          raise BulkIndexingError(f"Bulk indexing failed for message {data.message_id}")
+        except BulkIndexingError:
+          self.failure_handler(record=data, exception=sys.exc_info())
+    logger.info("Bulk indexing finished.", extra=self.writer.stats.as_dict())
+    if embedding_cache:
+      logger.info("Embedding cache usage.", extra=embedding_cache.stats())
+    super()._clean()
+
+
+# Buffers bulk actions across documents and records of a batch
+bulk_writer = BulkWriter(
+  get_client,
+  INDEX_NAME,
+  max_bytes=BULK_MAX_BYTES,
+  max_actions=BULK_MAX_ACTIONS,
+  refresh=BULK_REFRESH,
+  max_retries=BULK_MAX_RETRIES,
+)
+processor = BufferedBatchProcessor(writer=bulk_writer, event_type=EventType.SQS)
 
 
 @tracer.capture_method
@@ -225,57 +354,79 @@ def process_record(record: SQSRecord):
       logger.info(f"Processing S3 event for object: s3://{bucket}/{key}")
 
       try:
-        # 1. Get content
-        content = get_s3_object_content(bucket, key)
-        if not content:
-          logger.warning(f"No content extracted from s3://{bucket}/{key}. Skipping.")
+        source = f"s3://{bucket}/{key}"
+        # an object seen earlier in the batch is compared against that record's writes
+        indexed_hashes = batch_chunk_hashes.get((bucket, key))
+        if indexed_hashes is None:
+          indexed_hashes = get_indexed_chunk_hashes(bucket, key)
+        written_hashes = dict(indexed_hashes)
+        stats = EmbeddingStats()
+        started_at = time.monotonic()
+        counts = {"chunks": 0, "characters": 0, "changed": 0, "queued": 0}
+
+        # 1. Stream content and chunk it with overlap, one bounded window at a time
+        chunks = chunker.chunks(iter_s3_object_text(bucket, key))
+        for window in itertools.batched(enumerate(chunks), EMBEDDING_WINDOW_SIZE):
+          counts["chunks"] += len(window)
+          counts["characters"] += sum(len(chunk_text) for _, chunk_text in window)
+
+          # 2. Skip chunks whose content is already indexed unchanged
+          changed = []
+          for i, chunk_text in window:
+            content_hash = get_content_hash(chunk_text)
+            if indexed_hashes.get(get_doc_id(bucket, key, i)) != content_hash:
+              changed.append((i, chunk_text, content_hash))
+          if not changed:
+            continue
+          counts["changed"] += len(changed)
+
+          # 3. Get embeddings for changed chunks concurrently, in chunk order
+          embeddings = embed_chunks([chunk_text for _, chunk_text, _ in changed], stats)
+
+          for (i, chunk_text, content_hash), embedding in zip(changed, embeddings):
+            if not embedding:
+              logger.error(f"Failed to generate embedding for chunk {i} of {source}. Skipping chunk.")
+              continue # Decide if skipping the chunk or failing the whole file is better
+
+            # 4. Queue the chunk on the bulk writer, which flushes by size across documents and records
+            document = {
+              "text": chunk_text,
+              "embedding_vector": embedding, # Use the correct field name from mapping
+              "source_bucket": bucket,
+              "source_key": key,
+              "chunk_index": i,
+              "content_hash": content_hash,
+            }
+            bulk_writer.index(get_doc_id(bucket, key, i), document, owner=record.message_id)
+            written_hashes[get_doc_id(bucket, key, i)] = content_hash
+            counts["queued"] += 1
+
+        if not counts["chunks"]:
+          logger.warning(f"No content extracted from {source}. Skipping.")
           continue
 
-        # 2. Chunk content with overlap
-        chunks = []
-        start = 0
-        while start < len(content):
-          end = start + CHUNK_SIZE
-          chunks.append(content[start:end])
-          start += CHUNK_SIZE - OVERLAP_SIZE
-          # Ensure we don't create an empty chunk at the end if content length is a multiple of stride
-          if start >= len(content) and len(content) % (CHUNK_SIZE - OVERLAP_SIZE) == 0:
-            break
-          # Prevent overlap if the last chunk is smaller than OVERLAP_SIZE
-          if end >= len(content):
-            break
-
-        # Original simple chunking logic:
-        # chunks = [content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE)]
-        logger.info(f"Content split into {len(chunks)} chunks for s3://{bucket}/{key} with CHUNK_SIZE={CHUNK_SIZE}, OVERLAP_SIZE={OVERLAP_SIZE}")
-
-        bulk_request_body = []
-        for i, chunk_text in enumerate(chunks):
-          # 3. Get embedding for chunk
-          embedding = get_embedding(chunk_text)
-          if not embedding:
-            logger.error(f"Failed to generate embedding for chunk {i} of s3://{bucket}/{key}. Skipping chunk.")
-            continue # Decide if skipping the chunk or failing the whole file is better
-
-          # 4. Prepare bulk index request for the chunk
-          doc_id = f"{bucket}_{key}_{i}".replace('/', '_') # Ensure doc_id is filesystem/URL safe
-          action = {"index": {"_index": INDEX_NAME, "_id": doc_id}}
-          document = {
-            "text": chunk_text,
-            "embedding_vector": embedding, # Use the correct field name from mapping
-            "source_bucket": bucket,
-            "source_key": key,
-            "chunk_index": i
-          }
-          bulk_request_body.append(action)
-          bulk_request_body.append(document)
-
-        # 5. Bulk index all chunks for the document
-        if bulk_request_body:
-          bulk_index_documents(bulk_request_body)
-          logger.info(f"Successfully processed and initiated indexing for {len(chunks)} chunks from s3://{bucket}/{key}")
-        else:
-          logger.warning(f"No chunks were successfully processed for s3://{bucket}/{key}.")
+        # 5. Delete chunks left over from a longer previous version of the object
+        current_ids = {get_doc_id(bucket, key, i) for i in range(counts["chunks"])}
+        orphan_ids = sorted(doc_id for doc_id in indexed_hashes if doc_id not in current_ids)
+        for doc_id in orphan_ids:
+          bulk_writer.delete(doc_id, owner=record.message_id)
+          del written_hashes[doc_id]
+        batch_chunk_hashes[(bucket, key)] = written_hashes
+
+        elapsed = time.monotonic() - started_at
+        logger.info(
+          f"Processed {counts['chunks']} chunks from {source} with CHUNK_STRATEGY={CHUNK_STRATEGY}, CHUNK_SIZE={CHUNK_SIZE}, OVERLAP_SIZE={OVERLAP_SIZE}",
+          extra={
+            **counts,
+            "unchanged": counts["chunks"] - counts["changed"],
+            "orphaned": len(orphan_ids),
+            "elapsed_seconds": round(elapsed, 3),
+            "chunks_per_second": round(counts["changed"] / elapsed, 2) if elapsed else None,
+            "bedrock_calls": stats.calls,
+            "throttles": stats.throttles,
+            "rate_limited_seconds": round(stats.rate_limited_seconds, 3),
+          },
+        )
 
       except Exception as e:
         logger.error(f"Failed processing object s3://{bucket}/{key}: {e}")
@@ -289,10 +440,24 @@ def process_record(record: SQSRecord):
     raise e # Re-raise to signal failure
 
 
+@batch_processor(record_handler=process_record, processor=processor)
+def process_batch(event, context):
+  """Processes a batch of SQS records."""
+  return processor.response()
+
+
+def bootstrap() -> Dict[str, object]:
+  """Provisions the index once after a deploy, e.g. `aws lambda invoke --payload '{"action": "bootstrap"}'`."""
+  created = ensure_index(create_client(OPENSEARCH_HOST, AWS_REGION), INDEX_NAME)
+  logger.info(f"Bootstrap finished, index created: {created}.")
+  return {"index": INDEX_NAME, "created": created}
+
+
 @logger.inject_lambda_context(log_event=True)
 @tracer.capture_lambda_handler
-@batch_processor(record_handler=process_record, processor=processor)
 def lambda_handler(event, context):
   """Lambda handler entry point."""
   logger.info("Embedder function invoked.")
-  return processor.response()
+  if event.get("action") == "bootstrap":
+    return bootstrap()
+  return process_batch(event, context)
@@ -0,0 +1,85 @@
+import os
+import json
+
+import boto3
+from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth, exceptions as os_exceptions
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+INDEX_BODY = {
+  "settings": {
+    "index": {
+      "knn": True,
+    },
+    "analysis": {
+      "analyzer": {
+        "nori_analyzer": {
+          "type": "custom",
+          "tokenizer": "nori_tokenizer",
+          "filter": ["nori_number", "nori_readingform", "lowercase"]
+        }
+      }
+    }
+  },
+  "mappings": {
+    "properties": {
+      "embedding_vector": {
+        "type": "knn_vector",
+        "dimension": 1024,
+        "method": {
+          "name": "hnsw",
+          "space_type": "cosinesimil",
+          "engine": "nmslib",
+        }
+      },
+      "text": {"type": "text", "analyzer": "nori_analyzer"},
+      "source_bucket": {"type": "keyword"},
+      "source_key": {"type": "keyword"},
+      "content_hash": {"type": "keyword", "index": False}
+    }
+  }
+}
+
+
+def create_client(host: str, region: str, pool_maxsize: int = 10) -> OpenSearch:
+  """Builds a SigV4 signed OpenSearch client, no request is sent until the client is used."""
+  credentials = boto3.Session().get_credentials()
+  return OpenSearch(
+    hosts=[{"host": host, "port": 443}],
+    http_auth=AWSV4SignerAuth(credentials, region),
+    use_ssl=True,
+    verify_certs=True,
+    http_compress=True, # Enable compression
+    connection_class=RequestsHttpConnection,
+    pool_maxsize=pool_maxsize, # Adjust pool size based on expected concurrency
+  )
+
+
+def ensure_index(client: OpenSearch, index_name: str) -> bool:
+  """Creates the index unless it exists, returns whether it was created. Safe to run repeatedly and concurrently."""
+  # a HEAD request, so the usual case costs one round trip
+  if client.indices.exists(index=index_name):
+    return False
+  logger.warning(f"Index '{index_name}' not found. Creating...")
+  try:
+    client.indices.create(index=index_name, body=INDEX_BODY)
+  except os_exceptions.RequestError as e:
+    # Handle potential race condition if another instance creates the index
+    if e.error == "resource_already_exists_exception":
+      logger.warning(f"Index '{index_name}' already exists (created by another instance).")
+      return False
+    raise
+  logger.info(f"Index '{index_name}' created successfully.")
+  return True
+
+
+def main():
+  """Provisions the index from a host that can reach the domain, e.g. `python provision.py` on a bastion."""
+  client = create_client(os.environ["OPENSEARCH_HOST"], os.environ.get("AWS_REGION", "us-west-2"))
+  index_name = os.environ["INDEX_NAME"]
+  print(json.dumps({"index": index_name, "created": ensure_index(client, index_name)}))
+
+
+if __name__ == "__main__":
+  main()
@@ -1,6 +1,11 @@
 import os
+import json
+import base64
+import threading
 import traceback
+from fnmatch import fnmatch
 from http import HTTPStatus
+from typing import List, Optional
 
 import boto3
 from opensearchpy import OpenSearch, Search, RequestsHttpConnection, AWSV4SignerAuth
@@ -14,34 +19,125 @@ from aws_lambda_powertools.event_handler import (
 )
 from aws_lambda_powertools.event_handler.router import APIGatewayHttpRouter
 
+from search_backend import create_backend
+
 # setup environment variables
 OPENSEARCH_HOST = os.environ["OPENSEARCH_HOST"]
 INDEX_NAME = os.environ["INDEX_NAME"]
 AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
+# `_source` fields never returned unless requested by name
+VECTOR_FIELDS = [field for field in os.environ.get("VECTOR_FIELDS", "*_vector,*_embedding").split(",") if field]
+# unique field breaking score ties of paged queries, so `search_after` cursors are stable. OpenSearch
+# sorts on `_id` unless `indices.id_field_data.enabled` is off, set a keyword field then
+SORT_TIEBREAKER = os.environ.get("SORT_TIEBREAKER", "_id")
+# queries accepted by one batch request
+MAX_BATCH_QUERIES = int(os.environ.get("MAX_BATCH_QUERIES", 10))
+# `opensearch`, or `local` to search an NDJSON snapshot in-process for load tests and benchmarks
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "opensearch")
+LOCAL_SEARCH_SNAPSHOT = os.environ.get("LOCAL_SEARCH_SNAPSHOT", "")
 
 tracer = Tracer(service="item-search")
 logger = Logger(service="item-search")
 app = APIGatewayHttpResolver(strip_prefixes=["/v1/search/item"])
 router = APIGatewayHttpRouter()
 
-# setup OpenSearch client
-credentials = boto3.Session().get_credentials()
-auth = AWSV4SignerAuth(credentials, AWS_REGION)
-logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
-
-client = OpenSearch(
-    hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
-    http_auth=auth,
-    use_ssl=True,
-    verify_certs=True,
-    http_compress=True,
-    connection_class=RequestsHttpConnection,
-    pool_maxsize=10,
-)
-# Verify connection (optional, but good practice)
-if not client.ping():
-    raise ConnectionError("OpenSearch connection check failed")
-logger.info(f"Successfully connected to OpenSearch: {client.info()}")
+# setup OpenSearch client, created on first use so cold starts make no network calls
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenSearch:
+    """Returns the memoized OpenSearch client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
+                credentials = boto3.Session().get_credentials()
+                _client = OpenSearch(
+                    hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
+                    http_auth=AWSV4SignerAuth(credentials, AWS_REGION),
+                    use_ssl=True,
+                    verify_certs=True,
+                    http_compress=True,
+                    connection_class=RequestsHttpConnection,
+                    pool_maxsize=10,
+                )
+    return _client
+
+
+backend = create_backend(SEARCH_BACKEND, get_client, snapshot=LOCAL_SEARCH_SNAPSHOT)
+
+
+def build_source_filter(fields: Optional[str]) -> dict:
+    """Builds the `_source` filter from a comma separated `fields` parameter, a `-` prefix excludes a field."""
+    includes, excludes = [], list(VECTOR_FIELDS)
+    for field in (fields or "").split(","):
+        field = field.strip()
+        if field.startswith("-"):
+            excludes.append(field[1:])
+        elif field:
+            includes.append(field)
+    # a vector field requested by name is returned
+    excludes = [pattern for pattern in excludes if not any(fnmatch(field, pattern) for field in includes)]
+    return {"includes": includes, "excludes": excludes} if includes else {"excludes": excludes}
+
+
+def encode_cursor(sort_values: List) -> str:
+    """Encodes the sort values of the last hit as an opaque cursor."""
+    data = json.dumps(sort_values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List:
+    """Decodes a cursor into `search_after` values, raises ValueError if it is malformed."""
+    values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if not isinstance(values, list):
+        raise ValueError("Cursor is not a list of sort values")
+    return values
+
+
+def build_search_body(
+    name: Optional[str],
+    category: Optional[str],
+    limit: int,
+    fields: Optional[str] = None,
+    search_after: Optional[List] = None,
+    paginate: bool = False,
+) -> dict:
+    """Builds the search request body of one item query, only paged queries are sorted for cursors."""
+    s = Search(index=INDEX_NAME)
+    if category and name:
+        s = s.query(
+            "bool",
+            must=[
+                Q("match", name=name),
+                Q("match", category=category),
+            ],
+        )
+    elif category:
+        s = s.query("match", category=category)
+    elif name:
+        s = s.query("match", name=name)
+    if paginate or search_after:
+        s = s.sort({"_score": {"order": "desc"}}, {SORT_TIEBREAKER: {"order": "asc"}})
+    s = s.source(**build_source_filter(fields))
+    if search_after:
+        s = s.extra(search_after=search_after)
+    return s[:limit].to_dict()
+
+
+def build_page(hits: List[dict], limit: int, paginate: bool = False) -> dict:
+    """Copies `_source` of raw hits, cheaper than building response objects, and adds the next cursor of paged queries."""
+    return {
+        "content": [hit.get("_source", {}) for hit in hits],
+        "next_cursor": encode_cursor(hits[-1]["sort"]) if paginate and hits and len(hits) == limit else None,
+    }
+
+
+def is_paged(paginate, cursor: Optional[str]) -> bool:
+    """Paging is opt-in, with `paginate=true` on the first page or a cursor on later ones."""
+    return bool(cursor) or str(paginate).lower() == "true"
 
 
 @router.get("/")
@@ -64,30 +160,33 @@ def search_item() -> Response:
             body={"error", "Missing name or category parameters"},
         )
 
-    items = []
+    cursor = app.current_event.query_string_parameters.get("cursor")
+    paginate = is_paged(app.current_event.query_string_parameters.get("paginate"), cursor)
+    try:
+        search_after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return Response(
+            status_code=HTTPStatus.BAD_REQUEST,
+            content_type=content_types.APPLICATION_JSON,
+            body={"error": "Invalid cursor"},
+        )
+
     try:
         logger.info(f"Searching for items with name: {name} and category: {category}")
-        s = Search(using=client, index=INDEX_NAME)
-        if category and name:
-            s = s.query(
-                "bool",
-                must=[
-                    Q("match", name=name),
-                    Q("match", category=category),
-                ],
-            )
-        elif category:
-            s = s.query("match", category=category)
-        elif name:
-            s = s.query("match", name=name)
-        result = s[:limit].execute()
-        for hit in result:
-            items.append(hit.to_dict())
+        body = build_search_body(
+            name,
+            category,
+            limit,
+            fields=app.current_event.query_string_parameters.get("fields"),
+            search_after=search_after,
+            paginate=paginate,
+        )
+        hits = backend.search(INDEX_NAME, body)["hits"]["hits"]
 
         return Response(
             status_code=HTTPStatus.OK,
             content_type=content_types.APPLICATION_JSON,
-            body={"content": items},
+            body=build_page(hits, limit, paginate),
         )
     except Exception:
         traceback.print_exc()
@@ -101,6 +200,78 @@ def search_item() -> Response:
         )
 
 
+@router.post("/batch")
+@tracer.capture_method
+def search_items_batch() -> Response:
+    """Runs several item queries in one `_msearch`, results are returned in query order."""
+    try:
+        queries = (app.current_event.json_body or {}).get("queries")
+    except (ValueError, AttributeError):
+        queries = None
+    if not isinstance(queries, list) or not queries:
+        return Response(
+            status_code=HTTPStatus.BAD_REQUEST,
+            content_type=content_types.APPLICATION_JSON,
+            body={"error": "Missing queries"},
+        )
+    if len(queries) > MAX_BATCH_QUERIES:
+        return Response(
+            status_code=HTTPStatus.BAD_REQUEST,
+            content_type=content_types.APPLICATION_JSON,
+            body={"error": f"At most {MAX_BATCH_QUERIES} queries are allowed"},
+        )
+
+    # an invalid query fails alone, the others still run
+    results: List[Optional[dict]] = [None] * len(queries)
+    searches = []
+    for position, query in enumerate(queries):
+        try:
+            if not isinstance(query, dict) or not (query.get("name") or query.get("category")):
+                raise ValueError("Missing name or category parameters")
+            limit = int(query.get("limit") or 10)
+            cursor = query.get("cursor")
+            paginate = is_paged(query.get("paginate"), cursor)
+            body = build_search_body(
+                query.get("name"),
+                query.get("category"),
+                limit,
+                fields=query.get("fields"),
+                search_after=decode_cursor(cursor) if cursor else None,
+                paginate=paginate,
+            )
+        except (TypeError, ValueError) as e:
+            results[position] = {"content": [], "error": f"Invalid query: {e}"}
+            continue
+        searches.append((position, limit, paginate, body))
+
+    try:
+        logger.info(f"Searching for items with {len(searches)} queries", extra={"queries": len(queries)})
+        if searches:
+            responses = backend.msearch(INDEX_NAME, [body for _, _, _, body in searches])
+            for (position, limit, paginate, _), response in zip(searches, responses):
+                if "error" in response:
+                    logger.error(f"Error in item query {position}: {response['error']}")
+                    results[position] = {"content": [], "error": "Search failed"}
+                else:
+                    results[position] = build_page(response["hits"]["hits"], limit, paginate)
+
+        return Response(
+            status_code=HTTPStatus.OK,
+            content_type=content_types.APPLICATION_JSON,
+            body={"results": results},
+        )
+    except Exception:
+        traceback.print_exc()
+        return Response(
+            status_code=HTTPStatus.OK,
+            content_type=content_types.APPLICATION_JSON,
+            body={
+                "results": [],
+                "error": f"Internal server error: {traceback.format_exc()}",
+            },
+        )
+
+
 # register modules to the router
 app.include_router(router)
 
@@ -1,10 +1,14 @@
 import os
 import json
+import base64
+import threading
 import traceback
+from fnmatch import fnmatch
+from typing import List, Optional
 
 import boto3
 from http import HTTPStatus
-from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+from opensearchpy import OpenSearch
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.logging import correlation_paths
 from aws_lambda_powertools.event_handler import (
@@ -14,6 +18,10 @@ from aws_lambda_powertools.event_handler import (
 )
 from aws_lambda_powertools.event_handler.router import APIGatewayHttpRouter
 
+from provision import build_pipeline_body, create_client, ensure_search_pipeline
+from query_cache import QueryEmbeddingCache, SharedQueryVectorStore
+from search_backend import create_backend
+
 # Setup environment variables & validate
 OPENSEARCH_HOST = os.environ["OPENSEARCH_HOST"]
 assert OPENSEARCH_HOST, "OPENSEARCH_HOST environment variable not set"
@@ -33,6 +41,25 @@ SEARCH_PIPELINE_NAME = os.environ.get(
     "SEARCH_PIPELINE_NAME", "knowledge-search-pipeline"
 )
 
+# `_source` fields never returned unless requested by name
+VECTOR_FIELDS = [field for field in os.environ.get("VECTOR_FIELDS", "*_vector,*_embedding").split(",") if field]
+# fields returned when the request has no `fields` parameter
+DEFAULT_FIELDS = ["question", "answer", "context", "published_at"]
+# unique field breaking score ties of paged queries, so `search_after` cursors are stable. OpenSearch
+# sorts on `_id` unless `indices.id_field_data.enabled` is off, set a keyword field then
+SORT_TIEBREAKER = os.environ.get("SORT_TIEBREAKER", "_id")
+# vector candidates of a paged query, fixed for all its pages since min-max normalization depends on them.
+# Queries that do not page keep `k = limit`, so their scores and SCORE_THRESHOLD cut are unchanged
+KNN_CANDIDATES = int(os.environ.get("KNN_CANDIDATES", 100))
+# `opensearch`, or `local` to search an NDJSON snapshot in-process for load tests and benchmarks
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "opensearch")
+LOCAL_SEARCH_SNAPSHOT = os.environ.get("LOCAL_SEARCH_SNAPSHOT", "")
+
+QUERY_CACHE_MAX_SIZE = int(os.environ.get("QUERY_CACHE_MAX_SIZE", 1024))
+QUERY_CACHE_TTL = int(os.environ.get("QUERY_CACHE_TTL", 60 * 60))
+QUERY_CACHE_TABLE_NAME = os.environ.get("QUERY_CACHE_TABLE_NAME", "")
+QUERY_CACHE_SHARED_TTL = int(os.environ.get("QUERY_CACHE_SHARED_TTL", 7 * 24 * 60 * 60))
+
 # Setup tracers and loggers
 tracer = Tracer(service="knowledge-search")
 logger = Logger(service="knowledge-search")
@@ -41,54 +68,56 @@ router = APIGatewayHttpRouter()
 
 # Setup AWS clients
 bedrock = boto3.client("bedrock-runtime", region_name=AWS_REGION)
-credentials = boto3.Session().get_credentials()
-auth = AWSV4SignerAuth(credentials, AWS_REGION)
-
-# Setup OpenSearch client
-logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
-client = OpenSearch(
-    hosts=[{"host": OPENSEARCH_HOST, "port": 443}],
-    http_auth=auth,
-    use_ssl=True,
-    verify_certs=True,
-    http_compress=True,
-    connection_class=RequestsHttpConnection,
-    pool_maxsize=10,
+
+# Query embedding cache, kept across warm invocations
+query_cache = QueryEmbeddingCache(
+    model_id=EMBEDDING_MODEL_ARN,
+    max_size=QUERY_CACHE_MAX_SIZE,
+    ttl=QUERY_CACHE_TTL,
+    shared=SharedQueryVectorStore(QUERY_CACHE_TABLE_NAME, ttl_seconds=QUERY_CACHE_SHARED_TTL)
+    if QUERY_CACHE_TABLE_NAME
+    else None,
 )
-logger.info(f"Connected to OpenSearch using {client}")
 
 # Setup search pipeline
-pipeline_body = {
-    "description": "Knowledge search hybrid pipeline",
-    "phase_results_processors": [
-        {
-            "normalization-processor": {
-                "normalization": {
-                    "technique": "min_max",
-                },
-                "combination": {
-                    "technique": "arithmetic_mean",
-                    "parameters": {
-                        "weights": [
-                            KEYWORD_WEIGHT,
-                            VECTOR_WEIGHT,
-                        ]
-                    },
-                },
-            }
-        }
-    ],
-}
+pipeline_body = build_pipeline_body(KEYWORD_WEIGHT, VECTOR_WEIGHT)
+
+# OpenSearch client, created on first use so cold starts make no network calls
+_client = None
+_client_lock = threading.Lock()
 
-try:
-    client.transport.perform_request(
-        "PUT",
-        f"/_search/pipeline/{SEARCH_PIPELINE_NAME}",
-        body=pipeline_body,
-    )
-    logger.info("Search pipeline created successfully")
-except Exception as e:
-    logger.error(f"Error creating search pipeline: {str(e)}")
+
+def get_client() -> OpenSearch:
+    """Returns the memoized OpenSearch client, checking once per container that the search pipeline is current."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logger.info(f"Connecting to OpenSearch at {OPENSEARCH_HOST}")
+                client = create_client(OPENSEARCH_HOST, AWS_REGION)
+                try:
+                    ensure_search_pipeline(client, SEARCH_PIPELINE_NAME, pipeline_body)
+                except Exception as e:
+                    logger.error(f"Error creating search pipeline: {str(e)}")
+                _client = client
+    return _client
+
+
+# the local backend applies the same pipeline definition to hybrid queries
+backend = create_backend(
+    SEARCH_BACKEND,
+    get_client,
+    snapshot=LOCAL_SEARCH_SNAPSHOT,
+    pipelines={SEARCH_PIPELINE_NAME: pipeline_body},
+)
+
+
+def bootstrap() -> dict:
+    """Provisions the search pipeline once after a deploy, e.g. `aws lambda invoke --payload '{"action": "bootstrap"}'`."""
+    client = create_client(OPENSEARCH_HOST, AWS_REGION)
+    written = ensure_search_pipeline(client, SEARCH_PIPELINE_NAME, pipeline_body)
+    logger.info("Bootstrap finished", extra={"pipeline": SEARCH_PIPELINE_NAME, "written": written})
+    return {"pipeline": SEARCH_PIPELINE_NAME, "written": written}
 
 
 def get_embedding(text):
@@ -105,6 +134,52 @@ def get_embedding(text):
         return None
 
 
+def get_query_embedding(query):
+    """Returns the query vector from the cache or Bedrock, and the cache status."""
+    vector, cache_status = query_cache.get(query)
+    if vector is None:
+        vector = get_embedding(query)
+        if vector:
+            query_cache.set(query, vector)
+    logger.info(f"Query embedding cache {cache_status}", extra=query_cache.stats())
+    return vector, cache_status
+
+
+def build_source_filter(fields: Optional[str]) -> dict:
+    """Builds the `_source` filter from a comma separated `fields` parameter, a `-` prefix excludes a field."""
+    includes, excludes = [], list(VECTOR_FIELDS)
+    for field in (fields or "").split(","):
+        field = field.strip()
+        if field.startswith("-"):
+            excludes.append(field[1:])
+        elif field:
+            includes.append(field)
+    if not fields:
+        includes = list(DEFAULT_FIELDS)
+    # a vector field requested by name is returned
+    excludes = [pattern for pattern in excludes if not any(fnmatch(field, pattern) for field in includes)]
+    return {"includes": includes, "excludes": excludes} if includes else {"excludes": excludes}
+
+
+def encode_cursor(sort_values: List, offset: int, k: int) -> str:
+    """Encodes the sort values of the last hit, the number of hits paged so far and the knn `k` as an opaque cursor."""
+    data = json.dumps({"search_after": sort_values, "offset": offset, "k": k}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decodes a cursor, raises ValueError if it is malformed."""
+    data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if (
+        not isinstance(data, dict)
+        or not isinstance(data.get("search_after"), list)
+        or not isinstance(data.get("offset"), int)
+        or not isinstance(data.get("k"), int)
+    ):
+        raise ValueError("Malformed cursor")
+    return data
+
+
 @router.get("/")
 @tracer.capture_method
 def search_knowledge() -> Response:
@@ -126,8 +201,24 @@ def search_knowledge() -> Response:
             body={"error": "Missing query parameter"},
         )
 
+    # paging is opt-in, with `paginate=true` on the first page or a cursor on later ones
+    cursor = app.current_event.query_string_parameters.get("cursor")
+    paginate = bool(cursor) or app.current_event.query_string_parameters.get("paginate", "").lower() == "true"
+    try:
+        if cursor:
+            page = decode_cursor(cursor)
+        else:
+            page = {"search_after": None, "offset": 0, "k": max(limit, KNN_CANDIDATES) if paginate else limit}
+    except ValueError:
+        return Response(
+            status_code=HTTPStatus.BAD_REQUEST,
+            content_type=content_types.APPLICATION_JSON,
+            body={"error": "Invalid cursor"},
+        )
+    source_filter = build_source_filter(app.current_event.query_string_parameters.get("fields"))
+
     # Create query embedding
-    query_vector = get_embedding(query)
+    query_vector, embedding_cache_status = get_query_embedding(query)
     if not query_vector:
         return Response(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -155,41 +246,55 @@ def search_knowledge() -> Response:
                             "knn": {
                                 "question_vector": {
                                     "vector": query_vector,
-                                    "k": limit,
+                                    # same k on every page of a cursor, so scores keep their place in the ranking
+                                    "k": page["k"],
                                 }
                             }
                         },
                     ]
                 }
             },
-            "sort": [{"_score": "desc"}],
+            "sort": [{"_score": "desc"}, {SORT_TIEBREAKER: "asc"}] if paginate else [{"_score": "desc"}],
+            "_source": source_filter,
         }
+        if page["search_after"]:
+            search_body["search_after"] = page["search_after"]
 
         # Execute hybrid search
-        response = client.search(
-            index=INDEX_NAME,
-            body=search_body,
+        response = backend.search(
+            INDEX_NAME,
+            search_body,
             params={"search_pipeline": SEARCH_PIPELINE_NAME},
         )
 
         # Process results
         results = []
-        for hit in response['hits']['hits']:
+        hits = response['hits']['hits']
+        for hit in hits:
             if hit['_score'] >= SCORE_THRESHOLD:
+                source = hit.get('_source', {})
+                question = source.get('question')
                 results.append({
                     'id': hit['_id'],
-                    'question': hit['_source'].get('question', ''),
-                    'answer': hit['_source'].get('answer', ''),
-                    'context': hit['_source'].get('context', ''),
-                    'published_at': hit['_source'].get('published_at', ''),
+                    **{field: source.get(field, '') for field in source_filter.get('includes', []) if '*' not in field},
+                    **source,
                     'score': hit['_score'],
-                    'citation': f"FAQ #{hit['_id']} - {hit['_source']['question'][:20]}...",
+                    'citation': f"FAQ #{hit['_id']} - {question[:20]}..." if question else f"FAQ #{hit['_id']}",
                 })
 
+        # hits are sorted by score, so a page ending below the threshold is the last useful one
+        next_cursor = None
+        if paginate and hits and len(hits) == limit and hits[-1]['_score'] >= SCORE_THRESHOLD:
+            next_cursor = encode_cursor(hits[-1]['sort'], page["offset"] + len(hits), page["k"])
+
         return Response(
             status_code=HTTPStatus.OK,
             content_type=content_types.APPLICATION_JSON,
-            body={"content": results},
+            body={
+                "content": results,
+                "next_cursor": next_cursor,
+                "metadata": {"embedding_cache": embedding_cache_status},
+            },
         )
     except Exception:
         traceback.print_exc()
@@ -210,4 +315,6 @@ app.include_router(router)
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_HTTP)
 @tracer.capture_lambda_handler
 def lambda_handler(event, context) -> dict:
+    if event.get("action") == "bootstrap":
+        return bootstrap()
     return app.resolve(event, context)
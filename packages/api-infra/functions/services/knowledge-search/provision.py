@@ -0,0 +1,76 @@
+import os
+import json
+
+import boto3
+from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth, exceptions as os_exceptions
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+
+def create_client(host: str, region: str, pool_maxsize: int = 10) -> OpenSearch:
+    """Builds a SigV4 signed OpenSearch client, no request is sent until the client is used."""
+    credentials = boto3.Session().get_credentials()
+    return OpenSearch(
+        hosts=[{"host": host, "port": 443}],
+        http_auth=AWSV4SignerAuth(credentials, region),
+        use_ssl=True,
+        verify_certs=True,
+        http_compress=True,
+        connection_class=RequestsHttpConnection,
+        pool_maxsize=pool_maxsize,
+    )
+
+
+def build_pipeline_body(keyword_weight: float, vector_weight: float) -> dict:
+    """Hybrid search pipeline normalizing keyword and vector scores with min-max and weighting them."""
+    return {
+        "description": "Knowledge search hybrid pipeline",
+        "phase_results_processors": [
+            {
+                "normalization-processor": {
+                    "normalization": {
+                        "technique": "min_max",
+                    },
+                    "combination": {
+                        "technique": "arithmetic_mean",
+                        "parameters": {
+                            "weights": [
+                                keyword_weight,
+                                vector_weight,
+                            ]
+                        },
+                    },
+                }
+            }
+        ],
+    }
+
+
+def ensure_search_pipeline(client: OpenSearch, name: str, body: dict) -> bool:
+    """Creates or updates the search pipeline unless it already matches, returns whether it was written."""
+    path = f"/_search/pipeline/{name}"
+    try:
+        current = client.transport.perform_request("GET", path).get(name)
+    except os_exceptions.NotFoundError:
+        current = None
+    if current == body:
+        return False
+    client.transport.perform_request("PUT", path, body=body)
+    logger.info(f"Search pipeline '{name}' {'updated' if current else 'created'}")
+    return True
+
+
+def main():
+    """Provisions the pipeline from a host that can reach the domain, e.g. `python provision.py` on a bastion."""
+    client = create_client(os.environ["OPENSEARCH_HOST"], os.environ.get("AWS_REGION", "us-west-2"))
+    name = os.environ.get("SEARCH_PIPELINE_NAME", "knowledge-search-pipeline")
+    body = build_pipeline_body(
+        float(os.environ.get("KEYWORD_WEIGHT", 0.4)),
+        float(os.environ.get("VECTOR_WEIGHT", 0.6)),
+    )
+    print(json.dumps({"pipeline": name, "written": ensure_search_pipeline(client, name, body)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import time
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes Unicode forms, case and whitespace so trivially different queries share a vector."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class SharedQueryVectorStore:
+    """
+    Query vectors in a DynamoDB table shared by all containers, so a cold container
+    gets popular vectors with one GetItem instead of a Bedrock call.
+    """
+
+    def __init__(self, table_name: str, ttl_seconds: int = 0):
+        self.table = boto3.resource("dynamodb").Table(table_name)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[List[float]]:
+        item = self.table.get_item(Key={"pk": key}, ProjectionExpression="vector").get("Item")
+        if not item:
+            return None
+        vector = array("f")
+        vector.frombytes(item["vector"].value)
+        return vector.tolist()
+
+    def put(self, key: str, vector: List[float]):
+        item = {"pk": key, "vector": array("f", vector).tobytes()}
+        if self.ttl_seconds:
+            item["expires_at"] = int(time.time()) + self.ttl_seconds
+        self.table.put_item(Item=item)
+
+
+class QueryEmbeddingCache:
+    """
+    Module-level LRU of normalized query text to vector with a TTL, surviving warm invocations,
+    optionally backed by a shared store for cold starts.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_size: int = 1024,
+        ttl: float = 60 * 60,
+        shared: Optional[SharedQueryVectorStore] = None,
+    ):
+        self.model_id = model_id
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+
+    def key(self, query: str) -> str:
+        digest = hashlib.sha256(f"{self.model_id}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+        return f"query#{digest}"
+
+    def get(self, query: str) -> Tuple[Optional[List[float]], str]:
+        """
+        Looks up a query vector in memory, then in the shared store.
+
+        Returns the vector (None on a miss) and where it was found: "hit", "shared_hit" or "miss".
+        """
+        key = self.key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], "hit"
+            if entry:
+                del self._entries[key]
+
+        if self.shared:
+            try:
+                vector = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared query vector lookup failed: {e}")
+                vector = None
+            if vector:
+                self._set_local(key, vector)
+                self.shared_hits += 1
+                return vector, "shared_hit"
+
+        self.misses += 1
+        return None, "miss"
+
+    def set(self, query: str, vector: List[float]):
+        """Stores a vector in memory and in the shared store."""
+        key = self.key(query)
+        self._set_local(key, vector)
+        if self.shared:
+            try:
+                self.shared.put(key, vector)
+            except Exception as e:
+                logger.warning(f"Shared query vector store failed: {e}")
+
+    def _set_local(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,60 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from opensearchpy import OpenSearch
+
+# in-process engine for load tests and benchmarks, next to the functions but not deployed with them
+LOCAL_SEARCH_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "local"))
+
+
+class SearchBackend(ABC):
+    """Runs OpenSearch query DSL bodies, so handlers build the same requests for every backend."""
+
+    @abstractmethod
+    def search(self, index: str, body: dict, params: Optional[dict] = None) -> dict:
+        """Runs one search and returns the OpenSearch response."""
+
+    @abstractmethod
+    def msearch(self, index: str, bodies: List[dict]) -> List[dict]:
+        """Runs several searches, returning a response or an `{"error": ...}` item per body in order."""
+
+
+class OpenSearchBackend(SearchBackend):
+    """Searches an OpenSearch domain through a client created on first use."""
+
+    def __init__(self, get_client: Callable[[], OpenSearch]):
+        self.get_client = get_client
+
+    def search(self, index: str, body: dict, params: Optional[dict] = None) -> dict:
+        return self.get_client().search(index=index, body=body, params=params or {})
+
+    def msearch(self, index: str, bodies: List[dict]) -> List[dict]:
+        lines = []
+        for body in bodies:
+            lines.extend(({"index": index}, body))
+        return self.get_client().msearch(body=lines)["responses"]
+
+
+def create_backend(
+    name: str,
+    get_client: Callable[[], OpenSearch],
+    snapshot: str = "",
+    pipelines: Optional[Dict[str, dict]] = None,
+) -> SearchBackend:
+    """
+    Builds the backend selected by SEARCH_BACKEND.
+
+    - opensearch: the domain at OPENSEARCH_HOST
+    - local: an NDJSON snapshot searched in-process, with `pipelines` applied to hybrid queries
+    """
+    if name == "opensearch":
+        return OpenSearchBackend(get_client)
+    if name == "local":
+        if LOCAL_SEARCH_DIR not in sys.path:
+            sys.path.append(LOCAL_SEARCH_DIR)
+        from local_search import LocalSearchBackend
+
+        return LocalSearchBackend.from_snapshot(snapshot, pipelines=pipelines)
+    raise ValueError(f"Unknown search backend: {name}")
@@ -1,6 +1,7 @@
 import * as path from "path";
 import * as cdk from "aws-cdk-lib";
 import * as apigw from "aws-cdk-lib/aws-apigatewayv2";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import * as ec2 from "aws-cdk-lib/aws-ec2";
 import * as iam from "aws-cdk-lib/aws-iam";
 import * as lambda from "aws-cdk-lib/aws-lambda";
@@ -23,19 +24,25 @@ export class KnowledgeSearchAPIStack extends cdk.Stack {
   constructor(scope: Construct, id: string, props: IProps) {
     super(scope, id, props);
 
-    const fn = this.createKnowledgeSearchLambda(props);
-    this.registerKnowledgeSearchRoutes(props.api, props.authorizer, fn);
-
-    new EmbeddingPipeline(this, "EmbeddingPipeline", {
+    const pipeline = new EmbeddingPipeline(this, "EmbeddingPipeline", {
       vpc: props.vpc,
       osDomain: props.osDomain,
       osSecurityGroup: props.osSecurityGroup,
       indexName: props.indexName,
       embeddingModelArn: props.embeddingModelArn,
     });
+
+    const fn = this.createKnowledgeSearchLambda(
+      props,
+      pipeline.embeddingCacheTable
+    );
+    this.registerKnowledgeSearchRoutes(props.api, props.authorizer, fn);
   }
 
-  private createKnowledgeSearchLambda(props: IProps): lambda.IFunction {
+  private createKnowledgeSearchLambda(
+    props: IProps,
+    queryCacheTable: dynamodb.ITable
+  ): lambda.IFunction {
     const ns = this.node.tryGetContext("ns") as string;
 
     const layers: lambda.ILayerVersion[] = [
@@ -97,6 +104,8 @@ export class KnowledgeSearchAPIStack extends cdk.Stack {
     );
     // Add permissions to read/write to OpenSearch
     props.osDomain.grantReadWrite(role);
+    // Add permissions to share cached query embeddings across containers
+    queryCacheTable.grantReadWriteData(role);
 
     const fn = new lambda.Function(this, "KnowledgeSearchAPIFunction", {
       functionName: `${ns}KnowledgeSearchAPI`,
@@ -119,6 +128,7 @@ export class KnowledgeSearchAPIStack extends cdk.Stack {
         OPENSEARCH_HOST: `${props.osDomain.domainEndpoint}`,
         INDEX_NAME: props.indexName,
         EMBEDDING_MODEL_ARN: props.embeddingModelArn,
+        QUERY_CACHE_TABLE_NAME: queryCacheTable.tableName,
       },
       tracing: lambda.Tracing.ACTIVE,
       securityGroups: [props.osSecurityGroup],
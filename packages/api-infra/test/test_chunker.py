@@ -0,0 +1,47 @@
+"""
+Chunks must not depend on where the S3 stream splits the text, or re-embedding an unchanged document
+changes its chunk hashes.
+
+  python -m pytest test/test_chunker.py
+"""
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "functions" / "services" / "embedder"))
+
+from chunker import BoundaryChunker, create_chunker  # noqa: E402
+
+PARTS = ["ab", " ", "Hi.", "\n", "\n\n", " \t", "…", "。", '."', "가나다", "x" * 30, "y" * 300]
+
+
+def split(text: str, rng: random.Random, pieces: int) -> list:
+  cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, pieces - 1)))
+  return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_boundary_held_back_across_pieces():
+  chunker = BoundaryChunker(5, 2)
+  text = "ab ab ab ab ab Hi. \n\nab "
+  assert list(chunker.chunks([text[:21], text[21:]])) == list(chunker.chunks([text]))
+
+
+@pytest.mark.parametrize("strategy", ["sentence", "paragraph", "token"])
+def test_split_and_unsplit_input_give_the_same_chunks(strategy):
+  rng = random.Random(strategy)
+  for _ in range(200):
+    text = "".join(rng.choice(PARTS) for _ in range(rng.randint(0, 120)))
+    chunk_size = rng.randint(3, 40)
+    chunker = create_chunker(strategy, chunk_size, rng.randint(0, chunk_size - 1))
+    expected = list(chunker.chunks([text]))
+    assert list(chunker.chunks(split(text, rng, rng.randint(2, 10)))) == expected
+    assert list(chunker.chunks(list(text))) == expected
+
+
+def test_text_without_boundaries_is_cut_in_bounded_units():
+  chunker = create_chunker("sentence", 100, 10)
+  units = list(chunker.units("y" * 1000 for _ in range(100)))
+  assert max(len(unit) for unit in units) == 100
+  assert "".join(units) == "y" * 100000
@@ -0,0 +1,322 @@
+"""
+end-to-end load test of the streaming /api/chat endpoint
+
+Starts the item search stub and the chat API with the fake chat model in their own
+processes, drives `/api/chat` with streaming requests at a fixed concurrency and reports
+time to first token, inter-token latency (gaps between streamed text frames), total latency
+percentiles, throughput, and the API process' CPU time and resident memory per stream.
+
+Results are written as JSON with sorted keys and no timestamps, so runs can be diffed and
+compared; with `--baseline` the run fails if a metric regresses beyond `--tolerance`.
+
+Usage:
+    uv run -- python -m benchmarks.chat_load [--concurrency 16] [--requests 200] [--tool-calls mixed]
+        [--output benchmarks/results/chat_load.json] [--baseline benchmarks/results/chat_load.json]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_chat_model import TOOL_PATTERNS
+
+APP_DIR = Path(__file__).resolve().parent.parent
+QUESTIONS = [
+    "러닝화 추천해 주세요",
+    "여름에 입기 좋은 티셔츠 있나요?",
+    "Do you have a black backpack for school?",
+    "선물용 시계 보여주세요",
+    "Which lotion is good for dry skin?",
+    "청바지 사이즈 추천 부탁해요",
+    "샌들 중에 편한 것 있어요?",
+    "I need sneakers for walking",
+]
+# metrics where a lower value is better, throughput metrics are better higher
+LOWER_IS_BETTER = ("_ms", "_mib", "_kib")
+# metrics describing the workload rather than its performance
+WORKLOAD_METRICS = ("requests", "tool_calls_per_request")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """
+    read user and system CPU time of a process from /proc, None where /proc is not available
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rpartition(")")[2].split()
+    except OSError:
+        return None
+    # utime and stime are the 14th and 15th fields, counted from the pid
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_rss_kib(pid: int) -> Optional[int]:
+    """
+    read the resident set size of a process from /proc, None where /proc is not available
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def start(module: str, port: int, args: List[str], env: Dict[str, str]) -> Tuple[subprocess.Popen, IO[bytes]]:
+    # stderr goes to a file, an unread pipe would block the process once it fills up
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, "-m", module, "--port", str(port), *args],
+        cwd=APP_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=stderr,
+    )
+    return process, stderr
+
+
+async def wait_healthy(
+    client: httpx.AsyncClient,
+    url: str,
+    process: subprocess.Popen,
+    stderr: IO[bytes],
+    timeout: float = 60.0,
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            stderr.seek(0)
+            raise RuntimeError(f"{url} exited:\n{stderr.read().decode(errors='replace')}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become healthy in {timeout}s")
+
+
+async def chat(client: httpx.AsyncClient, url: str, question: str) -> Dict[str, Any]:
+    """
+    send one streaming chat request and time its SSE frames
+
+    Args:
+        client (httpx.AsyncClient): HTTP client
+        url (str): chat endpoint
+        question (str): user message
+
+    Returns:
+        Dict[str, Any]: timings in milliseconds and frame counts of the stream
+    """
+    body = {"recent_history": [], "user_message_content": question, "stream": True}
+    started = time.perf_counter()
+    text_frames: List[float] = []
+    result = {"tool_calls": 0, "chars": 0, "errors": 0}
+    async with client.stream("POST", url, json=body) as response:
+        if response.status_code != 200:
+            return {**result, "errors": 1}
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if "error" in event:
+                result["errors"] += 1
+            elif event.get("tool_calls"):
+                result["tool_calls"] += len(event["tool_calls"])
+            elif event.get("role") == "assistant" and event.get("content"):
+                text_frames.append(time.perf_counter())
+                result["chars"] += len(event["content"])
+    finished = time.perf_counter()
+    return {
+        **result,
+        "ttft_ms": (text_frames[0] - started) * 1000 if text_frames else None,
+        "itl_ms": [(later - earlier) * 1000 for earlier, later in zip(text_frames, text_frames[1:])],
+        "latency_ms": (finished - started) * 1000,
+    }
+
+
+async def sample_rss(pid: int, samples: List[int], interval: float = 0.05) -> None:
+    while True:
+        rss = process_rss_kib(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(interval)
+
+
+async def run_load(args: argparse.Namespace, pid: int, base_url: str) -> Dict[str, Any]:
+    """
+    drive the chat endpoint and summarize the measurements
+
+    Args:
+        args (argparse.Namespace): command line arguments
+        pid (int): chat API process id
+        base_url (str): chat API base URL
+
+    Returns:
+        Dict[str, Any]: metrics
+    """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        url = "/api/chat"
+        # warm up imports, connection pools and caches outside the measurement
+        await asyncio.gather(*(chat(client, url, question) for question in QUESTIONS[:args.concurrency]))
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(number: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await chat(client, url, QUESTIONS[number % len(QUESTIONS)])
+
+        rss_samples: List[int] = []
+        rss_baseline = process_rss_kib(pid)
+        cpu_started = process_cpu_seconds(pid)
+        sampler = asyncio.create_task(sample_rss(pid, rss_samples))
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(number) for number in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        cpu_finished = process_cpu_seconds(pid)
+
+    ttft = [result["ttft_ms"] for result in results if result.get("ttft_ms") is not None]
+    itl = [gap for result in results for gap in result.get("itl_ms", [])]
+    latency = [result["latency_ms"] for result in results if "latency_ms" in result]
+    metrics: Dict[str, Any] = {
+        "requests": len(results),
+        "errors": sum(result["errors"] for result in results),
+        "tool_calls_per_request": round(sum(result["tool_calls"] for result in results) / len(results), 2),
+        "throughput_rps": round(len(results) / elapsed, 2),
+        "output_chars_per_s": round(sum(result["chars"] for result in results) / elapsed, 1),
+    }
+    for name, values in (("ttft", ttft), ("itl", itl), ("latency", latency)):
+        for label, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            metrics[f"{name}_{label}_ms"] = percentile(values, q)
+    if cpu_started is not None and cpu_finished is not None:
+        metrics["cpu_per_stream_ms"] = round((cpu_finished - cpu_started) * 1000 / len(results), 2)
+    if rss_baseline is not None and rss_samples:
+        peak = max(rss_samples)
+        metrics["rss_baseline_mib"] = round(rss_baseline / 1024, 1)
+        metrics["rss_peak_mib"] = round(peak / 1024, 1)
+        metrics["rss_per_stream_kib"] = round(max(0, peak - rss_baseline) / args.concurrency, 1)
+    return metrics
+
+
+def compare(metrics: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    list metrics that regressed by more than the tolerance against the baseline
+
+    Args:
+        metrics (Dict[str, Any]): metrics of this run
+        baseline (Dict[str, Any]): metrics of the baseline run
+        tolerance (float): allowed relative regression
+
+    Returns:
+        List[str]: regression descriptions
+    """
+    regressions = []
+    for name, value in metrics.items():
+        previous = baseline.get(name)
+        if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or name in WORKLOAD_METRICS:
+            continue
+        if name == "errors":
+            regressed = value > previous
+        elif name.endswith(LOWER_IS_BETTER):
+            # differences below one unit are timer and sampling noise
+            regressed = value > previous * (1 + tolerance) and value - previous > 1
+        else:
+            regressed = value < previous * (1 - tolerance)
+        if regressed:
+            regressions.append(f"{name}: {previous} -> {value}")
+    return regressions
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    stub_port, app_port = free_port(), free_port()
+    stub, stub_stderr = start("benchmarks.item_search_stub", stub_port, [
+        "--latency", str(args.tool_latency),
+        "--jitter", str(args.jitter),
+    ], {})
+    server, server_stderr = start("benchmarks.chat_load_server", app_port, [
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--first-token-latency", str(args.first_token_latency),
+        "--jitter", str(args.jitter),
+        "--answer-tokens", str(args.answer_tokens),
+        "--tool-calls", args.tool_calls,
+        "--parallel-tool-calls", str(args.parallel_tool_calls),
+        "--seed", str(args.seed),
+    ], {"ITEM_SEARCH_API_URL": f"http://127.0.0.1:{stub_port}"})
+    try:
+        async with httpx.AsyncClient() as client:
+            await wait_healthy(client, f"http://127.0.0.1:{stub_port}/health", stub, stub_stderr)
+            await wait_healthy(client, f"http://127.0.0.1:{app_port}/health", server, server_stderr)
+        return await run_load(args, server.pid, f"http://127.0.0.1:{app_port}")
+    finally:
+        for process, stderr in ((server, server_stderr), (stub, stub_stderr)):
+            process.terminate()
+            process.wait(timeout=10)
+            stderr.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.4)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--tool-calls", choices=TOOL_PATTERNS, default="mixed")
+    parser.add_argument("--parallel-tool-calls", type=int, default=3)
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="item search stub seconds per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results JSON to this path")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    config = {
+        key: value for key, value in sorted(vars(args).items())
+        if key not in ("output", "baseline", "tolerance")
+    }
+    results = {"config": config, "metrics": asyncio.run(main_async(args))}
+    report = json.dumps(results, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    print(report, end="")
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(report, encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("config") != config:
+            print("warning: baseline was run with a different configuration", file=sys.stderr)
+        regressions = compare(results["metrics"], baseline["metrics"], args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
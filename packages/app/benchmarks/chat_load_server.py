@@ -0,0 +1,63 @@
+"""
+run the chat API with the fake chat model for load tests
+
+Serves `main.app` unchanged except for the chat model, FakeChatModel instead of Bedrock, so
+no AWS region or credentials are needed. The item search API URL comes from the environment,
+point it at `benchmarks.item_search_stub`. Started by `benchmarks.chat_load`.
+
+Usage:
+    ITEM_SEARCH_API_URL=http://127.0.0.1:9100 uv run -- python -m benchmarks.chat_load_server [--port 8100]
+"""
+import os
+import argparse
+
+# the fake model needs no Bedrock, and the semantic cache would answer repeated questions without it
+os.environ.setdefault("MODEL_ID", "fake-bedrock-converse")
+os.environ.setdefault("ITEM_SEARCH_API_KEY", "load-test")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+os.environ.setdefault("HISTORY_SUMMARY_ENABLED", "false")
+
+import uvicorn
+from fastapi import FastAPI
+
+import main as chat_app
+from benchmarks.fake_chat_model import FakeChatModel, TOOL_PATTERNS
+
+
+def install_fake_model(app: FastAPI, model: FakeChatModel) -> None:
+    """
+    make the app lifespan build its chat service on the fake model, no Bedrock client is created
+
+    Args:
+        app (FastAPI): chat application
+        model (FakeChatModel): fake chat model
+    """
+    app.state.chat_model = model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.4)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--tool-calls", choices=TOOL_PATTERNS, default="mixed")
+    parser.add_argument("--parallel-tool-calls", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    install_fake_model(chat_app.app, FakeChatModel(
+        tokens_per_second=args.tokens_per_second,
+        first_token_latency=args.first_token_latency,
+        jitter=args.jitter,
+        answer_tokens=args.answer_tokens,
+        tool_calls=args.tool_calls,
+        parallel_tool_calls=args.parallel_tool_calls,
+        seed=args.seed,
+    ))
+    uvicorn.run(chat_app.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+deterministic fake of the streaming Bedrock chat model for load tests
+
+Streams Bedrock Converse shaped chunks (text blocks, tool_use blocks with tool call chunks
+and a final usage chunk) at a configurable rate, so `ChatService` runs its real streaming,
+tool and SSE code paths without calling Bedrock.
+"""
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.utils.stream_accumulator import AIMessageAccumulator
+
+WORDS = [
+    "고객님", "찾으시는", "상품을", "추천해", "드릴게요", "가볍고", "편안한", "착용감이", "좋은", "제품입니다",
+    "the", "running", "shoes", "are", "lightweight", "and", "breathable", "with", "a", "cushioned", "sole",
+    "available", "in", "black", "white", "navy", "sizes", "from", "240", "to", "290", "mm",
+]
+LEAD_IN = ["상품을", "검색해", "볼게요", "let", "me", "search", "for", "that"]
+SEARCHES = [
+    ("running shoes", "FOOTWEAR_SHOES"),
+    ("sneakers", "FOOTWEAR_SHOES"),
+    ("tshirt", "APPAREL_TOPWEAR"),
+    ("jeans", "APPAREL_BOTTOMWEAR"),
+    ("backpack", "ACCESSORIES_BAGS"),
+    ("watch", "ACCESSORIES_WATCHES"),
+    ("lotion", "PERSONAL CARE_SKIN CARE"),
+    ("sandals", "FOOTWEAR_SANDAL"),
+]
+# tool call patterns, `mixed` picks one per request
+TOOL_PATTERNS = ("none", "single", "parallel", "mixed")
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    fake chat model streaming deterministic answers and tool calls
+
+    The first model turn of a request calls `item_search` following `tool_calls`, the turn
+    after the tool results answers with text. Answers, tool arguments and jitter are seeded
+    by `seed` and the user message, so the same request always streams the same chunks.
+
+    Attributes:
+        tokens_per_second (float): average text tokens streamed per second
+        first_token_latency (float): seconds before the first chunk of a turn
+        jitter (float): relative random variation of every delay, 0 disables it
+        answer_tokens (int): text tokens of the final answer
+        tool_calls (str): none, single, parallel or mixed
+        parallel_tool_calls (int): tool calls of a parallel turn
+        seed (int): seed of the deterministic randomness
+    """
+
+    tokens_per_second: float = 50.0
+    first_token_latency: float = 0.4
+    jitter: float = 0.2
+    answer_tokens: int = 120
+    tool_calls: str = "mixed"
+    parallel_tool_calls: int = 3
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-bedrock-converse"
+
+    def _delay(self, rng: random.Random, seconds: float) -> float:
+        return max(0.0, seconds * (1 + self.jitter * rng.uniform(-1, 1)))
+
+    def _plan(self, messages: List[BaseMessage]) -> List[Tuple[float, AIMessageChunk]]:
+        """
+        build the chunks of a model turn and the delay before each
+
+        Args:
+            messages (List[BaseMessage]): request messages
+
+        Returns:
+            List[Tuple[float, AIMessageChunk]]: delay in seconds and chunk pairs
+        """
+        user_turns = [
+            index for index, message in enumerate(messages)
+            if isinstance(message, HumanMessage) and isinstance(message.content, str)
+        ]
+        last_user = user_turns[-1] if user_turns else 0
+        after_tools = any(isinstance(message, ToolMessage) for message in messages[last_user:])
+        user_text = messages[last_user].content if user_turns else ""
+        rng = random.Random(f"{self.seed}|{user_text}|{after_tools}")
+
+        pattern = self.tool_calls
+        if pattern == "mixed":
+            pattern = rng.choice(("none", "single", "single", "parallel"))
+        calls = 0 if after_tools or pattern == "none" else 1 if pattern == "single" else self.parallel_tool_calls
+
+        words = rng.sample(LEAD_IN, 4) if calls else [rng.choice(WORDS) for _ in range(self.answer_tokens)]
+        token_delay = 1 / self.tokens_per_second
+        plan = []
+        for position, word in enumerate(words):
+            delay = self._delay(rng, self.first_token_latency if position == 0 else token_delay)
+            plan.append((delay, AIMessageChunk(content=[{"type": "text", "text": f"{word} ", "index": 0}])))
+
+        for call in range(calls):
+            name, category = rng.choice(SEARCHES)
+            tool_call_id = f"tooluse_{rng.getrandbits(64):016x}"
+            args = f'{{"name": "{name}", "category": "{category}"}}'
+            plan.append((self._delay(rng, token_delay), AIMessageChunk(
+                content=[{"type": "tool_use", "name": "item_search", "id": tool_call_id, "index": call + 1}],
+                tool_call_chunks=[{"name": "item_search", "id": tool_call_id, "args": "", "index": call + 1}],
+            )))
+            plan.append((self._delay(rng, token_delay), AIMessageChunk(
+                content=[{"type": "tool_use", "input": args, "index": call + 1}],
+                tool_call_chunks=[{"args": args, "index": call + 1}],
+            )))
+
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        plan.append((0.0, AIMessageChunk(
+            content=[],
+            response_metadata={"stopReason": "tool_use" if calls else "end_turn"},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(words) + calls * 10,
+                "total_tokens": input_tokens + len(words) + calls * 10,
+            },
+        )))
+        return plan
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, chunk in self._plan(messages):
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=chunk)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for delay, chunk in self._plan(messages):
+            if delay:
+                time.sleep(delay)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        accumulator = AIMessageAccumulator()
+        async for chunk in self._astream(messages):
+            accumulator.add(chunk.message)
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(accumulator.build()))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        accumulator = AIMessageAccumulator()
+        for chunk in self._stream(messages):
+            accumulator.add(chunk.message)
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(accumulator.build()))])
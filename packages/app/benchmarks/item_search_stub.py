@@ -0,0 +1,97 @@
+"""
+local stub of the item search API for load tests
+
+Serves `GET /v1/search/item/` and `POST /v1/search/item/batch` with deterministic items
+after a configurable latency, so tool calls exercise the real HTTP client, cache and batcher.
+
+Usage:
+    uv run -- python -m benchmarks.item_search_stub [--port 9100] [--latency 0.05] [--jitter 0.5]
+"""
+import asyncio
+import argparse
+import random
+import zlib
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI(title="Item Search API stub")
+app.state.latency = 0.05
+app.state.jitter = 0.5
+
+COLOURS = ["Black", "White", "Navy Blue", "Red", "Grey", "Green"]
+
+
+def make_items(name: str, category: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    build deterministic items for a query
+
+    Args:
+        name (str): item name keyword
+        category (str): item category
+        limit (int): number of items
+
+    Returns:
+        List[Dict[str, Any]]: items shaped like the item search API content
+    """
+    seed = zlib.crc32(f"{name}|{category}".encode("utf-8"))
+    master, _, sub = category.partition("_")
+    return [
+        {
+            "id": seed % 100000 + number,
+            "name": f"{COLOURS[(seed + number) % len(COLOURS)]} {name.title()} {number + 1}",
+            "category": category,
+            "masterCategory": master.title(),
+            "subCategory": sub.title(),
+            "articleType": name.title(),
+            "baseColour": COLOURS[(seed + number) % len(COLOURS)],
+            "gender": "Unisex",
+            "season": "Summer",
+            "year": 2020 + number % 5,
+        }
+        for number in range(limit)
+    ]
+
+
+async def wait(request: Request) -> None:
+    state = request.app.state
+    await asyncio.sleep(max(0.0, state.latency * (1 + state.jitter * random.uniform(-1, 1))))
+
+
+def page(query: Dict[str, Any]) -> Dict[str, Any]:
+    limit = int(query.get("limit") or 10)
+    return {"content": make_items(query.get("name") or "", query.get("category") or "", limit), "next_cursor": None}
+
+
+@app.get("/v1/search/item/")
+async def search_item(request: Request, name: Optional[str] = None, category: Optional[str] = None, limit: int = 10):
+    await wait(request)
+    return page({"name": name, "category": category, "limit": limit})
+
+
+@app.post("/v1/search/item/batch")
+async def search_items_batch(request: Request):
+    body = await request.json()
+    await wait(request)
+    return {"results": [page(query) for query in body.get("queries", [])]}
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.5, help="relative random variation of the latency")
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    app.state.jitter = args.jitter
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
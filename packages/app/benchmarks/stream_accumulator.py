@@ -0,0 +1,77 @@
+"""
+micro-benchmark for accumulating streamed AIMessageChunks
+
+Compares `chunk + chunk` merging with AIMessageAccumulator and reports the per-chunk cost
+as the answer grows.
+
+Usage:
+    uv run -- python -m benchmarks.stream_accumulator
+"""
+import time
+from typing import Callable, List, Optional
+
+from langchain_core.messages import AIMessageChunk
+
+from src.utils.stream_accumulator import AIMessageAccumulator
+
+ANSWER_LENGTHS = [100, 500, 1000, 2000, 4000]
+
+
+def make_chunks(count: int) -> List[AIMessageChunk]:
+    """
+    build Bedrock-like text chunks followed by a tool call
+
+    Args:
+        count (int): number of text chunks
+
+    Returns:
+        List[AIMessageChunk]: streamed chunks
+    """
+    chunks = [AIMessageChunk(content=[{"type": "text", "text": f"token{i} ", "index": 0}]) for i in range(count)]
+    chunks.append(AIMessageChunk(
+        content=[{"type": "tool_use", "name": "item_search", "id": "tool-1", "index": 1}],
+        tool_call_chunks=[{"name": "item_search", "id": "tool-1", "args": "", "index": 1}],
+    ))
+    chunks.append(AIMessageChunk(
+        content=[{"type": "tool_use", "input": '{"name": "shoes", "category": "FOOTWEAR_SHOES"}', "index": 1}],
+        tool_call_chunks=[{"args": '{"name": "shoes", "category": "FOOTWEAR_SHOES"}', "index": 1}],
+    ))
+    return chunks
+
+
+def merge_with_add(chunks: List[AIMessageChunk]) -> Optional[AIMessageChunk]:
+    message = None
+    for chunk in chunks:
+        message = chunk if message is None else message + chunk
+    return message
+
+
+def merge_with_accumulator(chunks: List[AIMessageChunk]) -> Optional[AIMessageChunk]:
+    accumulator = AIMessageAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.build()
+
+
+def per_chunk_us(merge: Callable[[List[AIMessageChunk]], Optional[AIMessageChunk]], chunks: List[AIMessageChunk]) -> float:
+    """
+    measure the best-of-3 per-chunk merge cost in microseconds
+    """
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        merge(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best / len(chunks) * 1e6
+
+
+def main() -> None:
+    print(f"{'chunks':>8} {'add (us/chunk)':>16} {'accumulator (us/chunk)':>24}")
+    for count in ANSWER_LENGTHS:
+        chunks = make_chunks(count)
+        assert merge_with_add(chunks).tool_calls == merge_with_accumulator(chunks).tool_calls
+        print(f"{count:>8} {per_chunk_us(merge_with_add, chunks):>16.1f} {per_chunk_us(merge_with_accumulator, chunks):>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,86 @@
 from dotenv import load_dotenv
 load_dotenv()  # noqa: E402
 
-from fastapi import FastAPI, Depends
+from typing import Optional
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from langchain_aws import BedrockEmbeddings, ChatBedrockConverse
 
 from src.config import config
 from src.utils.models import ChatRequest
 from src.adapters.chat_controller import handle_chat_request
 from src.services.chat_service import ChatService
+from src.services.history_manager import HistoryManager
+from src.services.semantic_cache import (
+    SemanticCache,
+    InMemorySemanticCacheBackend,
+    DynamoDBSemanticCacheBackend,
+)
+from src.tools.item_search import (
+    close_http_client,
+    item_search_cache_stats,
+    invalidate_item_search_cache,
+)
+from src.utils.metrics import registry as metrics_registry
+
 
-app = FastAPI(title="Open Rufus Chatbot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    build long-lived resources once per process and share them across requests
+
+    Args:
+        app (FastAPI): application instance
+    """
+    # model client, tool binding and tool dict are built once and reused by every request,
+    # a chat model set on `app.state.chat_model` before startup replaces the Bedrock client
+    app.state.chat_service = ChatService(
+        model=config.model_id,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens,
+        tool_max_concurrency=config.tool_max_concurrency,
+        tool_call_timeout=config.tool_call_timeout,
+        cache_system_prompt=config.prompt_cache_system,
+        cache_tools=config.prompt_cache_tools,
+        cache_conversation=config.prompt_cache_conversation,
+        stream_flush_interval=config.stream_flush_interval,
+        stream_flush_max_chars=config.stream_flush_max_chars,
+        llm=getattr(app.state, "chat_model", None),
+    )
+    app.state.history_manager = HistoryManager(
+        max_tokens=config.history_max_tokens,
+        keep_turns=config.history_keep_turns,
+        summarizer=ChatBedrockConverse(
+            model=config.history_summary_model_id,
+            temperature=0,
+            max_tokens=config.history_summary_max_tokens,
+        ) if config.history_summary_enabled else None,
+        summary_cache_size=config.history_summary_cache_max_size,
+        summary_cache_ttl=config.history_summary_cache_ttl,
+    )
+    app.state.semantic_cache = None
+    if config.semantic_cache_enabled:
+        backend = (
+            DynamoDBSemanticCacheBackend(config.semantic_cache_table_name)
+            if config.semantic_cache_table_name
+            else InMemorySemanticCacheBackend()
+        )
+        app.state.semantic_cache = SemanticCache(
+            embeddings=BedrockEmbeddings(model_id=config.semantic_cache_embedding_model_id),
+            backend=backend,
+            similarity_threshold=config.semantic_cache_threshold,
+            ttl=config.semantic_cache_ttl,
+            max_size=config.semantic_cache_max_size,
+            history_turns=config.semantic_cache_history_turns,
+        )
+        await app.state.semantic_cache.warm()
+    yield
+    await close_http_client()
+
+
+app = FastAPI(title="Open Rufus Chatbot API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,31 +90,60 @@ app.add_middleware(
 )
 
 
-def get_chat_service():
+def get_chat_service(request: Request) -> ChatService:
     """
-    return chat service instance
+    return the process-wide chat service instance built in the lifespan hook
+
+    Args:
+        request (Request): incoming request
 
     Returns:
         ChatService: chat service instance
     """
-    return ChatService(
-        model=config.model_id,
-        temperature=config.temperature,
-        max_tokens=config.max_tokens,
-    )
+    return request.app.state.chat_service
+
+
+def get_semantic_cache(request: Request) -> Optional[SemanticCache]:
+    """
+    return the process-wide semantic cache, None if disabled
+
+    Args:
+        request (Request): incoming request
+
+    Returns:
+        Optional[SemanticCache]: semantic cache instance
+    """
+    return request.app.state.semantic_cache
+
+
+def get_history_manager(request: Request) -> HistoryManager:
+    """
+    return the process-wide history manager
+
+    Args:
+        request (Request): incoming request
+
+    Returns:
+        HistoryManager: history manager instance
+    """
+    return request.app.state.history_manager
 
 
 @app.post("/api/chat")
 async def chat(
     request: ChatRequest,
     chat_service: ChatService = Depends(get_chat_service),
+    semantic_cache: Optional[SemanticCache] = Depends(get_semantic_cache),
+    history_manager: HistoryManager = Depends(get_history_manager),
 ):
     """
     handle chat request
 
     Args:
         request (ChatRequest): chat request data
-        llm_service (LLMService): LLM service instance
+        chat_service (ChatService): chat service instance
+        semantic_cache (Optional[SemanticCache]): semantic cache instance
+        history_manager (HistoryManager): history manager instance
 
     Returns:
         Union[StreamingResponse, ChatResponse]: response object
@@ -53,9 +153,45 @@ async def chat(
         request.user_message_content,
         request.stream,
         chat_service,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+        semantic_cache=semantic_cache,
+        history_manager=history_manager,
     )
 
 
+@app.get("/api/cache/stats")
+async def cache_stats(semantic_cache: Optional[SemanticCache] = Depends(get_semantic_cache)):
+    """
+    return semantic cache and item search cache counters
+
+    Args:
+        semantic_cache (Optional[SemanticCache]): semantic cache instance
+
+    Returns:
+        dict: cache counters
+    """
+    semantic = {"enabled": False}
+    if semantic_cache is not None:
+        semantic = {"enabled": True, "size": len(semantic_cache.index), **semantic_cache.stats.as_dict()}
+    return {"semantic_cache": semantic, "item_search": item_search_cache_stats()}
+
+
+@app.delete("/api/cache/items")
+async def invalidate_item_cache(name: Optional[str] = None, category: str = ""):
+    """
+    invalidate cached item search results, every entry if no name is given
+
+    Args:
+        name (Optional[str]): item name keyword
+        category (str): item category
+
+    Returns:
+        dict: number of removed entries
+    """
+    return {"invalidated": invalidate_item_search_cache(name, category)}
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -67,6 +203,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    expose latency histograms, token and SSE counters and in-flight streams for Prometheus
+
+    Returns:
+        Response: metrics in the Prometheus text exposition format
+    """
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import os
     import uvicorn
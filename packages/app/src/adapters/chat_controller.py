@@ -1,10 +1,12 @@
 import traceback
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 
 from src.services.chat_service import ChatService
+from src.services.history_manager import HistoryManager
+from src.services.semantic_cache import SemanticCache
 from src.utils.models import ChatResponse
 
 
@@ -13,6 +15,10 @@ async def handle_chat_request(
     user_message_content: str,
     stream: bool = True,
     chat_service: ChatService = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    semantic_cache: Optional[SemanticCache] = None,
+    history_manager: Optional[HistoryManager] = None,
 ):
     """
     handle chat request
@@ -22,12 +28,40 @@ async def handle_chat_request(
         user_message_content (str): user message content
         stream (bool, optional): whether to stream response. default is True.
         chat_service (ChatService, optional): chat service instance
+        temperature (Optional[float], optional): per-request temperature override
+        max_tokens (Optional[int], optional): per-request maximum tokens override
+        semantic_cache (Optional[SemanticCache], optional): semantic cache, disabled if None
+        history_manager (Optional[HistoryManager], optional): history manager, history is passed unbounded if None
 
     Returns:
         Union[StreamingResponse, ChatResponse]: response object
     """
+    # serve near-identical questions from the semantic cache without calling the model
+    lookup = None
+    if semantic_cache:
+        lookup = await semantic_cache.lookup(
+            user_message_content,
+            recent_history,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        if lookup.entry:
+            if not stream:
+                return ChatResponse(content=lookup.entry.content)
+            return StreamingResponse(
+                semantic_cache.replay_stream(lookup.entry),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                },
+            )
+
     langchain_messages = chat_service.convert_to_langchain_messages(
         recent_history)
+    # fit long sessions into the history token budget before building the prompt
+    if history_manager:
+        langchain_messages, _ = await history_manager.compact(langchain_messages)
     messages = chat_service.build_messages(
         langchain_messages, user_message_content)
 
@@ -35,16 +69,27 @@ async def handle_chat_request(
     if not stream:
         try:
             response_content = await chat_service.generate_complete_response(
-                messages
+                messages, temperature=temperature, max_tokens=max_tokens
             )
+            if lookup and not response_content.startswith("Error: "):
+                await semantic_cache.store(lookup, frames=[], content=response_content)
             return ChatResponse(content=response_content)
         except Exception as e:
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=str(e))
 
     # SSE streaming response
+    recorder = semantic_cache.recorder(lookup) if lookup else None
+    response_stream = chat_service.generate_streaming_response(
+        messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        on_event=recorder.observe if recorder else None,
+    )
+    if recorder:
+        response_stream = recorder.record(response_stream)
     return StreamingResponse(
-        chat_service.generate_streaming_response(messages),
+        response_stream,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
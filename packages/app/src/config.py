@@ -10,11 +10,60 @@ assert MODEL_ID, "MODEL_ID environment variable not set"
 MODEL_TEMPERATURE = float(os.getenv("MODEL_TEMPERATURE", 0.3))
 MODEL_MAX_TOKENS = int(os.getenv("MODEL_MAX_TOKENS", 1024 * 2))
 
+# Prompt Caching
+PROMPT_CACHE_SYSTEM = os.getenv("PROMPT_CACHE_SYSTEM", "true").lower() == "true"
+PROMPT_CACHE_TOOLS = os.getenv("PROMPT_CACHE_TOOLS", "true").lower() == "true"
+PROMPT_CACHE_CONVERSATION = os.getenv("PROMPT_CACHE_CONVERSATION", "false").lower() == "true"
+
+# SSE streaming
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", 0.03))
+STREAM_FLUSH_MAX_CHARS = int(os.getenv("STREAM_FLUSH_MAX_CHARS", 256))
+
+# Tool execution
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", 4))
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", 10.0))
+
+# History Compaction
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", 1024 * 8))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", 2))
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "false").lower() == "true"
+HISTORY_SUMMARY_MODEL_ID = os.getenv("HISTORY_SUMMARY_MODEL_ID", MODEL_ID)
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", 512))
+HISTORY_SUMMARY_CACHE_TTL = int(os.getenv("HISTORY_SUMMARY_CACHE_TTL", 60 * 60))
+HISTORY_SUMMARY_CACHE_MAX_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_MAX_SIZE", 1024))
+
 # Item Search API
 ITEM_SEARCH_API_KEY = os.getenv("ITEM_SEARCH_API_KEY")
 assert ITEM_SEARCH_API_KEY, "ITEM_SEARCH_API_KEY environment variable not set"
 ITEM_SEARCH_API_URL = os.getenv("ITEM_SEARCH_API_URL")
 assert ITEM_SEARCH_API_URL, "ITEM_SEARCH_API_URL environment variable not set"
+ITEM_SEARCH_CONNECT_TIMEOUT = float(os.getenv("ITEM_SEARCH_CONNECT_TIMEOUT", 2.0))
+ITEM_SEARCH_READ_TIMEOUT = float(os.getenv("ITEM_SEARCH_READ_TIMEOUT", 5.0))
+ITEM_SEARCH_MAX_CONNECTIONS = int(os.getenv("ITEM_SEARCH_MAX_CONNECTIONS", 100))
+ITEM_SEARCH_CACHE_TTL = int(os.getenv("ITEM_SEARCH_CACHE_TTL", 5 * 60))
+ITEM_SEARCH_CACHE_NEGATIVE_TTL = int(os.getenv("ITEM_SEARCH_CACHE_NEGATIVE_TTL", 30))
+ITEM_SEARCH_CACHE_MAX_SIZE = int(os.getenv("ITEM_SEARCH_CACHE_MAX_SIZE", 1024))
+ITEM_SEARCH_BATCH_ENABLED = os.getenv("ITEM_SEARCH_BATCH_ENABLED", "true").lower() == "true"
+ITEM_SEARCH_BATCH_WINDOW = float(os.getenv("ITEM_SEARCH_BATCH_WINDOW", 0.005))
+ITEM_SEARCH_BATCH_MAX_SIZE = int(os.getenv("ITEM_SEARCH_BATCH_MAX_SIZE", 10))
+ITEM_CATEGORY_MATCH_ENABLED = os.getenv("ITEM_CATEGORY_MATCH_ENABLED", "true").lower() == "true"
+ITEM_CATEGORY_MATCH_THRESHOLD = float(os.getenv("ITEM_CATEGORY_MATCH_THRESHOLD", 0.35))
+
+# Semantic Cache
+# off by default, similar questions about different products must not share answers
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_EMBEDDING_MODEL_ID = os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL_ID", "cohere.embed-multilingual-v3")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 60 * 60))
+SEMANTIC_CACHE_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", 1000))
+SEMANTIC_CACHE_HISTORY_TURNS = int(os.getenv("SEMANTIC_CACHE_HISTORY_TURNS", 2))
+SEMANTIC_CACHE_TABLE_NAME = os.getenv("SEMANTIC_CACHE_TABLE_NAME", "")
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_FIELD_MAX_CHARS = int(os.getenv("LOG_FIELD_MAX_CHARS", 2048))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
 
 # Environment
 ENVIRONMENT = os.getenv("ENVIRONMENT", "local")
@@ -26,15 +75,87 @@ class Config:
     model_id: str
     temperature: float
     max_tokens: int
+    prompt_cache_system: bool
+    prompt_cache_tools: bool
+    prompt_cache_conversation: bool
+    stream_flush_interval: float
+    stream_flush_max_chars: int
+    tool_max_concurrency: int
+    tool_call_timeout: float
+    history_max_tokens: int
+    history_keep_turns: int
+    history_summary_enabled: bool
+    history_summary_model_id: str
+    history_summary_max_tokens: int
+    history_summary_cache_ttl: int
+    history_summary_cache_max_size: int
     item_search_api_key: str
     item_search_api_url: str
+    item_search_connect_timeout: float
+    item_search_read_timeout: float
+    item_search_max_connections: int
+    item_search_cache_ttl: int
+    item_search_cache_negative_ttl: int
+    item_search_cache_max_size: int
+    item_search_batch_enabled: bool
+    item_search_batch_window: float
+    item_search_batch_max_size: int
+    item_category_match_enabled: bool
+    item_category_match_threshold: float
+    semantic_cache_enabled: bool
+    semantic_cache_embedding_model_id: str
+    semantic_cache_threshold: float
+    semantic_cache_ttl: int
+    semantic_cache_max_size: int
+    semantic_cache_history_turns: int
+    semantic_cache_table_name: str
+    log_level: str
+    log_queue_size: int
+    log_field_max_chars: int
+    log_sample_rate: float
     environment: str
 
 config = Config(
   model_id=MODEL_ID,
   temperature=MODEL_TEMPERATURE,
   max_tokens=MODEL_MAX_TOKENS,
+  prompt_cache_system=PROMPT_CACHE_SYSTEM,
+  prompt_cache_tools=PROMPT_CACHE_TOOLS,
+  prompt_cache_conversation=PROMPT_CACHE_CONVERSATION,
+  stream_flush_interval=STREAM_FLUSH_INTERVAL,
+  stream_flush_max_chars=STREAM_FLUSH_MAX_CHARS,
+  tool_max_concurrency=TOOL_MAX_CONCURRENCY,
+  tool_call_timeout=TOOL_CALL_TIMEOUT,
+  history_max_tokens=HISTORY_MAX_TOKENS,
+  history_keep_turns=HISTORY_KEEP_TURNS,
+  history_summary_enabled=HISTORY_SUMMARY_ENABLED,
+  history_summary_model_id=HISTORY_SUMMARY_MODEL_ID,
+  history_summary_max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+  history_summary_cache_ttl=HISTORY_SUMMARY_CACHE_TTL,
+  history_summary_cache_max_size=HISTORY_SUMMARY_CACHE_MAX_SIZE,
   item_search_api_key=ITEM_SEARCH_API_KEY,
   item_search_api_url=ITEM_SEARCH_API_URL,
+  item_search_connect_timeout=ITEM_SEARCH_CONNECT_TIMEOUT,
+  item_search_read_timeout=ITEM_SEARCH_READ_TIMEOUT,
+  item_search_max_connections=ITEM_SEARCH_MAX_CONNECTIONS,
+  item_search_cache_ttl=ITEM_SEARCH_CACHE_TTL,
+  item_search_cache_negative_ttl=ITEM_SEARCH_CACHE_NEGATIVE_TTL,
+  item_search_cache_max_size=ITEM_SEARCH_CACHE_MAX_SIZE,
+  item_search_batch_enabled=ITEM_SEARCH_BATCH_ENABLED,
+  item_search_batch_window=ITEM_SEARCH_BATCH_WINDOW,
+  item_search_batch_max_size=ITEM_SEARCH_BATCH_MAX_SIZE,
+  item_category_match_enabled=ITEM_CATEGORY_MATCH_ENABLED,
+  item_category_match_threshold=ITEM_CATEGORY_MATCH_THRESHOLD,
+  semantic_cache_enabled=SEMANTIC_CACHE_ENABLED,
+  semantic_cache_embedding_model_id=SEMANTIC_CACHE_EMBEDDING_MODEL_ID,
+  semantic_cache_threshold=SEMANTIC_CACHE_THRESHOLD,
+  semantic_cache_ttl=SEMANTIC_CACHE_TTL,
+  semantic_cache_max_size=SEMANTIC_CACHE_MAX_SIZE,
+  semantic_cache_history_turns=SEMANTIC_CACHE_HISTORY_TURNS,
+  semantic_cache_table_name=SEMANTIC_CACHE_TABLE_NAME,
+  log_level=LOG_LEVEL,
+  log_queue_size=LOG_QUEUE_SIZE,
+  log_field_max_chars=LOG_FIELD_MAX_CHARS,
+  log_sample_rate=LOG_SAMPLE_RATE,
   environment=ENVIRONMENT,
 )
\ No newline at end of file
@@ -0,0 +1,12 @@
+HISTORY_SUMMARY_PROMPT = """
+당신은 리테일 쇼핑 어시스턴트 coco와 사용자의 대화를 요약하는 역할을 합니다.
+<previous-summary> 에 지금까지의 요약이, <conversation> 에 그 이후의 대화가 주어집니다.
+두 내용을 합쳐 하나의 새로운 요약을 작성하세요.
+
+<summary-policy>
+    - 사용자의 선호, 예산, 사이즈, 관심 카테고리 등 이후 대화에 필요한 정보를 유지합니다.
+    - 검색하거나 추천한 상품의 이름은 그대로 남깁니다.
+    - 인사말이나 반복되는 내용은 생략하고, 10문장 이내로 간결하게 작성합니다.
+    - 요약문만 출력하고 다른 설명은 덧붙이지 않습니다.
+</summary-policy>
+"""
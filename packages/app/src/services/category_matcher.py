@@ -0,0 +1,201 @@
+import re
+import zlib
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# characters that separate words, so "t-shirt", "t_shirt" and "t shirt" share features
+NON_WORD = re.compile(r"[\W_]+")
+NGRAM_SIZES = (3, 4)
+# minimum Dice similarity of the character trigrams of two words for them to match, e.g. "sneaker" and "sneakers"
+WORD_MATCH_THRESHOLD = 0.6
+
+
+def normalize_category_text(text: str) -> str:
+    """
+    normalize free text for category matching
+
+    Args:
+        text (str): free text
+
+    Returns:
+        str: case-folded words separated by single spaces
+    """
+    return " ".join(NON_WORD.sub(" ", unicodedata.normalize("NFKC", text).casefold()).split())
+
+
+def hash_features(text: str, dim: int) -> List[int]:
+    """
+    hash the words and character n-grams of a text into feature indices
+
+    Character n-grams of each padded word make plurals, compounds and typos close to
+    their base word, e.g. "sneaker" to "sneakers" or "tshirt" to "t shirt".
+
+    Args:
+        text (str): normalized text
+        dim (int): number of hash buckets
+
+    Returns:
+        List[int]: feature indices, repeated for repeated features
+    """
+    features = []
+    for word in text.split():
+        features.append(f"w:{word}")
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            features.extend(padded[start:start + size] for start in range(len(padded) - size + 1))
+    return [zlib.crc32(feature.encode("utf-8")) % dim for feature in features]
+
+
+def word_trigrams(word: str) -> set:
+    padded = f" {word} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+def word_stem(word: str) -> str:
+    for suffix in ("es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def words_match(word: str, other: str) -> bool:
+    """
+    check whether two words are the same word up to plural forms and small typos
+
+    Args:
+        word (str): normalized word
+        other (str): normalized word
+
+    Returns:
+        bool: True if the words match
+    """
+    if word == other or word_stem(word) == word_stem(other):
+        return True
+    grams, other_grams = word_trigrams(word), word_trigrams(other)
+    return 2 * len(grams & other_grams) / (len(grams) + len(other_grams)) >= WORD_MATCH_THRESHOLD
+
+
+def alias_covered(text: str, alias: str) -> bool:
+    """
+    check whether every word of an alias is matched by a word of the text, the last word of the text included
+
+    Character n-grams alone rank "laptop" close to "laptop bag" and "mobile cover" close to
+    "cushion cover", a wrong category filter empties or skews the search results. The last
+    word is the head noun, so "hair band" does not resolve to "hair". Written together,
+    "flipflops" matches "flip flops".
+
+    Args:
+        text (str): normalized text
+        alias (str): normalized alias
+
+    Returns:
+        bool: True if the alias is covered by the text
+    """
+    if word_stem(text.replace(" ", "")) == word_stem(alias.replace(" ", "")):
+        return True
+    words, alias_words = text.split(), alias.split()
+    return all(any(words_match(word, alias_word) for word in words) for alias_word in alias_words) and any(
+        words_match(words[-1], alias_word) for alias_word in alias_words
+    )
+
+
+def embed_text(text: str, dim: int) -> np.ndarray:
+    """
+    embed text as unit-normalized hashed feature counts
+
+    Args:
+        text (str): normalized text
+        dim (int): vector dimension
+
+    Returns:
+        np.ndarray: float32 vector, all zeros for empty text
+    """
+    vector = np.bincount(hash_features(text, dim), minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass
+class CategoryMatch:
+    """
+    resolved category
+
+    Attributes:
+        category (str): canonical category
+        alias (str): alias the text matched best
+        score (float): cosine similarity to the alias
+    """
+    category: str
+    alias: str
+    score: float
+
+
+class CategoryMatcher:
+    """
+    resolve free-text categories to canonical ones in-process
+
+    Every alias of every category is embedded once into a single feature-major matrix. A
+    lookup hashes the text and sums the rows of its few features, weighted by their counts,
+    which gives the cosine similarity to every alias without a model or search call. The
+    closest alias reaching the threshold whose words all appear in the text is the match.
+    Names of first-level categories alone are not resolved, so they still match every
+    category under them.
+    """
+
+    def __init__(self, categories: Dict[str, Sequence[str]], threshold: float = 0.35, dim: int = 1 << 12):
+        """
+        initialize category matcher
+
+        Args:
+            categories (Dict[str, Sequence[str]]): aliases by canonical FIRST_SECOND category
+            threshold (float): minimum cosine similarity of a match
+            dim (int): embedding dimension
+        """
+        self.threshold = threshold
+        self.dim = dim
+        self.canonical: Dict[str, str] = {}
+        self.first_levels = {normalize_category_text(category.split("_")[0]) for category in categories}
+        self.aliases: List[str] = []
+        alias_categories: List[str] = []
+        for category, aliases in categories.items():
+            # the canonical name itself, e.g. "footwear shoes", is an alias too
+            for alias in (category, *aliases):
+                normalized = normalize_category_text(alias)
+                self.canonical.setdefault(normalized, category)
+                self.aliases.append(normalized)
+                alias_categories.append(category)
+        self.alias_categories = alias_categories
+        self.features = np.ascontiguousarray(np.stack([embed_text(alias, dim) for alias in self.aliases]).T)
+
+    def match(self, text: str) -> Optional[CategoryMatch]:
+        """
+        find the canonical category closest to the text
+
+        Args:
+            text (str): free-text category
+
+        Returns:
+            Optional[CategoryMatch]: best match, None if nothing reaches the threshold
+        """
+        normalized = normalize_category_text(text)
+        if not normalized or normalized in self.first_levels:
+            return None
+        category = self.canonical.get(normalized)
+        if category is not None:
+            return CategoryMatch(category=category, alias=normalized, score=1.0)
+        indices, counts = np.unique(np.asarray(hash_features(normalized, self.dim)), return_counts=True)
+        weights = counts.astype(np.float32)
+        weights /= np.linalg.norm(weights)
+        scores = weights @ self.features[indices]
+        candidates = np.flatnonzero(scores >= self.threshold)
+        for best in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            if alias_covered(normalized, self.aliases[best]):
+                return CategoryMatch(
+                    category=self.alias_categories[best],
+                    alias=self.aliases[best],
+                    score=float(scores[best]),
+                )
+        return None
@@ -1,15 +1,35 @@
 import json
+import time
 import asyncio
 import traceback
-from typing import List, AsyncGenerator, Optional, Dict, Any, Callable, cast
+from typing import List, AsyncGenerator, Optional, Dict, Any, Callable, Awaitable, Tuple, cast
 
 from langchain_aws import ChatBedrockConverse
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain.schema import BaseMessage, SystemMessage, HumanMessage, AIMessage
 from langchain.schema.messages import ToolMessage
 
 from src.prompts.chat import SYSTEM_PROMPT
 from src.tools.item_search import tool as item_search_tool
-from src.utils.logger import logger
+from src.utils.logger import logger, sampled_logger
+from src.utils.metrics import (
+    LLM_ITERATION_DURATION,
+    LLM_TOKENS,
+    RESPONSE_DURATION,
+    SSE_BYTES,
+    SSE_FRAMES,
+    STREAMS_IN_FLIGHT,
+    TIME_TO_FIRST_TOKEN,
+    TOOL_CALL_DURATION,
+)
+from src.utils.sse import coalesce_events
+from src.utils.stream_accumulator import AIMessageAccumulator
+
+# Bedrock prompt cache checkpoint, everything before it is cached as a prefix
+CACHE_POINT = {"cachePoint": {"type": "default"}}
 
 
 class ChatService:
@@ -17,24 +37,120 @@ class ChatService:
         self,
         model: str,
         temperature: float = 0,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        tool_max_concurrency: int = 4,
+        tool_call_timeout: float = 10.0,
+        cache_system_prompt: bool = True,
+        cache_tools: bool = True,
+        cache_conversation: bool = False,
+        stream_flush_interval: float = 0.03,
+        stream_flush_max_chars: int = 256,
+        llm: Optional[BaseChatModel] = None,
     ):
         """
         initialize LLM service
 
+        The instance is meant to be built once per process and shared across requests;
+        it holds no per-request state, and per-request overrides are applied with
+        `Runnable.bind` so the underlying Bedrock client is never rebuilt.
+
         Args:
             model (str): model name to use
             temperature (float): model temperature value
             max_tokens (Optional[int]): maximum tokens
+            tool_max_concurrency (int): maximum tool calls executed concurrently in a turn
+            tool_call_timeout (float): timeout in seconds for each tool call
+            cache_system_prompt (bool): add a prompt cache checkpoint after the system prompt
+            cache_tools (bool): add a prompt cache checkpoint after the tool schema
+            cache_conversation (bool): add a prompt cache checkpoint after the last stable conversation turn
+            stream_flush_interval (float): maximum seconds streamed text is buffered before an SSE flush
+            stream_flush_max_chars (int): buffered characters that force an SSE flush
+            llm (Optional[BaseChatModel]): chat model used instead of Bedrock, e.g. a fake model in load tests
         """
         tools = [item_search_tool]
-        self.llm = ChatBedrockConverse(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        ).bind_tools(tools)
+        if llm is None:
+            llm = ChatBedrockConverse(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        # kept to build per-request inference configs from its defaults
+        self.model = llm
+        if cache_tools:
+            # pass the tool config directly, `bind_tools` has no way to append a cache checkpoint
+            self.llm = llm.bind(tool_config={"tools": [*self._format_tool_specs(tools), CACHE_POINT]})
+        else:
+            self.llm = llm.bind_tools(tools)
         self.system_prompt = SYSTEM_PROMPT
-        self.tool_dict = {tool.name: cast(Callable, tool.func) for tool in tools}
+        self.cache_system_prompt = cache_system_prompt
+        self.cache_conversation = cache_conversation
+        self.tool_max_concurrency = tool_max_concurrency
+        self.tool_call_timeout = tool_call_timeout
+        self.stream_flush_interval = stream_flush_interval
+        self.stream_flush_max_chars = stream_flush_max_chars
+        self.tool_dict = {tool.name: cast(Callable[..., Awaitable[Any]], tool.coroutine) for tool in tools}
+        # metric children bound once, so recording on the streaming path is a single update
+        self.model_id = model
+        self._time_to_first_token = TIME_TO_FIRST_TOKEN.labels(model)
+        self._stream_iteration_duration = LLM_ITERATION_DURATION.labels(model, "stream")
+        self._complete_iteration_duration = LLM_ITERATION_DURATION.labels(model, "complete")
+        self._stream_duration = RESPONSE_DURATION.labels(model, "stream")
+        self._complete_duration = RESPONSE_DURATION.labels(model, "complete")
+        self._sse_bytes = SSE_BYTES.labels(model)
+        self._sse_frames = SSE_FRAMES.labels(model)
+        self._streams_in_flight = STREAMS_IN_FLIGHT.labels(model)
+
+    @staticmethod
+    def _format_tool_specs(tools: List[BaseTool]) -> List[Dict[str, Any]]:
+        """
+        format tools as Bedrock Converse tool specs
+
+        Args:
+            tools (List[BaseTool]): tools to format
+
+        Returns:
+            List[Dict[str, Any]]: Bedrock tool specs
+        """
+        tool_specs = []
+        for tool in tools:
+            function = convert_to_openai_tool(tool)["function"]
+            tool_specs.append({
+                "toolSpec": {
+                    "name": function["name"],
+                    "description": function.get("description") or function["name"],
+                    "inputSchema": {"json": function["parameters"]},
+                }
+            })
+        return tool_specs
+
+    def _get_llm(self, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> Runnable:
+        """
+        return the shared LLM, bound with per-request inference overrides if given
+
+        Args:
+            temperature (Optional[float]): temperature override
+            max_tokens (Optional[int]): maximum tokens override
+
+        Returns:
+            Runnable: LLM runnable to invoke
+        """
+        if temperature is None and max_tokens is None:
+            return self.llm
+        if isinstance(self.model, ChatBedrockConverse):
+            # ChatBedrockConverse reads bound values as `temperature or self.temperature`, which
+            # turns a requested 0 into the default, a complete inference config is sent as is
+            return self.llm.bind(inference_config={
+                "maxTokens": max_tokens if max_tokens is not None else self.model.max_tokens,
+                "temperature": temperature if temperature is not None else self.model.temperature,
+                "topP": self.model.top_p,
+                "stopSequences": self.model.stop_sequences,
+            })
+        overrides = {}
+        if temperature is not None:
+            overrides["temperature"] = temperature
+        if max_tokens is not None:
+            overrides["max_tokens"] = max_tokens
+        return self.llm.bind(**overrides)
 
     def _build_system_prompt(self) -> BaseMessage:
         """
@@ -43,16 +159,60 @@ class ChatService:
         Returns:
             BaseMessage: system prompt
         """
-        return SystemMessage(content=[
+        content = [
             {
                 "type": "text",
                 "text": self.system_prompt
             },
-            # TODO: add cache point
-            # {
-            #     "cachePoint": { "type": "default" },
-            # },
-        ])
+        ]
+        if self.cache_system_prompt:
+            content.append(CACHE_POINT)
+        return SystemMessage(content=content)
+
+    def _with_cache_point(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        append a prompt cache checkpoint after the given conversation prefix
+
+        The checkpoint is sent as a content-only user message, which Bedrock formatting merges
+        into the following user turn (or tool results), so the prefix up to here is cached.
+
+        Args:
+            messages (List[BaseMessage]): stable conversation prefix
+
+        Returns:
+            List[BaseMessage]: messages with a trailing checkpoint if enabled
+        """
+        if not self.cache_conversation or len(messages) <= 1:
+            return messages
+        return [*messages, HumanMessage(content=[CACHE_POINT])]
+
+    def _log_usage(self, ai_message: BaseMessage) -> None:
+        """
+        log and count token usage of a model turn including prompt cache reads and writes
+
+        Args:
+            ai_message (BaseMessage): AI message of the turn
+        """
+        usage = getattr(ai_message, "usage_metadata", None)
+        if not usage:
+            return
+        details = usage.get("input_token_details") or {}
+        tokens = {
+            "input": usage.get("input_tokens", 0),
+            "output": usage.get("output_tokens", 0),
+            "cache_read": details.get("cache_read", 0),
+            "cache_write": details.get("cache_creation", 0),
+        }
+        for token_type, count in tokens.items():
+            if count:
+                LLM_TOKENS.labels(self.model_id, token_type).inc(count)
+        sampled_logger.info(
+            "LLM usage",
+            input_tokens=tokens["input"],
+            output_tokens=tokens["output"],
+            cache_read_tokens=tokens["cache_read"],
+            cache_write_tokens=tokens["cache_write"],
+        )
 
     def build_messages(self, recent_history: List[BaseMessage], user_message_content: str) -> List[BaseMessage]:
         """
@@ -66,34 +226,84 @@ class ChatService:
             List[BaseMessage]: message list
         """
         return [
-            self._build_system_prompt(),
-            *recent_history,
+            *self._with_cache_point([self._build_system_prompt(), *recent_history]),
             HumanMessage(content=user_message_content),
         ]
 
-    async def generate_streaming_response(self, messages: List[BaseMessage]) -> AsyncGenerator[str, None]:
+    async def generate_streaming_response(
+        self,
+        messages: List[BaseMessage],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> AsyncGenerator[str, None]:
         """
         generate streaming response
 
         Args:
             messages (List[BaseMessage]): message list
+            temperature (Optional[float]): per-request temperature override
+            max_tokens (Optional[int]): per-request maximum tokens override
+            on_event (Optional[Callable[[Dict[str, Any]], None]]): called with every event before SSE framing
 
         Yields:
             str: SSE format response data
         """
+        started = time.perf_counter()
+        self._streams_in_flight.inc()
+        try:
+            events = self._generate_events(messages, self._get_llm(temperature, max_tokens), started)
+            if on_event is not None:
+                events = self._observe_events(events, on_event)
+            async for frame in coalesce_events(events, self.stream_flush_interval, self.stream_flush_max_chars):
+                self._sse_frames.inc()
+                self._sse_bytes.inc(len(frame.encode("utf-8")))
+                yield frame
+        finally:
+            self._streams_in_flight.dec()
+            self._stream_duration.observe(time.perf_counter() - started)
+
+    @staticmethod
+    async def _observe_events(
+        events: AsyncGenerator[Dict[str, Any], None],
+        on_event: Callable[[Dict[str, Any]], None],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        async for event in events:
+            on_event(event)
+            yield event
+
+    async def _generate_events(
+        self,
+        messages: List[BaseMessage],
+        llm: Runnable,
+        started: Optional[float] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        run the model and tool loop, yielding response events before SSE framing
+
+        Args:
+            messages (List[BaseMessage]): message list
+            llm (Runnable): LLM runnable to invoke
+            started (Optional[float]): `time.perf_counter()` at the start of the request, for time to first token
+
+        Yields:
+            Dict[str, Any]: response event
+        """
         current_messages = []
+        started = time.perf_counter() if started is None else started
+        first_token_pending = True
         try:
             # 도구 호출을 처리하기 위해 무한 루프, 도구 호출이 없으면 탈출
             while True:
                 # 응답을 스트리밍하고 AI 메시지 구성
-                ai_message = None
-                async for chunk in self.llm.astream(messages + current_messages):
-                    # 메시지 누적
-                    if ai_message is None:
-                        ai_message = chunk
-                    else:
-                        ai_message = ai_message + chunk
-                    
+                accumulator = AIMessageAccumulator()
+                # cache the conversation prefix including the previous tool results in the tool loop
+                request_messages = self._with_cache_point(messages + current_messages) if current_messages else messages
+                iteration_started = time.perf_counter()
+                async for chunk in llm.astream(request_messages):
+                    # 메시지 누적 (chunk 병합은 스트림 종료 후 한 번만 수행)
+                    accumulator.add(chunk)
+
                     # 컨텐츠가 있는 경우 전송
                     if chunk.content:
                         content = ''
@@ -107,11 +317,16 @@ class ChatService:
                             content = chunk.content.get('text', '')
                         
                         if content:
-                            yield f"data: {json.dumps({'role': 'assistant', 'content': content})}\n\n"
-                            await asyncio.sleep(0)
+                            if first_token_pending:
+                                first_token_pending = False
+                                self._time_to_first_token.observe(time.perf_counter() - started)
+                            yield {'role': 'assistant', 'content': content}
                     
+                self._stream_iteration_duration.observe(time.perf_counter() - iteration_started)
+                ai_message = accumulator.build()
                 # If ai_message exists append it to messages
                 if ai_message:
+                    self._log_usage(ai_message)
                     current_messages.append(ai_message)
                 # If ai_message does not exist, stop the process
                 else:
@@ -123,68 +338,135 @@ class ChatService:
 
                 # 도구 호출이 있는 경우 처리
                 # 프론트엔드에서 블록을 렌더링하기 위해 도구 호출 정보 전송
-                yield f"data: {json.dumps({'role': 'assistant', 'tool_calls': ai_message.tool_calls})}\n\n"
-
-                # 대화에 AI 메시지 추가 (이미 스트리밍됨)
-                tool_messages: List[ToolMessage] = []
-                for tool_call in ai_message.tool_calls:
-                    # 도구 호출 정보
-                    tool_name = tool_call['name']
-                    tool_args = tool_call['args']
-                    tool_call_id = tool_call['id']
-                    
-                    # 도구 실행 메시지
-                    logger.info('Using tool to find information...', tool_name=tool_name, tool_args=tool_args)
-                    
-                    # 도구 실행
-                    try:
-                        tool_result = self.tool_dict[tool_name](**tool_args)
-                        logger.info(f"Tool result for {tool_name}: {tool_result}")
-                        
+                yield {'role': 'assistant', 'tool_calls': ai_message.tool_calls}
+
+                # 도구 호출을 동시에 실행하고, 완료되는 순서대로 결과 전송
+                tool_calls = ai_message.tool_calls
+                tool_results: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+                semaphore = asyncio.Semaphore(self.tool_max_concurrency)
+                tasks = [
+                    asyncio.create_task(self._execute_tool_call(index, tool_call, semaphore))
+                    for index, tool_call in enumerate(tool_calls)
+                ]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        index, tool_result, error_msg = await next_done
+                        tool_name = tool_calls[index]['name']
+                        tool_call_id = tool_calls[index]['id']
+
+                        # 도구 실행 오류, the model still needs a result for every tool call of its turn
+                        if error_msg:
+                            yield {'error': error_msg}
+                            tool_results[index] = ToolMessage(
+                                content=error_msg,
+                                tool_call_id=tool_call_id,
+                                name=tool_name,
+                                status="error",
+                            )
+                            continue
+
                         # 도구 결과 전송 - this is for the frontend (keep raw result)
-                        yield f"data: {json.dumps({'role': 'tool', 'tool_call_id': tool_call_id, 'name': tool_name, 'content': tool_result})}\n\n"
-                        await asyncio.sleep(0)
-                        
+                        yield {'role': 'tool', 'tool_call_id': tool_call_id, 'name': tool_name, 'content': tool_result}
+
                         # 도구 결과 메시지 생성 - Let LangChain handle Bedrock formatting
                         # Pass string content to ToolMessage
                         if isinstance(tool_result, (dict, list)):
                             string_content = json.dumps(tool_result)
                         else:
                             string_content = str(tool_result)
-                        
-                        tool_message = ToolMessage(
+
+                        tool_results[index] = ToolMessage(
                             content=string_content, # Pass stringified content
                             tool_call_id=tool_call_id,
                             name=tool_name
                         )
-                        # 도구 결과 메시지를 대화에 추가
-                        tool_messages.append(tool_message)
-                        
-                    except Exception as e:
-                        # 도구 실행 오류
-                        error_msg = f"Error executing {tool_name}: {str(e)}"
-                        logger.error(error_msg)
-                        yield f"data: {json.dumps({'error': error_msg})}\n\n"
+                finally:
+                    # cancel in-flight tool calls if the client disconnected mid-stream
+                    for task in tasks:
+                        task.cancel()
 
-                # 다음 메시지 처리를 위해 응답 메시지와 도구 메시지 저장
+                # 다음 메시지 처리를 위해 도구 메시지를 원래 tool_call 순서대로 저장
+                tool_messages = [message for message in tool_results if message is not None]
                 if tool_messages:
                     current_messages.extend(tool_messages)
         except Exception as e:
             traceback.print_exc()
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield {'error': str(e)}
+
+    async def _execute_tool_call(
+        self,
+        index: int,
+        tool_call: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[int, Any, Optional[str]]:
+        """
+        execute a single tool call under the concurrency limit and per-call timeout
+
+        Args:
+            index (int): position of the tool call in the AI message
+            tool_call (Dict[str, Any]): tool call emitted by the model
+            semaphore (asyncio.Semaphore): limits concurrent tool calls in a turn
 
-    async def generate_complete_response(self, messages: List[BaseMessage]) -> str:
+        Returns:
+            Tuple[int, Any, Optional[str]]: index, tool result and error message if failed
+        """
+        tool_name = tool_call['name']
+        tool_args = tool_call['args']
+        sampled_logger.info('Using tool to find information...', tool_name=tool_name, tool_args=tool_args)
+        # tool names come from the model, unknown ones share a label to bound the label values
+        tool_label = tool_name if tool_name in self.tool_dict else "unknown"
+        async with semaphore:
+            # time the call itself, not the wait for a concurrency slot
+            started = time.perf_counter()
+            try:
+                tool_result = await asyncio.wait_for(
+                    self.tool_dict[tool_name](**tool_args),
+                    timeout=self.tool_call_timeout,
+                )
+            except asyncio.TimeoutError:
+                TOOL_CALL_DURATION.labels(tool_label, "timeout").observe(time.perf_counter() - started)
+                error_msg = f"Error executing {tool_name}: timed out after {self.tool_call_timeout}s"
+                logger.error(error_msg)
+                return index, None, error_msg
+            except Exception as e:
+                TOOL_CALL_DURATION.labels(tool_label, "error").observe(time.perf_counter() - started)
+                error_msg = f"Error executing {tool_name}: {str(e)}"
+                logger.error(error_msg)
+                return index, None, error_msg
+        TOOL_CALL_DURATION.labels(tool_label, "ok").observe(time.perf_counter() - started)
+        # the payload is only logged at debug, size-capped by the log sink
+        sampled_logger.info(
+            "Tool result",
+            tool_name=tool_name,
+            items=len(tool_result) if isinstance(tool_result, (list, dict)) else None,
+        )
+        logger.debug("Tool result payload", tool_name=tool_name, tool_result=tool_result)
+        return index, tool_result, None
+
+    async def generate_complete_response(
+        self,
+        messages: List[BaseMessage],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
         """
         generate complete response
 
         Args:
             messages (List[BaseMessage]): message list
+            temperature (Optional[float]): per-request temperature override
+            max_tokens (Optional[int]): per-request maximum tokens override
 
         Returns:
             str: LLM's complete response
         """
+        started = time.perf_counter()
         try:
-            response = await self.llm.ainvoke(messages)
+            response = await self._get_llm(temperature, max_tokens).ainvoke(messages)
+            elapsed = time.perf_counter() - started
+            self._complete_iteration_duration.observe(elapsed)
+            self._complete_duration.observe(elapsed)
+            self._log_usage(response)
             content = response.content
             if isinstance(content, dict):
                 content = content.get('text', '')
@@ -222,5 +504,6 @@ class ChatService:
                     tool_call_id=msg["tool_call_id"],
                     name=msg["name"]
                 ))
-        logger.info(f"langchain_messages: {langchain_messages}")
+        sampled_logger.info("Converted messages", messages=len(langchain_messages))
+        logger.debug("Converted messages payload", langchain_messages=langchain_messages)
         return langchain_messages
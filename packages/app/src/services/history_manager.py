@@ -0,0 +1,328 @@
+import json
+import hashlib
+import traceback
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable
+from langchain.schema import BaseMessage, SystemMessage, HumanMessage, AIMessage
+from langchain.schema.messages import ToolMessage
+
+from src.prompts.history import HISTORY_SUMMARY_PROMPT
+from src.utils.logger import logger
+from src.utils.ttl_cache import TTLCache
+
+# fixed per-message overhead for role markers and block framing
+MESSAGE_OVERHEAD_TOKENS = 4
+# item names kept in a stubbed tool result so the model can still refer to them
+STUB_MAX_NAMES = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    estimate the token count of a text without a tokenizer
+
+    ASCII text averages about four characters per token, while Hangul and other
+    non-ASCII characters are close to one token each.
+
+    Args:
+        text (str): text to estimate
+
+    Returns:
+        int: estimated token count
+    """
+    if text.isascii():
+        return (len(text) + 3) // 4
+    chars = len(text)
+    # most non-ASCII characters in chat text are 3 bytes in UTF-8
+    non_ascii = min(chars, (len(text.encode("utf-8")) - chars) // 2)
+    return (chars - non_ascii + 3) // 4 + non_ascii
+
+
+def _content_text(content: Any) -> str:
+    """
+    flatten message content into plain text
+
+    Args:
+        content (Any): message content, a string or a list of content blocks
+
+    Returns:
+        str: text of the content
+    """
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and isinstance(block.get("text"), str):
+            parts.append(block["text"])
+    return "".join(parts)
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """
+    estimate the token count of a message including its tool calls
+
+    Args:
+        message (BaseMessage): message to estimate
+
+    Returns:
+        int: estimated token count
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(_content_text(message.content))
+    if isinstance(message, AIMessage):
+        for tool_call in message.tool_calls:
+            tokens += estimate_tokens(tool_call["name"]) + estimate_tokens(json.dumps(tool_call["args"]))
+    return tokens
+
+
+@dataclass
+class HistoryCompaction:
+    """
+    outcome of a history compaction, token counts are estimates
+    """
+    original_tokens: int
+    compacted_tokens: int
+    stubbed_tool_messages: int = 0
+    dropped_turns: int = 0
+    summarized_turns: int = 0
+    summary_cache_hit: bool = False
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "saved_tokens": self.saved_tokens}
+
+
+class HistoryManager:
+    """
+    fit the recent history into a token budget
+
+    The history is split into turns, each starting at a user message, so tool calls and
+    their results are never separated. The last `keep_turns` turns are always kept
+    verbatim. While the history is over budget, tool results in older turns are replaced
+    with short stubs first, then the oldest turns are dropped or, if a summarizer is
+    given, folded into a rolling summary.
+
+    The frontend resends the whole history on every request, so summaries are cached by a
+    chained hash of the folded turns. When one more turn is folded, the cached summary of
+    the previous prefix is extended instead of summarizing the whole prefix again.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_turns: int = 2,
+        summarizer: Optional[Runnable] = None,
+        summary_cache_size: int = 1024,
+        summary_cache_ttl: float = 60 * 60,
+    ):
+        """
+        initialize history manager
+
+        Args:
+            max_tokens (int): token budget of the history, excluding the system prompt and the new user message
+            keep_turns (int): number of latest turns kept verbatim regardless of the budget
+            summarizer (Optional[Runnable]): chat model folding old turns into a summary, old turns are dropped if None
+            summary_cache_size (int): maximum number of cached summaries
+            summary_cache_ttl (float): time to live of cached summaries in seconds
+        """
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summarizer = summarizer
+        self.summary_cache: TTLCache[str] = TTLCache(max_size=summary_cache_size, ttl=summary_cache_ttl)
+
+    @staticmethod
+    def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        """
+        split messages into turns, each starting at a user message
+
+        Args:
+            messages (List[BaseMessage]): history messages
+
+        Returns:
+            List[List[BaseMessage]]: turns
+        """
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if not turns or isinstance(message, HumanMessage):
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    @staticmethod
+    def _stub_tool_result(message: ToolMessage) -> str:
+        """
+        build a short placeholder for a tool result, keeping item names if present
+
+        Args:
+            message (ToolMessage): tool result message
+
+        Returns:
+            str: stub content
+        """
+        try:
+            result = json.loads(_content_text(message.content))
+        except (TypeError, ValueError):
+            return f"[{message.name} result omitted]"
+        if not isinstance(result, list):
+            return f"[{message.name} result omitted]"
+        names = [item["name"] for item in result if isinstance(item, dict) and isinstance(item.get("name"), str)]
+        stub = f"[{message.name} result omitted: {len(result)} items"
+        if names:
+            stub += f", {', '.join(names[:STUB_MAX_NAMES])}"
+        return stub + "]"
+
+    def _stub_turn(self, turn: List[BaseMessage]) -> Tuple[List[BaseMessage], int, int]:
+        """
+        replace tool results in a turn with stubs
+
+        Args:
+            turn (List[BaseMessage]): turn messages
+
+        Returns:
+            Tuple[List[BaseMessage], int, int]: stubbed turn, saved tokens and stubbed message count
+        """
+        stubbed: List[BaseMessage] = []
+        saved = 0
+        count = 0
+        for message in turn:
+            if isinstance(message, ToolMessage):
+                stub = ToolMessage(
+                    content=self._stub_tool_result(message),
+                    tool_call_id=message.tool_call_id,
+                    name=message.name,
+                )
+                diff = estimate_message_tokens(message) - estimate_message_tokens(stub)
+                if diff > 0:
+                    stubbed.append(stub)
+                    saved += diff
+                    count += 1
+                    continue
+            stubbed.append(message)
+        return stubbed, saved, count
+
+    @staticmethod
+    def _render_turn(turn: List[BaseMessage]) -> str:
+        """
+        render a turn as plain text for the summarizer and the summary cache key
+
+        Args:
+            turn (List[BaseMessage]): turn messages
+
+        Returns:
+            str: rendered turn
+        """
+        lines = []
+        for message in turn:
+            text = _content_text(message.content)
+            if isinstance(message, HumanMessage):
+                lines.append(f"user: {text}")
+            elif isinstance(message, AIMessage):
+                if text:
+                    lines.append(f"assistant: {text}")
+                for tool_call in message.tool_calls:
+                    lines.append(f"assistant called {tool_call['name']}: {json.dumps(tool_call['args'], ensure_ascii=False)}")
+            elif isinstance(message, ToolMessage):
+                lines.append(f"{message.name} result: {text}")
+        return "\n".join(lines)
+
+    async def _summarize(self, turns: List[List[BaseMessage]], stats: HistoryCompaction) -> Optional[str]:
+        """
+        return the rolling summary of the given turns, extending the longest cached prefix
+
+        Args:
+            turns (List[List[BaseMessage]]): turns to fold, oldest first
+            stats (HistoryCompaction): compaction stats to update
+
+        Returns:
+            Optional[str]: summary, None if summarization failed
+        """
+        rendered = [self._render_turn(turn) for turn in turns]
+        digest = hashlib.sha256()
+        prefix_keys = []
+        for text in rendered:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\x00")
+            prefix_keys.append(digest.hexdigest())
+
+        # find the longest folded prefix that already has a summary
+        previous = ""
+        start = 0
+        for folded in range(len(turns), 0, -1):
+            cached = self.summary_cache.get(prefix_keys[folded - 1])
+            if cached is not None:
+                previous, start = cached, folded
+                break
+        if start == len(turns):
+            stats.summary_cache_hit = True
+            return previous
+
+        try:
+            response = await self.summarizer.ainvoke([
+                SystemMessage(content=HISTORY_SUMMARY_PROMPT),
+                HumanMessage(content=(
+                    f"<previous-summary>\n{previous}\n</previous-summary>\n"
+                    f"<conversation>\n{chr(10).join(rendered[start:])}\n</conversation>"
+                )),
+            ])
+        except Exception:
+            logger.error(f"Error in history summarization: {traceback.format_exc()}")
+            return None
+        summary = _content_text(response.content).strip()
+        self.summary_cache.set(prefix_keys[-1], summary)
+        return summary
+
+    async def compact(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], HistoryCompaction]:
+        """
+        compact the history to fit the token budget
+
+        Args:
+            messages (List[BaseMessage]): history messages, oldest first
+
+        Returns:
+            Tuple[List[BaseMessage], HistoryCompaction]: compacted messages and compaction stats
+        """
+        turns = self.split_turns(messages)
+        costs = [sum(estimate_message_tokens(message) for message in turn) for turn in turns]
+        total = sum(costs)
+        stats = HistoryCompaction(original_tokens=total, compacted_tokens=total)
+        if total <= self.max_tokens:
+            return messages, stats
+
+        old_turns = max(0, len(turns) - self.keep_turns)
+
+        # stub tool results in old turns, oldest first
+        for index in range(old_turns):
+            if total <= self.max_tokens:
+                break
+            turns[index], saved, count = self._stub_turn(turns[index])
+            costs[index] -= saved
+            total -= saved
+            stats.stubbed_tool_messages += count
+
+        # drop or fold the oldest turns
+        folded = 0
+        while total > self.max_tokens and folded < old_turns:
+            total -= costs[folded]
+            folded += 1
+
+        compacted: List[BaseMessage] = []
+        if folded and self.summarizer is not None:
+            summary = await self._summarize(turns[:folded], stats)
+            if summary:
+                summary_message = SystemMessage(content=f"<conversation-summary>\n{summary}\n</conversation-summary>")
+                compacted.append(summary_message)
+                total += estimate_message_tokens(summary_message)
+                stats.summarized_turns = folded
+        if not stats.summarized_turns:
+            stats.dropped_turns = folded
+        for turn in turns[folded:]:
+            compacted.extend(turn)
+
+        stats.compacted_tokens = total
+        logger.info("History compacted", **stats.as_dict())
+        return compacted, stats
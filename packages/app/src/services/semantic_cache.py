@@ -0,0 +1,649 @@
+import json
+import time
+import asyncio
+import hashlib
+import threading
+import traceback
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, AsyncGenerator, AsyncIterator, Tuple
+
+import boto3
+import orjson
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.utils.logger import logger
+from src.utils.metrics import SEMANTIC_CACHE_LOOKUPS
+from src.utils.sse import format_sse
+
+# lookup counters exported on /metrics, next to the item search cache
+_exact_hits = SEMANTIC_CACHE_LOOKUPS.labels("exact_hit")
+_hits = SEMANTIC_CACHE_LOOKUPS.labels("hit")
+_misses = SEMANTIC_CACHE_LOOKUPS.labels("miss")
+
+
+@dataclass
+class CacheEntry:
+    """
+    cached chat response
+
+    Attributes:
+        key (str): entry key (hash of history fingerprint and normalized message)
+        partition (str): history fingerprint the entry belongs to
+        vector (np.ndarray): unit-normalized embedding of the normalized user message
+        frames (List[str]): SSE frames to replay on the streaming path
+        content (str): final assistant text to return on the complete path
+        expires_at (float): unix timestamp after which the entry is stale
+    """
+    key: str
+    partition: str
+    vector: np.ndarray
+    frames: List[str]
+    content: str
+    expires_at: float
+
+
+@dataclass
+class CacheLookup:
+    """
+    result of a semantic cache lookup, reused to store the response on a miss
+
+    Attributes:
+        key (str): entry key for the request
+        partition (str): history fingerprint for the request
+        vector (Optional[np.ndarray]): embedding of the normalized user message
+        entry (Optional[CacheEntry]): cached entry if hit
+        score (float): similarity score of the hit
+    """
+    key: str
+    partition: str
+    vector: Optional[np.ndarray] = None
+    entry: Optional[CacheEntry] = None
+    score: float = 0.0
+
+
+@dataclass
+class SemanticCacheStats:
+    """
+    semantic cache counters
+
+    Attributes:
+        hits (int): lookups served from cache
+        misses (int): lookups that went to the model
+        exact_hits (int): hits served without an embedding call
+        stores (int): responses written to the cache
+        evictions (int): entries evicted by LRU or TTL
+        errors (int): embedding or backend failures
+        skipped (int): responses not stored because they used tools or failed
+    """
+    hits: int = 0
+    misses: int = 0
+    exact_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    errors: int = 0
+    skipped: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        return counters with the derived hit ratio
+
+        Returns:
+            Dict[str, Any]: counters
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "exact_hits": self.exact_hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class SemanticCacheBackend(ABC):
+    """
+    storage for cached responses, the similarity search always runs on the local index
+    """
+    # whether entries are shared with other replicas (shared entries are never deleted on local eviction)
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        get entry by key
+
+        Args:
+            key (str): entry key
+
+        Returns:
+            Optional[CacheEntry]: entry or None if missing
+        """
+
+    @abstractmethod
+    async def set(self, entry: CacheEntry) -> None:
+        """
+        store entry
+
+        Args:
+            entry (CacheEntry): entry to store
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        delete entry by key
+
+        Args:
+            key (str): entry key
+        """
+
+    async def scan(self) -> AsyncIterator[CacheEntry]:
+        """
+        iterate over stored entries to warm the local index
+
+        Yields:
+            CacheEntry: stored entry
+        """
+        return
+        yield
+
+
+class InMemorySemanticCacheBackend(SemanticCacheBackend):
+    """
+    process-local backend, size is bounded by the index that drives eviction
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    async def set(self, entry: CacheEntry) -> None:
+        self._entries[entry.key] = entry
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class DynamoDBSemanticCacheBackend(SemanticCacheBackend):
+    """
+    DynamoDB backend shared by all replicas, expired items are removed by the table TTL on `expires_at`
+
+    The table needs a string partition key named `pk`.
+    """
+    shared = True
+
+    def __init__(self, table_name: str, key_prefix: str = "semantic_cache#"):
+        """
+        initialize DynamoDB backend
+
+        Args:
+            table_name (str): DynamoDB table name
+            key_prefix (str): partition key prefix to share a table with other data
+        """
+        self.table = boto3.resource("dynamodb").Table(table_name)
+        self.key_prefix = key_prefix
+
+    def _to_item(self, entry: CacheEntry) -> Dict[str, Any]:
+        return {
+            "pk": f"{self.key_prefix}{entry.key}",
+            "partition": entry.partition,
+            "vector": entry.vector.astype(np.float32).tobytes(),
+            "frames": json.dumps(entry.frames, ensure_ascii=False),
+            "content": entry.content,
+            "expires_at": int(entry.expires_at),
+        }
+
+    def _from_item(self, item: Dict[str, Any]) -> CacheEntry:
+        return CacheEntry(
+            key=item["pk"][len(self.key_prefix):],
+            partition=item["partition"],
+            vector=np.frombuffer(bytes(item["vector"]), dtype=np.float32),
+            frames=json.loads(item["frames"]),
+            content=item["content"],
+            expires_at=float(item["expires_at"]),
+        )
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        response = await asyncio.to_thread(self.table.get_item, Key={"pk": f"{self.key_prefix}{key}"})
+        item = response.get("Item")
+        return self._from_item(item) if item else None
+
+    async def set(self, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self.table.put_item, Item=self._to_item(entry))
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.table.delete_item, Key={"pk": f"{self.key_prefix}{key}"})
+
+    async def scan(self) -> AsyncIterator[CacheEntry]:
+        scan_kwargs: Dict[str, Any] = {
+            "FilterExpression": "begins_with(pk, :prefix)",
+            "ExpressionAttributeValues": {":prefix": self.key_prefix},
+        }
+        while True:
+            response = await asyncio.to_thread(self.table.scan, **scan_kwargs)
+            for item in response.get("Items", []):
+                yield self._from_item(item)
+            if "LastEvaluatedKey" not in response:
+                return
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+class _VectorIndex:
+    """
+    fixed-capacity in-process embedding index with LRU order and TTL
+
+    Vectors live in one preallocated matrix so a lookup is a single masked matrix-vector product.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._slot_keys: List[Optional[str]] = [None] * max_size
+        self._free = list(range(max_size - 1, -1, -1))
+        self._vectors: Optional[np.ndarray] = None
+        self._partitions = np.full(max_size, -1, dtype=np.int64)
+        self._expires_at = np.zeros(max_size, dtype=np.float64)
+        self._partition_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _partition_code(self, partition: str) -> int:
+        return self._partition_codes.setdefault(partition, len(self._partition_codes))
+
+    def contains(self, key: str, now: float) -> bool:
+        """
+        check whether a live entry exists for the key and mark it as recently used
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None or self._expires_at[slot] <= now:
+                return False
+            self._slots.move_to_end(key)
+            return True
+
+    def search(self, partition: str, vector: np.ndarray, now: float) -> Tuple[Optional[str], float]:
+        """
+        find the most similar live entry in the partition
+
+        Args:
+            partition (str): history fingerprint
+            vector (np.ndarray): unit-normalized query vector
+            now (float): current unix timestamp
+
+        Returns:
+            Tuple[Optional[str], float]: best key and its cosine similarity
+        """
+        with self._lock:
+            code = self._partition_codes.get(partition)
+            if code is None or self._vectors is None:
+                return None, 0.0
+            candidates = np.flatnonzero((self._partitions == code) & (self._expires_at > now))
+            if candidates.size == 0:
+                return None, 0.0
+            scores = self._vectors[candidates] @ vector
+            best = int(np.argmax(scores))
+            key = self._slot_keys[int(candidates[best])]
+            self._slots.move_to_end(key)
+            return key, float(scores[best])
+
+    def add(self, key: str, partition: str, vector: np.ndarray, expires_at: float, now: float) -> List[str]:
+        """
+        add or replace an entry, evicting expired and least recently used entries when full
+
+        Returns:
+            List[str]: evicted keys
+        """
+        evicted = []
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                if not self._free:
+                    for stale_key, stale_slot in list(self._slots.items()):
+                        if self._expires_at[stale_slot] <= now:
+                            evicted.append(stale_key)
+                            self._release(stale_key)
+                if not self._free:
+                    lru_key = next(iter(self._slots))
+                    evicted.append(lru_key)
+                    self._release(lru_key)
+                slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._partitions[slot] = self._partition_code(partition)
+            self._expires_at[slot] = expires_at
+            self._slots[key] = slot
+            self._slot_keys[slot] = key
+        return evicted
+
+    def remove(self, key: str) -> None:
+        """
+        remove an entry from the index
+        """
+        with self._lock:
+            if key in self._slots:
+                self._release(key)
+
+    def _release(self, key: str) -> None:
+        slot = self._slots.pop(key)
+        self._partitions[slot] = -1
+        self._expires_at[slot] = 0.0
+        self._slot_keys[slot] = None
+        self._free.append(slot)
+
+
+class SemanticCache:
+    """
+    semantic response cache in front of ChatService
+
+    Requests are partitioned by a fingerprint of the recent history, and within a partition the
+    normalized user message is matched by embedding similarity against a local index.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        backend: Optional[SemanticCacheBackend] = None,
+        similarity_threshold: float = 0.92,
+        ttl: int = 3600,
+        max_size: int = 1000,
+        history_turns: int = 2,
+    ):
+        """
+        initialize semantic cache
+
+        Args:
+            embeddings (Embeddings): embedding model for user messages
+            backend (Optional[SemanticCacheBackend]): entry storage, defaults to in-memory
+            similarity_threshold (float): minimum cosine similarity for a hit
+            ttl (int): entry time to live in seconds
+            max_size (int): maximum entries kept in the local index
+            history_turns (int): number of recent history messages in the fingerprint
+        """
+        self.embeddings = embeddings
+        self.backend = backend or InMemorySemanticCacheBackend()
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.history_turns = history_turns
+        self.index = _VectorIndex(max_size)
+        self.stats = SemanticCacheStats()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        normalize user message for keying and embedding
+
+        Args:
+            text (str): raw text
+
+        Returns:
+            str: NFKC-normalized, case-folded text with collapsed whitespace and no trailing punctuation
+        """
+        text = unicodedata.normalize("NFKC", text).casefold()
+        return " ".join(text.split()).rstrip("?!.~ ")
+
+    def fingerprint(self, recent_history: List[Dict[str, Any]], **params: Any) -> str:
+        """
+        fingerprint the recent history and request parameters that change the response
+
+        Args:
+            recent_history (List[Dict[str, Any]]): recent history
+            **params: request parameters (e.g. temperature overrides)
+
+        Returns:
+            str: history fingerprint
+        """
+        turns = recent_history[-self.history_turns:] if self.history_turns > 0 else []
+        normalized = []
+        for msg in turns:
+            content = msg.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+            normalized.append([msg.get("role"), self.normalize(content)])
+        payload = json.dumps([normalized, sorted(params.items())], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(await self.embeddings.aembed_query(text), dtype=np.float32)
+        except Exception:
+            self.stats.errors += 1
+            logger.error(f"Error embedding message for semantic cache: {traceback.format_exc()}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def lookup(
+        self,
+        user_message_content: str,
+        recent_history: List[Dict[str, Any]],
+        **params: Any,
+    ) -> CacheLookup:
+        """
+        look up a cached response for the request
+
+        Args:
+            user_message_content (str): user message content
+            recent_history (List[Dict[str, Any]]): recent history
+            **params: request parameters included in the fingerprint
+
+        Returns:
+            CacheLookup: lookup result, `entry` is set on a hit
+        """
+        normalized = self.normalize(user_message_content)
+        partition = self.fingerprint(recent_history, **params)
+        key = hashlib.sha256(f"{partition}:{normalized}".encode("utf-8")).hexdigest()[:32]
+        lookup = CacheLookup(key=key, partition=partition)
+        now = time.time()
+
+        # exact match on the normalized message skips the embedding call
+        if self.index.contains(key, now):
+            entry = await self._get(key, now)
+            if entry:
+                self.stats.hits += 1
+                self.stats.exact_hits += 1
+                _exact_hits.inc()
+                lookup.entry, lookup.score = entry, 1.0
+                logger.info("Semantic cache hit", key=key, score=1.0)
+                return lookup
+
+        lookup.vector = await self._embed(normalized)
+        if lookup.vector is not None:
+            best_key, score = self.index.search(partition, lookup.vector, now)
+            if best_key and score >= self.similarity_threshold:
+                entry = await self._get(best_key, now)
+                if entry:
+                    self.stats.hits += 1
+                    _hits.inc()
+                    lookup.entry, lookup.score = entry, score
+                    logger.info("Semantic cache hit", key=best_key, score=score)
+                    return lookup
+
+        self.stats.misses += 1
+        _misses.inc()
+        return lookup
+
+    async def _get(self, key: str, now: float) -> Optional[CacheEntry]:
+        try:
+            entry = await self.backend.get(key)
+        except Exception:
+            self.stats.errors += 1
+            logger.error(f"Error reading semantic cache backend: {traceback.format_exc()}")
+            return None
+        if entry is None or entry.expires_at <= now:
+            self.index.remove(key)
+            self.stats.evictions += 1
+            return None
+        return entry
+
+    async def store(self, lookup: CacheLookup, frames: List[str], content: str = "") -> None:
+        """
+        store a response for a missed lookup
+
+        Args:
+            lookup (CacheLookup): lookup result of the request
+            frames (List[str]): SSE frames of the response
+            content (str): final assistant text, derived from frames if empty
+        """
+        if lookup.vector is None:
+            return
+        now = time.time()
+        entry = CacheEntry(
+            key=lookup.key,
+            partition=lookup.partition,
+            vector=lookup.vector,
+            frames=frames,
+            content=content or self.content_from_frames(frames),
+            expires_at=now + self.ttl,
+        )
+        try:
+            await self.backend.set(entry)
+        except Exception:
+            self.stats.errors += 1
+            logger.error(f"Error writing semantic cache backend: {traceback.format_exc()}")
+            return
+        evicted = self.index.add(entry.key, entry.partition, entry.vector, entry.expires_at, now)
+        self.stats.stores += 1
+        self.stats.evictions += len(evicted)
+        if not self.backend.shared:
+            for key in evicted:
+                await self.backend.delete(key)
+
+    async def warm(self) -> int:
+        """
+        load live entries from the backend into the local index
+
+        Returns:
+            int: number of entries loaded
+        """
+        loaded = 0
+        now = time.time()
+        try:
+            async for entry in self.backend.scan():
+                if entry.expires_at > now:
+                    self.index.add(entry.key, entry.partition, entry.vector, entry.expires_at, now)
+                    loaded += 1
+        except Exception:
+            self.stats.errors += 1
+            logger.error(f"Error warming semantic cache: {traceback.format_exc()}")
+        logger.info(f"Semantic cache warmed with {loaded} entries")
+        return loaded
+
+    def recorder(self, lookup: CacheLookup) -> "StreamRecorder":
+        """
+        create a recorder storing a streamed response for a missed lookup
+
+        Args:
+            lookup (CacheLookup): lookup result of the request
+
+        Returns:
+            StreamRecorder: recorder of the response
+        """
+        return StreamRecorder(self, lookup)
+
+    @staticmethod
+    async def replay_stream(entry: CacheEntry) -> AsyncGenerator[str, None]:
+        """
+        replay a cached response in the SSE format the frontend expects
+
+        Args:
+            entry (CacheEntry): cached entry
+
+        Yields:
+            str: SSE frames
+        """
+        if not entry.frames:
+            yield format_sse({'role': 'assistant', 'content': entry.content})
+            return
+        for frame in entry.frames:
+            yield frame
+
+    @staticmethod
+    def content_from_frames(frames: List[str]) -> str:
+        """
+        rebuild the final assistant text (after the last tool result) from SSE frames
+
+        Args:
+            frames (List[str]): SSE frames
+
+        Returns:
+            str: assistant text
+        """
+        content = []
+        for frame in frames:
+            for line in frame.splitlines():
+                if not line.startswith("data: "):
+                    continue
+                data = orjson.loads(line[6:])
+                if data.get("role") == "tool":
+                    content = []
+                elif data.get("role") == "assistant" and data.get("content"):
+                    content.append(data["content"])
+        return "".join(content)
+
+
+class StreamRecorder:
+    """
+    pass SSE frames through and store them once the stream completes
+
+    Events are observed before SSE framing, so the outcome does not depend on the serialized
+    layout. Responses with an error are not stored, nor are responses that called tools: their
+    answers are built from live search results, which a similar question must not replay and
+    which go stale when the item cache is invalidated.
+    """
+
+    def __init__(self, cache: SemanticCache, lookup: CacheLookup):
+        """
+        initialize stream recorder
+
+        Args:
+            cache (SemanticCache): semantic cache to store into
+            lookup (CacheLookup): lookup result of the request
+        """
+        self.cache = cache
+        self.lookup = lookup
+        self.failed = False
+        self.used_tools = False
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """
+        inspect a response event before it is serialized
+
+        Args:
+            event (Dict[str, Any]): response event
+        """
+        if "error" in event:
+            self.failed = True
+        elif event.get("tool_calls") or event.get("role") == "tool":
+            self.used_tools = True
+
+    async def record(self, stream: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+        """
+        pass SSE frames through and store them if the response may be cached
+
+        Args:
+            stream (AsyncGenerator[str, None]): SSE stream from ChatService
+
+        Yields:
+            str: SSE frames
+        """
+        frames = []
+        async for frame in stream:
+            frames.append(frame)
+            yield frame
+        if self.failed or self.used_tools:
+            self.cache.stats.skipped += 1
+            return
+        if frames:
+            await self.cache.store(self.lookup, frames)
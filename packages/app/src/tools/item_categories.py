@@ -0,0 +1,71 @@
+# canonical FIRST_SECOND item categories and the free-text terms that should resolve to them
+ITEM_CATEGORIES = {
+    "APPAREL_TOPWEAR": [
+        "topwear", "tops", "shirt", "t-shirt", "tee", "polo", "blouse", "kurta", "tunic", "sweater",
+        "sweatshirt", "hoodie", "jacket", "blazer", "coat", "cardigan", "vest", "tank top", "jersey",
+    ],
+    "APPAREL_BOTTOMWEAR": [
+        "bottomwear", "bottoms", "pants", "trousers", "jeans", "shorts", "skirt", "leggings", "track pants",
+        "chinos", "joggers", "capris", "salwar",
+    ],
+    "APPAREL_INNERWEAR": [
+        "innerwear", "underwear", "briefs", "boxers", "trunks", "bra", "lingerie", "camisole", "undershirt",
+        "innerwear vest", "thermal",
+    ],
+    "APPAREL_APPAREL SET": [
+        "apparel set", "outfit", "clothing set", "co-ord set", "kurta set", "tracksuit", "pyjama set",
+        "nightwear set", "suit set",
+    ],
+    "APPAREL_SOCKS": ["socks", "ankle socks", "sports socks"],
+    "ACCESSORIES_WATCHES": ["watches", "watch", "wristwatch", "smartwatch", "chronograph", "timepiece"],
+    "ACCESSORIES_SOCKS": ["socks accessory", "stockings"],
+    "ACCESSORIES_BELTS": ["belts", "belt", "leather belt", "waist belt"],
+    "ACCESSORIES_BAGS": [
+        "bags", "bag", "handbag", "backpack", "purse", "wallet", "clutch", "tote", "duffel bag", "laptop bag",
+        "messenger bag", "sling bag", "luggage", "trolley",
+    ],
+    "ACCESSORIES_SHOE ACCESSORIES": ["shoe accessories", "shoe laces", "insoles", "shoe polish", "shoe care"],
+    "ACCESSORIES_HEADWEAR": ["headwear", "cap", "hat", "beanie", "baseball cap", "headband", "bandana"],
+    "ACCESSORIES_MUFFLERS": ["mufflers", "muffler", "neck warmer"],
+    "ACCESSORIES_TIES": ["ties", "tie", "necktie", "bow tie"],
+    "ACCESSORIES_ACCESSORIES": ["accessories", "keychain", "key chain", "jewellery", "jewelry", "sunglasses", "eyewear"],
+    "ACCESSORIES_WATER BOTTLE": ["water bottle", "bottle", "flask", "sipper", "tumbler"],
+    "ACCESSORIES_GLOVES": ["gloves", "glove", "mittens"],
+    "ACCESSORIES_SPORTS ACCESSORIES": ["sports accessories", "gym accessories", "sweatband", "arm band"],
+    "ACCESSORIES_CUFFLINKS": ["cufflinks", "cuff links", "tie pin"],
+    "ACCESSORIES_STOLES": ["stoles", "stole", "scarf", "scarves", "shawl", "dupatta"],
+    "ACCESSORIES_UMBRELLAS": ["umbrellas", "umbrella", "parasol"],
+    "ACCESSORIES_WRISTBANDS": ["wristbands", "wristband", "bracelet", "wrist band"],
+    "FOOTWEAR_SHOES": [
+        "shoes", "shoe", "sneakers", "trainers", "running shoes", "sports shoes", "casual shoes", "formal shoes",
+        "boots", "loafers", "heels", "pumps", "oxfords", "moccasins", "canvas shoes",
+    ],
+    "FOOTWEAR_FLIP FLOPS": ["flip flops", "flip-flops", "slippers", "slides", "thongs", "chappals"],
+    "FOOTWEAR_SANDAL": ["sandal", "sandals", "floaters", "strappy sandals", "wedges"],
+    "PERSONAL CARE_SKIN CARE": [
+        "skin care", "skincare", "lotion", "moisturizer", "moisturiser", "face wash", "cleanser", "sunscreen",
+        "serum", "face cream", "toner",
+    ],
+    "PERSONAL CARE_MAKEUP": [
+        "makeup", "make up", "cosmetics", "lipstick", "lip gloss", "foundation", "concealer", "nail polish",
+        "blush", "compact powder",
+    ],
+    "PERSONAL CARE_EYES": ["eyes", "eyeliner", "kajal", "mascara", "eyeshadow", "eye shadow", "eye makeup"],
+    "PERSONAL CARE_BATH AND BODY": [
+        "bath and body", "body wash", "shower gel", "soap", "body lotion", "body scrub", "bath salts",
+        "deodorant", "talc",
+    ],
+    "PERSONAL CARE_HAIR": ["hair", "shampoo", "conditioner", "hair oil", "hair gel", "hair colour", "hair care"],
+    "PERSONAL CARE_PERFUMES": ["perfumes", "perfume", "fragrance", "cologne", "eau de toilette", "eau de parfum", "body mist"],
+    "FREE ITEMS_FREE GIFTS": ["free gifts", "free gift", "freebie", "complimentary gift", "giveaway"],
+    "FREE ITEMS_VOUCHERS": ["vouchers", "voucher", "gift card", "coupon", "gift voucher"],
+    "SPORTING GOODS_SPORTS EQUIPMENT": [
+        "sports equipment", "ball", "football", "basketball", "cricket bat", "racket", "tennis racket",
+        "yoga mat", "dumbbells", "gym equipment",
+    ],
+    "SPORTING GOODS_WRISTBANDS": ["sports wristbands", "sweat wristband"],
+    "HOME_HOME FURNISHING": [
+        "home furnishing", "home decor", "cushion", "cushion cover", "bedsheet", "bed sheet", "curtains",
+        "towel", "blanket", "pillow", "rug",
+    ],
+}
@@ -1,10 +1,23 @@
-import requests
+import json
+import time
+import asyncio
 import traceback
+from typing import Optional, Tuple, Dict, Any, List, Set
+
+import httpx
 from pydantic import BaseModel, Field
 from langchain_core.tools import StructuredTool
 
 from src.config import config
-from src.utils.logger import logger
+from src.services.category_matcher import CategoryMatcher
+from src.tools.item_categories import ITEM_CATEGORIES
+from src.utils.logger import logger, sampled_logger
+from src.utils.metrics import ITEM_SEARCH_CACHE_LOOKUPS, ITEM_SEARCH_REQUEST_DURATION
+from src.utils.ttl_cache import TTLCache
+
+ITEM_SEARCH_LIMIT = 3
+# item fields rendered by the product card, the rest of the document is left out of responses and the LLM context
+ITEM_SEARCH_FIELDS = ("id", "name", "category", "articleType", "baseColour", "gender", "season", "year")
 
 
 class ItemSearchInput(BaseModel):
@@ -27,8 +40,298 @@ class ItemSearchInput(BaseModel):
     )
 
 
-# TODO: use hybrid search (e.g embedding) for category
-def item_search(name: str = "", category: str = "") -> list:
+# shared keep-alive connection pool for all conversations on this worker
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    return the shared async HTTP client for the item search API, creating it on first use
+
+    Returns:
+        httpx.AsyncClient: pooled HTTP client
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=config.item_search_api_url,
+            headers={"Authorization": config.item_search_api_key},
+            timeout=httpx.Timeout(
+                config.item_search_read_timeout,
+                connect=config.item_search_connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=config.item_search_max_connections,
+                max_keepalive_connections=config.item_search_max_connections,
+            ),
+            verify=False,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    close the shared HTTP client and release pooled connections
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# search results keyed on normalized parameters, shared by all conversations on this worker
+_result_cache: TTLCache[list] = TTLCache(
+    max_size=config.item_search_cache_max_size,
+    ttl=config.item_search_cache_ttl,
+)
+
+
+_cache_hits = ITEM_SEARCH_CACHE_LOOKUPS.labels("item_search", "hit")
+_cache_misses = ITEM_SEARCH_CACHE_LOOKUPS.labels("item_search", "miss")
+
+
+# canonical categories embedded once per worker, free-text categories are resolved without a network call
+_category_matcher: Optional[CategoryMatcher] = (
+    CategoryMatcher(ITEM_CATEGORIES, threshold=config.item_category_match_threshold)
+    if config.item_category_match_enabled
+    else None
+)
+
+
+def resolve_category(category: str) -> str:
+    """
+    map a free-text category such as "sneakers" to its canonical FIRST_SECOND value
+
+    Args:
+        category (str): category from the model
+
+    Returns:
+        str: canonical category, or the uppercased input if nothing matches
+    """
+    if not category or _category_matcher is None:
+        return category.upper()
+    match = _category_matcher.match(category)
+    if match is None:
+        return category.upper()
+    if match.category != category.upper():
+        sampled_logger.info(
+            "Resolved category",
+            category=category,
+            resolved=match.category,
+            alias=match.alias,
+            score=round(match.score, 2),
+        )
+    return match.category
+
+
+def _cache_key(name: str, category: str, limit: int) -> Tuple[str, str, int]:
+    """
+    build the result cache key from case-folded, whitespace-collapsed parameters
+
+    Args:
+        name (str): item name keyword
+        category (str): item category
+        limit (int): maximum number of items
+
+    Returns:
+        Tuple[str, str, int]: cache key
+    """
+    return " ".join(name.casefold().split()), " ".join(category.casefold().split()), limit
+
+
+def invalidate_item_search_cache(name: Optional[str] = None, category: str = "", limit: int = ITEM_SEARCH_LIMIT) -> int:
+    """
+    invalidate cached search results, every entry if no name is given
+
+    Args:
+        name (Optional[str]): item name keyword
+        category (str): item category
+        limit (int): maximum number of items
+
+    Returns:
+        int: number of removed entries
+    """
+    if name is None:
+        return _result_cache.invalidate()
+    return _result_cache.invalidate(_cache_key(name, resolve_category(category), limit))
+
+
+def item_search_cache_stats() -> Dict[str, Any]:
+    """
+    return item search result cache counters
+
+    Returns:
+        Dict[str, Any]: cache counters
+    """
+    return _result_cache.stats()
+
+
+async def _fetch_items(params: Dict[str, Any]) -> Optional[list]:
+    """
+    call the item search API
+
+    Args:
+        params (Dict[str, Any]): query parameters
+
+    Returns:
+        Optional[list]: items, None if the search failed
+    """
+    started = time.perf_counter()
+    try:
+        resp = await get_http_client().get("/v1/search/item/", params=params)
+    except Exception:
+        ITEM_SEARCH_REQUEST_DURATION.labels("item_search", "single", "error").observe(time.perf_counter() - started)
+        raise
+    duration = ITEM_SEARCH_REQUEST_DURATION.labels("item_search", "single", "ok" if resp.is_success else "error")
+    duration.observe(time.perf_counter() - started)
+    # check status
+    try:
+        resp.raise_for_status()
+    except Exception:
+        logger.error(f"Error in item search: {traceback.format_exc()}")
+        return None
+    # check response
+    try:
+        result = resp.json()
+        if "error" in result:
+            logger.error(f"Error in item search: {result['error']}")
+            return None
+        return result["content"]
+    except json.JSONDecodeError as e:
+        logger.error(f"Error in item search: {e}")
+        return None
+
+
+async def _fetch_items_batch(queries: List[Dict[str, Any]]) -> List[Optional[list]]:
+    """
+    call the item search batch API, which runs all queries in one OpenSearch `_msearch`
+
+    Args:
+        queries (List[Dict[str, Any]]): query parameters of each search
+
+    Returns:
+        List[Optional[list]]: items of each query in order, None for a failed query
+    """
+    started = time.perf_counter()
+    try:
+        resp = await get_http_client().post("/v1/search/item/batch", json={"queries": queries})
+    except Exception:
+        ITEM_SEARCH_REQUEST_DURATION.labels("item_search", "batch", "error").observe(time.perf_counter() - started)
+        raise
+    duration = ITEM_SEARCH_REQUEST_DURATION.labels("item_search", "batch", "ok" if resp.is_success else "error")
+    duration.observe(time.perf_counter() - started)
+    # check status
+    try:
+        resp.raise_for_status()
+    except Exception:
+        logger.error(f"Error in item batch search: {traceback.format_exc()}")
+        return [None] * len(queries)
+    # check response
+    try:
+        result = resp.json()
+    except json.JSONDecodeError as e:
+        logger.error(f"Error in item batch search: {e}")
+        return [None] * len(queries)
+    if "error" in result or len(result.get("results", [])) != len(queries):
+        logger.error(f"Error in item batch search: {result.get('error', 'unexpected number of results')}")
+        return [None] * len(queries)
+    items = []
+    for query, query_result in zip(queries, result["results"]):
+        if "error" in query_result:
+            logger.error(f"Error in item search for {query}: {query_result['error']}")
+            items.append(None)
+        else:
+            items.append(query_result["content"])
+    return items
+
+
+class ItemSearchBatcher:
+    """
+    group item searches issued concurrently into one batch request
+
+    Searches arriving within `window` seconds of the first one, e.g. the parallel tool calls
+    of one model turn, are sent together. A lone search still uses the single query API.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        """
+        initialize item search batcher
+
+        Args:
+            window (float): seconds to wait for more searches after the first one
+            max_size (int): searches per batch request, a full batch is sent immediately
+        """
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        # keep references so in-flight batches are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def fetch(self, params: Dict[str, Any]) -> Optional[list]:
+        """
+        queue a search and wait for its batch
+
+        Args:
+            params (Dict[str, Any]): query parameters
+
+        Returns:
+            Optional[list]: items, None if the search failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((params, future))
+        if len(self._pending) >= self.max_size:
+            self._spawn(self._send(self._take()))
+        elif self._timer is None:
+            self._timer = self._spawn(self._send_later())
+        return await future
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _take(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        pending, self._pending = self._pending, []
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        return pending
+
+    async def _send_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self._send(self._take())
+
+    async def _send(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        # searches whose tool call timed out or was cancelled are dropped
+        pending = [(params, future) for params, future in pending if not future.done()]
+        if not pending:
+            return
+        try:
+            if len(pending) == 1:
+                results = [await _fetch_items(pending[0][0])]
+            else:
+                sampled_logger.info("Item search batch", queries=len(pending))
+                results = await _fetch_items_batch([params for params, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), items in zip(pending, results):
+            if not future.done():
+                future.set_result(items)
+
+
+_batcher: Optional[ItemSearchBatcher] = (
+    ItemSearchBatcher(window=config.item_search_batch_window, max_size=config.item_search_batch_max_size)
+    if config.item_search_batch_enabled
+    else None
+)
+
+
+async def item_search(name: str = "", category: str = "", limit: int = ITEM_SEARCH_LIMIT) -> list:
     """
     Use this tool only for searching items in Coco Retails.
     Searches only for items in the Coco Retails based on the given parameters.
@@ -40,6 +343,7 @@ def item_search(name: str = "", category: str = "") -> list:
 
     ## Category Values
     Category is combined with first and second level categories with a underscore.
+    Other category keywords (e.g. sneakers, lotion) are mapped to the closest value.
     - First Level Category:
         - Apparel
         - Accessories
@@ -83,39 +387,32 @@ def item_search(name: str = "", category: str = "") -> list:
         - Wristbands
         - Vouchers
     """
-    headers = {"Authorization": config.item_search_api_key}
-    logger.info(f"Item Searching for [name] {name}, [category] {category.upper()}")
+    category = resolve_category(category)
+    key = _cache_key(name, category, limit)
+    cached = _result_cache.get(key)
+    if cached is not None:
+        _cache_hits.inc()
+        sampled_logger.info("Item search cache hit", name=name, category=category)
+        return cached
+    _cache_misses.inc()
+
+    sampled_logger.info("Item search", name=name, category=category)
     params = {
         "name": name,
-        "category": category.upper(),
-        "limit": 3,
+        "category": category,
+        "limit": limit,
+        "fields": ",".join(ITEM_SEARCH_FIELDS),
     }
-    resp = requests.get(
-        f"{config.item_search_api_url}/v1/search/item/",
-        params=params,
-        headers=headers,
-        verify=False,
-        timeout=5,
-    )
-    # check status
-    try:
-        resp.raise_for_status()
-    except Exception:
-        logger.error(f"Error in item search: {traceback.format_exc()}")
-        return []
-    # check response
-    try:
-        result = resp.json()
-        if "error" in result:
-            logger.error(f"Error in item search: {result['error']}")
-        return result["content"]
-    except requests.exceptions.JSONDecodeError as e:
-        logger.error(f"Error in item search: {e}")
+    items = await (_batcher.fetch(params) if _batcher is not None else _fetch_items(params))
+    # failed searches are not cached, empty results are cached with a short negative ttl
+    if items is None:
         return []
+    _result_cache.set(key, items, ttl=None if items else config.item_search_cache_negative_ttl)
+    return items
 
 
 tool = StructuredTool.from_function(
-    func=item_search,
+    coroutine=item_search,
     name="item_search",
     description=item_search.__doc__,
     args_schema=ItemSearchInput,
@@ -1,46 +1,260 @@
 import os
+import sys
+import queue
+import random
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
 import structlog
 
 from src.config import config
+from src.utils.metrics import LOG_FIELDS_TRUNCATED, LOG_LINES_DROPPED
+
+# event key marking events of the sampled logger, removed before rendering
+SAMPLED_KEY = "_sampled"
+# fields never truncated
+UNTRUNCATED_FIELDS = frozenset({"event", "level", "timestamp", "exception"})
+# values cheap to render, never measured for truncation
+SCALAR_TYPES = (int, float, bool, type(None))
+
+_stop = object()
+
+
+class LogSink:
+    """
+    queue-backed log sink drained by a background writer thread
+
+    Callers only put the event dict on a bounded queue, the writer thread truncates large
+    fields, renders and writes lines in batches, so neither serialization nor blocking stdout
+    I/O runs on the event loop. A full queue drops the line instead of blocking, dropped lines
+    are counted in the `chat_log_lines_dropped_total` metric. Values are rendered after the
+    call returns, so log immutable values or copies.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[Dict[str, Any]], str],
+        stream: Optional[TextIO] = None,
+        max_size: int = 10000,
+        max_field_chars: int = 2048,
+        batch_size: int = 256,
+    ):
+        """
+        initialize log sink
+
+        Args:
+            render (Callable[[Dict[str, Any]], str]): renders an event dict to a line
+            stream (Optional[TextIO]): output stream, stdout if None
+            max_size (int): queued lines before new lines are dropped
+            max_field_chars (int): characters kept of a field's rendered value
+            batch_size (int): lines written per write call at most
+        """
+        self.render = render
+        self.stream = stream
+        self.max_field_chars = max_field_chars
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._queue_full = LOG_LINES_DROPPED.labels("queue_full")
+        self._errors = LOG_LINES_DROPPED.labels("error")
+        self._truncated = LOG_FIELDS_TRUNCATED.labels()
+
+    def put(self, event_dict: Dict[str, Any]) -> None:
+        """
+        queue an event dict for writing, dropping it if the queue is full
+
+        Args:
+            event_dict (Dict[str, Any]): processed event dict
+        """
+        # started on first use, and again in a forked worker where the parent's thread does not exist
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self._queue_full.inc()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def truncate(self, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        cap the rendered size of every field
+
+        Args:
+            event_dict (Dict[str, Any]): event dict
+
+        Returns:
+            Dict[str, Any]: event dict with oversized fields replaced by truncated text
+        """
+        for key, value in event_dict.items():
+            if key in UNTRUNCATED_FIELDS or isinstance(value, SCALAR_TYPES):
+                continue
+            text = value if isinstance(value, str) else repr(value)
+            if len(text) > self.max_field_chars:
+                event_dict[key] = f"{text[:self.max_field_chars]}... [truncated {len(text) - self.max_field_chars} chars]"
+                self._truncated.inc()
+        return event_dict
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines: List[str] = []
+            stop = False
+            for event_dict in batch:
+                if event_dict is _stop:
+                    stop = True
+                    continue
+                try:
+                    lines.append(self.render(self.truncate(event_dict)))
+                except Exception:
+                    # e.g. a value mutated by the caller while it was rendered
+                    self._errors.inc()
+            if lines:
+                stream = self.stream or sys.stdout
+                try:
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                except Exception:
+                    self._errors.inc(len(lines))
+            if stop:
+                return
+
+    def close(self, timeout: float = 2.0) -> None:
+        """
+        write queued lines and stop the writer thread
+
+        Args:
+            timeout (float): seconds to wait for the queue to drain
+        """
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_stop, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+class QueueLogger:
+    """
+    structlog logger putting event dicts on a LogSink, rendering happens on the writer thread
+    """
+
+    def __init__(self, sink: LogSink):
+        self.sink = sink
+
+    def msg(self, **event_dict: Any) -> None:
+        self.sink.put(event_dict)
+
+    log = debug = info = warn = warning = error = err = fatal = exception = critical = msg
+
+
+class QueueLoggerFactory:
+    """
+    structlog logger factory for QueueLogger
+    """
+
+    def __init__(self, sink: LogSink):
+        self.sink = sink
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self.sink)
+
+
+class SampleEvents:
+    """
+    keep a fraction of debug and info events of the sampled logger, warnings and errors are always kept
+
+    Kept events carry `sample_rate` so counts can be extrapolated.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._sampled_out = LOG_LINES_DROPPED.labels("sampled")
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if not event_dict.pop(SAMPLED_KEY, False) or self.rate >= 1 or method_name not in ("debug", "info"):
+            return event_dict
+        if random.random() >= self.rate:
+            self._sampled_out.inc()
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = self.rate
+        return event_dict
+
+
+def _chain(processors: List[Callable]) -> Callable[[Dict[str, Any]], str]:
+    def render(event_dict: Dict[str, Any]) -> str:
+        for processor in processors:
+            event_dict = processor(None, event_dict.get("level", "info"), event_dict)
+        return event_dict
+
+    return render
 
 
 def setup_logger(name: str = "alps_writer") -> structlog.BoundLogger:
     """
     Setup and configure structured logger for the application.
 
+    Events below LOG_LEVEL are filtered before any processing. Exceptions and stack info are
+    captured on the calling thread, everything else is rendered by the LogSink writer thread.
+
     Args:
         name (str): Name of the logger. Defaults to "alps_writer"
 
     Returns:
         structlog.BoundLogger: Configured structured logger instance
     """
-    # Configure processors
+    # Configure processors, run on the calling thread before the event is queued
     processors = [
         structlog.processors.add_log_level,
+        SampleEvents(config.log_sample_rate),
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
     ]
 
-    # Add different processors for development and production
+    # Add different renderers for development and production, run on the writer thread
+    renderers = [structlog.processors.UnicodeDecoder()]
     if config.environment == "local":
         # Development: Console output in colored format
-        processors.extend([
-            structlog.dev.ConsoleRenderer(colors=True)
-        ])
+        renderers.append(structlog.dev.ConsoleRenderer(colors=True))
     else:
         # Production: JSON format
-        processors.extend([
+        renderers.extend([
             structlog.processors.dict_tracebacks,
             structlog.processors.JSONRenderer()
         ])
 
+    sink = LogSink(
+        _chain(renderers),
+        max_size=config.log_queue_size,
+        max_field_chars=config.log_field_max_chars,
+    )
+    atexit.register(sink.close)
+
     structlog.configure(
-        processors=processors,
+        # the event dict itself is handed to QueueLogger
+        processors=[*processors, lambda _, __, event_dict: event_dict],
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        wrapper_class=structlog.BoundLogger,
+        logger_factory=QueueLoggerFactory(sink),
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelNamesMapping()[config.log_level]),
         cache_logger_on_first_use=True,
     )
 
@@ -50,3 +264,5 @@ def setup_logger(name: str = "alps_writer") -> structlog.BoundLogger:
 
 # Create default logger instance
 logger = setup_logger()
+# logger for high-volume hot path events, info and debug events are kept at LOG_SAMPLE_RATE
+sampled_logger = logger.bind(**{SAMPLED_KEY: True})
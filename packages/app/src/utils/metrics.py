@@ -0,0 +1,281 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# default latency buckets in seconds, covering tool calls up to full model answers
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """
+    base of labelled metrics, children are created once per label value combination
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        initialize metric
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str]): label names
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """
+        return the child for the label values, bind it once outside hot loops
+
+        Args:
+            values (str): label values in label name order
+
+        Returns:
+            child metric
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, values: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """
+    monotonically increasing count, e.g. bytes sent
+    """
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self, values: Tuple[str, ...], child: _Value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    """
+    value going up and down, e.g. streams in flight
+    """
+    kind = "gauge"
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """
+    distribution of observed values in cumulative buckets, e.g. latencies in seconds
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """
+        initialize histogram
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str]): label names
+            buckets (Sequence[float]): upper bounds of the buckets, +Inf is added
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def _samples(self, values: Tuple[str, ...], child: _Buckets) -> List[str]:
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    process-wide metrics rendered in the Prometheus text exposition format
+
+    Metrics are plain in-process counters and buckets, updating one costs a lock and an
+    addition, so they can be recorded per SSE frame without measurable overhead.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        register a metric, names must be unique
+
+        Args:
+            metric (_Metric): metric to register
+
+        Returns:
+            _Metric: the registered metric
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        render every metric
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+TIME_TO_FIRST_TOKEN = registry.register(Histogram(
+    "chat_time_to_first_token_seconds",
+    "Seconds from the start of a streamed answer to its first text delta.",
+    ["model"],
+))
+LLM_ITERATION_DURATION = registry.register(Histogram(
+    "chat_llm_iteration_duration_seconds",
+    "Seconds of one model call, each turn of the tool loop is a call.",
+    ["model", "mode"],
+))
+RESPONSE_DURATION = registry.register(Histogram(
+    "chat_response_duration_seconds",
+    "Seconds to produce a whole answer including tool calls.",
+    ["model", "mode"],
+))
+LLM_TOKENS = registry.register(Counter(
+    "chat_llm_tokens_total",
+    "Tokens reported by the model, by input, output and prompt cache reads and writes.",
+    ["model", "type"],
+))
+TOOL_CALL_DURATION = registry.register(Histogram(
+    "chat_tool_call_duration_seconds",
+    "Seconds of a tool call, by outcome (ok, error, timeout).",
+    ["tool", "status"],
+))
+SSE_BYTES = registry.register(Counter(
+    "chat_sse_bytes_total",
+    "Bytes of SSE frames sent to clients.",
+    ["model"],
+))
+SSE_FRAMES = registry.register(Counter(
+    "chat_sse_frames_total",
+    "SSE frames sent to clients.",
+    ["model"],
+))
+STREAMS_IN_FLIGHT = registry.register(Gauge(
+    "chat_streams_in_flight",
+    "Streamed answers currently being sent.",
+    ["model"],
+))
+ITEM_SEARCH_REQUEST_DURATION = registry.register(Histogram(
+    "chat_item_search_request_duration_seconds",
+    "Seconds of an item search API request, single query or batch, by outcome (ok, error).",
+    ["tool", "kind", "status"],
+))
+ITEM_SEARCH_CACHE_LOOKUPS = registry.register(Counter(
+    "chat_item_search_cache_lookups_total",
+    "Item search result cache lookups, by result (hit, miss).",
+    ["tool", "result"],
+))
+SEMANTIC_CACHE_LOOKUPS = registry.register(Counter(
+    "chat_semantic_cache_lookups_total",
+    "Semantic response cache lookups, by result (exact_hit, hit, miss).",
+    ["result"],
+))
+LOG_LINES_DROPPED = registry.register(Counter(
+    "chat_log_lines_dropped_total",
+    "Log lines not written, by reason (queue_full, sampled, error).",
+    ["reason"],
+))
+LOG_FIELDS_TRUNCATED = registry.register(Counter(
+    "chat_log_fields_truncated_total",
+    "Log fields cut to LOG_FIELD_MAX_CHARS.",
+))
@@ -1,5 +1,7 @@
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from src.config import config
 
 
 class ChatRequest(BaseModel):
@@ -10,10 +12,14 @@ class ChatRequest(BaseModel):
         recent_history (List[dict]): recent history
         user_message_content (str): user message content
         stream (bool): whether to stream response (default: True)
+        temperature (Optional[float]): per-request temperature override, between 0 and 1
+        max_tokens (Optional[int]): per-request maximum tokens override, at most MODEL_MAX_TOKENS
     """
     recent_history: List[dict]
     user_message_content: str
     stream: bool = True
+    temperature: Optional[float] = Field(default=None, ge=0, le=1)
+    max_tokens: Optional[int] = Field(default=None, ge=1, le=config.max_tokens)
 
 
 class ChatResponse(BaseModel):
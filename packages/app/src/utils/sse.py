@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List
+
+import orjson
+
+# sentinel pushed by the producer task when the source stream is exhausted
+_END = object()
+
+
+def format_sse(data: Dict[str, Any]) -> str:
+    """
+    serialize an event as an SSE data frame
+
+    Args:
+        data (Dict[str, Any]): event payload
+
+    Returns:
+        str: SSE frame
+    """
+    return f"data: {orjson.dumps(data).decode()}\n\n"
+
+
+def is_text_delta(event: Dict[str, Any]) -> bool:
+    """
+    check whether the event is a plain assistant text delta that can be coalesced
+
+    Args:
+        event (Dict[str, Any]): event payload
+
+    Returns:
+        bool: True for assistant text deltas
+    """
+    return event.get("role") == "assistant" and isinstance(event.get("content"), str) and len(event) == 2
+
+
+async def coalesce_events(
+    events: AsyncIterator[Dict[str, Any]],
+    flush_interval: float = 0.03,
+    max_chars: int = 256,
+    queue_size: int = 256,
+) -> AsyncGenerator[str, None]:
+    """
+    batch assistant text deltas into fewer SSE frames
+
+    The first text delta is sent immediately to keep time-to-first-token, later deltas are
+    buffered until `flush_interval` seconds have passed or `max_chars` characters are
+    buffered. Any other event (tool calls, tool results, errors) flushes the buffer and is
+    sent immediately. The source is drained by a single producer task so its async context
+    never moves between tasks.
+
+    Args:
+        events (AsyncIterator[Dict[str, Any]]): source event stream
+        flush_interval (float): maximum seconds a text delta is held back
+        max_chars (int): buffered characters that force a flush
+        queue_size (int): producer queue size, bounds memory if the client is slow
+
+    Yields:
+        str: SSE frames
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce() -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            # hand source errors to the consumer, cancellation means the consumer is gone
+            await queue.put(e)
+            return
+        await queue.put(_END)
+
+    producer = asyncio.create_task(produce())
+    loop = asyncio.get_running_loop()
+    buffer: List[str] = []
+    buffered_chars = 0
+    deadline = 0.0
+    first_text_sent = False
+
+    def flush() -> str:
+        nonlocal buffered_chars
+        frame = format_sse({"role": "assistant", "content": "".join(buffer)})
+        buffer.clear()
+        buffered_chars = 0
+        return frame
+
+    try:
+        while True:
+            if buffer:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    yield flush()
+                    continue
+            else:
+                event = await queue.get()
+
+            if event is _END:
+                break
+            if isinstance(event, Exception):
+                raise event
+
+            if not is_text_delta(event):
+                if buffer:
+                    yield flush()
+                yield format_sse(event)
+                continue
+
+            if not event["content"]:
+                continue
+            if not first_text_sent:
+                first_text_sent = True
+                yield format_sse(event)
+                continue
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer.append(event["content"])
+            buffered_chars += len(event["content"])
+            if buffered_chars >= max_chars:
+                yield flush()
+
+        if buffer:
+            yield flush()
+    finally:
+        if not producer.done():
+            producer.cancel()
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.messages.ai import UsageMetadata, add_usage
+
+
+class AIMessageAccumulator:
+    """
+    accumulate streamed AIMessageChunks in linear time
+
+    `chunk + chunk` re-merges every content block and tool call chunk on each addition, so a
+    long answer costs quadratic time. This keeps per-block string fragments in lists and
+    builds the merged message once at the end of the stream.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[int, Dict[str, Any]] = {}
+        self._block_parts: Dict[int, Dict[str, List[str]]] = {}
+        self._text_parts: List[str] = []
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+        self._tool_args: Dict[int, List[str]] = {}
+        self._usage: Optional[UsageMetadata] = None
+        self._response_metadata: Dict[str, Any] = {}
+        self._id: Optional[str] = None
+        self._chunks = 0
+
+    def __bool__(self) -> bool:
+        return self._chunks > 0
+
+    def add(self, chunk: AIMessageChunk) -> None:
+        """
+        add a streamed chunk
+
+        Args:
+            chunk (AIMessageChunk): streamed chunk
+        """
+        self._chunks += 1
+        if self._id is None and chunk.id:
+            self._id = chunk.id
+        if chunk.response_metadata:
+            self._response_metadata.update(chunk.response_metadata)
+        if chunk.usage_metadata:
+            self._usage = add_usage(self._usage, chunk.usage_metadata)
+
+        if isinstance(chunk.content, str):
+            if chunk.content:
+                self._text_parts.append(chunk.content)
+        else:
+            for block in chunk.content:
+                if isinstance(block, str):
+                    self._text_parts.append(block)
+                else:
+                    self._add_block(block)
+
+        for tool_call_chunk in chunk.tool_call_chunks:
+            index = tool_call_chunk.get("index")
+            index = len(self._tool_calls) if index is None else index
+            tool_call = self._tool_calls.setdefault(index, {"name": None, "id": None})
+            for key in ("name", "id"):
+                if tool_call[key] is None and tool_call_chunk.get(key):
+                    tool_call[key] = tool_call_chunk[key]
+            if tool_call_chunk.get("args"):
+                self._tool_args.setdefault(index, []).append(tool_call_chunk["args"])
+
+    def _add_block(self, block: Dict[str, Any]) -> None:
+        """
+        merge a content block by its index, appending string fields to fragment lists
+        """
+        index = block.get("index", len(self._blocks))
+        if index not in self._blocks:
+            # content block stop events only carry an index
+            if "type" not in block:
+                return
+            self._blocks[index] = {}
+            self._block_parts[index] = {}
+        merged = self._blocks[index]
+        parts = self._block_parts[index]
+        for key, value in block.items():
+            if key == "index":
+                continue
+            # tool input arrives as partial JSON, tool calls are rebuilt from tool_call_chunks
+            if key == "input" and block.get("type", merged.get("type")) == "tool_use":
+                merged.setdefault(key, {})
+                continue
+            if key == "type":
+                merged.setdefault(key, value)
+            elif isinstance(value, str):
+                parts.setdefault(key, []).append(value)
+            elif key not in merged:
+                merged[key] = value
+
+    def build(self) -> Optional[AIMessageChunk]:
+        """
+        build the merged message once at the end of the stream
+
+        Returns:
+            Optional[AIMessageChunk]: merged message, None if no chunk was added
+        """
+        if not self:
+            return None
+
+        content: List[Any] = []
+        for index in sorted(self._blocks):
+            block = dict(self._blocks[index])
+            for key, fragments in self._block_parts[index].items():
+                block[key] = "".join(fragments)
+            block["index"] = index
+            content.append(block)
+        if self._text_parts:
+            text = "".join(self._text_parts)
+            content = text if not content else [text, *content]
+
+        tool_call_chunks = [
+            {
+                "name": tool_call["name"],
+                "id": tool_call["id"],
+                "args": "".join(self._tool_args.get(index, [])),
+                "index": index,
+                "type": "tool_call_chunk",
+            }
+            for index, tool_call in sorted(self._tool_calls.items())
+        ]
+        return AIMessageChunk(
+            content=content if content else [],
+            id=self._id,
+            tool_call_chunks=tool_call_chunks,
+            usage_metadata=self._usage,
+            response_metadata=self._response_metadata,
+        )
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    bounded LRU cache with a per-entry time to live and hit-rate counters
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        initialize cache
+
+        Args:
+            max_size (int): maximum number of entries, least recently used entries are evicted first
+            ttl (float): default time to live in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        get a live entry and mark it as recently used
+
+        Args:
+            key (Hashable): cache key
+
+        Returns:
+            Optional[V]: cached value or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        store an entry, evicting the least recently used entry when full
+
+        Args:
+            key (Hashable): cache key
+            value (V): value to store
+            ttl (Optional[float]): time to live in seconds, defaults to the cache ttl
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> int:
+        """
+        remove one entry, or every entry if no key is given
+
+        Args:
+            key (Optional[Hashable]): cache key
+
+        Returns:
+            int: number of removed entries
+        """
+        with self._lock:
+            if key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            return 1 if self._entries.pop(key, None) is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        return cache counters
+
+        Returns:
+            Dict[str, Any]: size, hits, misses, evictions and hit ratio
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
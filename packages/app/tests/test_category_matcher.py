@@ -0,0 +1,61 @@
+"""
+free-text categories resolved by CategoryMatcher, a wrong category filter is worse than none
+
+    uv run -- python -m pytest tests/test_category_matcher.py
+"""
+from typing import Optional
+
+import pytest
+
+from src.services.category_matcher import CategoryMatcher
+from src.tools.item_categories import ITEM_CATEGORIES
+
+# default ITEM_CATEGORY_MATCH_THRESHOLD
+THRESHOLD = 0.35
+
+CASES = [
+    # exact aliases and canonical names
+    ("sneakers", "FOOTWEAR_SHOES"),
+    ("t-shirt", "APPAREL_TOPWEAR"),
+    ("footwear shoes", "FOOTWEAR_SHOES"),
+    # plurals, typos and compounds
+    ("sneaker", "FOOTWEAR_SHOES"),
+    ("sneekers", "FOOTWEAR_SHOES"),
+    ("kurtas", "APPAREL_TOPWEAR"),
+    ("tshirts", "APPAREL_TOPWEAR"),
+    ("caps", "ACCESSORIES_HEADWEAR"),
+    ("flipflops", "FOOTWEAR_FLIP FLOPS"),
+    ("sun glasses", "ACCESSORIES_ACCESSORIES"),
+    ("shoelaces", "ACCESSORIES_SHOE ACCESSORIES"),
+    ("water bottles", "ACCESSORIES_WATER BOTTLE"),
+    # modifiers before the head noun
+    ("men's casual shoes", "FOOTWEAR_SHOES"),
+    ("blue running shoes", "FOOTWEAR_SHOES"),
+    ("womens handbags", "ACCESSORIES_BAGS"),
+    ("wrist watches", "ACCESSORIES_WATCHES"),
+    ("formal shirt", "APPAREL_TOPWEAR"),
+    ("rain coat", "APPAREL_TOPWEAR"),
+    # close in character n-grams, but a different product
+    ("laptop", None),
+    ("mobile cover", None),
+    ("sportswear", None),
+    ("hair band", None),
+    ("phone", None),
+    ("headphones", None),
+    ("saree", None),
+    ("swimwear", None),
+    # first-level names match every category under them
+    ("footwear", None),
+    ("apparel", None),
+]
+
+
+@pytest.fixture(scope="module")
+def matcher() -> CategoryMatcher:
+    return CategoryMatcher(ITEM_CATEGORIES, threshold=THRESHOLD)
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_match(matcher: CategoryMatcher, text: str, expected: Optional[str]):
+    match = matcher.match(text)
+    assert (match.category if match else None) == expected